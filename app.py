@@ -1,74 +1,83 @@
-import streamlit as st
-import subprocess
-import sys
+import time
+
 import pandas as pd
-import re
+import streamlit as st
 
-def parse_output(output):
-    """
-    A simple function to parse the text output from the script
-    and extract key performance metrics.
-    """
-    metrics = {}
-    # Use regular expressions to find the metrics in the text block
-    patterns = {
-        'TotalTrades': r"TotalTrades\s+([\d\.]+)",
-        'WinRate': r"WinRate\s+([\d\.]+)",
-        'TotalPnL': r"TotalPnL\s+([-\d\.]+)",
-        'Sharpe': r"Sharpe\s+([-\d\.]+)"
-    }
-    for key, pattern in patterns.items():
-        match = re.search(pattern, output)
-        if match:
-            metrics[key] = float(match.group(1))
-    return metrics
+from core.job_service import JobService
+from core.search import SEARCHERS
 
 # --- Streamlit App Layout ---
 st.set_page_config(layout="wide")
 st.title("Quantitative Strategy Dashboard")
 
+
+@st.cache_resource
+def get_job_service():
+    """
+    One job service for the whole Streamlit server, shared by every browser
+    session: backtests run on its background thread instead of blocking the
+    page, and users asking for the same run share one job and its cached result.
+    """
+    return JobService(max_jobs=1)
+
+
+service = get_job_service()
+
+with st.sidebar:
+    st.header("Run settings")
+    data_path = st.text_input("Data (CSV path or dataset name)", "data/eth_usd_binanceus_60d_1m.csv")
+    search = st.selectbox("Search", sorted(SEARCHERS), index=sorted(SEARCHERS).index('grid'))
+    budget = st.number_input("Budget (full-length backtests, non-grid searches)", min_value=1.0, value=24.0)
+    workers = st.number_input("Worker processes", min_value=1, value=1)
+
 # Create a button to run the backtest
 if st.button("Run New Backtest"):
-    
-    # Show a message while the script is running
-    with st.spinner("Running backtest... This may take a few minutes."):
-        
-        # This command runs your optimize.py script
-        process = subprocess.Popen([sys.executable, "scripts/optimize.py"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        # Wait for the process to finish and capture the output
-        stdout, stderr = process.communicate()
-    
-    # Check if the script ran successfully
-    if process.returncode == 0:
-        st.success("Backtest finished successfully!")
-        
+    # Returns at once: the job is queued, joined if an identical one is running, or served from the cache.
+    job = service.submit('optimize', data=data_path, search=search, budget=float(budget), workers=int(workers),
+                         config_path='configs/best_config.json')
+    st.session_state['job_id'] = job.id
+
+job = service.get(st.session_state.get('job_id'))
+if job is not None and not job.done:
+    # Show progress and check again shortly; the page stays usable meanwhile.
+    st.progress(job.progress, text=f"{job.status.capitalize()}: {job.message}")
+    time.sleep(0.5)
+    st.rerun()
+
+elif job is not None and job.status == 'failed':
+    st.error("Backtest failed!")
+    # Display the full error output for debugging
+    st.subheader("Error Log")
+    st.code(job.error)
+
+elif job is not None:
+    result = job.result
+    st.success(f"Backtest finished in {job.finished - job.submitted:.1f}s")
+
+    if result['stats'] is None:
+        st.warning("No parameter sets were run during the optimization.")
+    else:
         # --- Display Results ---
         st.subheader("Final Validation Performance")
-        
-        # Parse the output to get the metrics
-        final_stats_text = stdout.split("--- FINAL VALIDATION PERFORMANCE ---")[-1]
-        metrics = parse_output(final_stats_text)
-        
-        if metrics:
-            # Display metrics in columns for a clean look
-            col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Total PnL", f"${metrics.get('TotalPnL', 0):.2f}")
-            col2.metric("Win Rate", f"{metrics.get('WinRate', 0):.2f}%")
-            col3.metric("Total Trades", f"{int(metrics.get('TotalTrades', 0))}")
-            col4.metric("Sharpe Ratio", f"{metrics.get('Sharpe', 0):.2f}")
-        else:
-            st.warning("Could not parse performance metrics from the output.")
-
-        # Display the equity curve chart
+        metrics = result['stats']
+        # Display metrics in columns for a clean look
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total PnL", f"${metrics['TotalPnL']:.2f}")
+        col2.metric("Win Rate", f"{metrics['WinRate']:.2f}%")
+        col3.metric("Total Trades", f"{int(metrics['TotalTrades'])}")
+        col4.metric("Sharpe Ratio", f"{metrics['Sharpe']:.2f}")
+
+        # Display the equity curve chart (already downsampled to chart width)
         st.subheader("Equity Curve")
-        try:
-            st.image("logs/final_validation_equity_curve.png")
-        except FileNotFoundError:
-            st.warning("Equity curve plot not found.")
-            
-    else:
-        st.error("Backtest failed!")
-        # Display the full error output for debugging
-        st.subheader("Error Log")
-        st.code(stderr)
\ No newline at end of file
+        st.line_chart(result['equity'].set_index('time'))
+
+        st.subheader("Best Parameters (training data)")
+        st.dataframe(pd.DataFrame(result['train_results']).head(10), hide_index=True)
+
+jobs = service.jobs()
+if jobs:
+    with st.expander(f"Jobs ({len(jobs)})"):
+        st.dataframe(pd.DataFrame([{
+            'id': j.id, 'kind': j.kind, 'status': j.status, 'progress': round(j.progress, 2), 'message': j.message,
+            'data': j.args.get('data'), 'search': j.args.get('search'),
+        } for j in jobs]), hide_index=True)
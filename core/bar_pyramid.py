@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from core.data_store import DataStore
+from core.fetch_engine import timeframe_to_ms
+
+_NS_PER_MS = 1_000_000
+DEFAULT_TIMEFRAMES = ('5m', '15m', '1h', '4h', '1d')
+
+
+def rollup_arrays(arrays, timeframe):
+    """
+    Aggregates time-sorted OHLCV column arrays into `timeframe` bars in one
+    vectorised pass. Bars are keyed by their open time (aligned to the epoch,
+    so 1h bars start on the hour); periods with no source bars produce no bar.
+    """
+    step = timeframe_to_ms(timeframe) * _NS_PER_MS
+    times = np.asarray(arrays['time'])
+    if len(times) == 0:
+        return {col: np.asarray(values)[:0] for col, values in arrays.items()}
+    buckets = times // step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)]
+    return {
+        'time': buckets[starts] * step,
+        'open': np.asarray(arrays['open'])[starts],
+        'high': np.maximum.reduceat(np.asarray(arrays['high']), starts),
+        'low': np.minimum.reduceat(np.asarray(arrays['low']), starts),
+        'close': np.asarray(arrays['close'])[ends - 1],
+        'volume': np.add.reduceat(np.asarray(arrays['volume']), starts),
+    }
+
+
+def rollup_frame(df, timeframe):
+    """rollup_arrays for a DataFrame with a datetime `time` column (as TradeEngine.run_backtest takes)."""
+    arrays = {col: df[col].to_numpy(dtype=np.float64) for col in ('open', 'high', 'low', 'close', 'volume')}
+    arrays['time'] = df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    bars = rollup_arrays(arrays, timeframe)
+    out = pd.DataFrame({col: bars[col] for col in ('open', 'high', 'low', 'close', 'volume')})
+    out.insert(0, 'time', bars['time'].view('datetime64[ns]'))
+    return out
+
+
+class BarPyramid:
+    """
+    Coarser timeframes of a base (usually 1m) dataset, cached in the data store
+    next to it as `<name>@<tf>` datasets. Each level is built from the base
+    series once; after new base bars are appended only the last (possibly
+    still forming) bar of each level and the bars after it are recomputed.
+    If the base was rewritten instead (a backfill or a changed CSV), the level
+    is rebuilt in full. Levels are brought up to date whenever they are requested.
+    """
+
+    def __init__(self, store=None, timeframes=DEFAULT_TIMEFRAMES):
+        self.store = store or DataStore()
+        self.timeframes = timeframes
+
+    @staticmethod
+    def level_name(name, timeframe):
+        return f"{name}@{timeframe}"
+
+    def dataset(self, name, timeframe):
+        """Name of the up-to-date dataset holding `name` at `timeframe` (the base itself if it already is)."""
+        info = self.store.info(name)
+        base_tf = info.get('timeframe')
+        if timeframe is None or timeframe == base_tf:
+            return name
+        if base_tf is None or timeframe_to_ms(timeframe) % timeframe_to_ms(base_tf):
+            raise ValueError(f"Can't build {timeframe} bars from {name} ({base_tf} bars)")
+        self.update_level(name, timeframe)
+        return self.level_name(name, timeframe)
+
+    def load_frame(self, name, timeframe, start=None, end=None):
+        return self.store.load_frame(self.dataset(name, timeframe), start, end)
+
+    def update(self, name):
+        """Brings every configured level of `name` up to date; returns {timeframe: rows rebuilt}."""
+        base_tf = self.store.info(name).get('timeframe')
+        rebuilt = {}
+        for tf in self.timeframes:
+            if base_tf and timeframe_to_ms(tf) > timeframe_to_ms(base_tf) and \
+                    timeframe_to_ms(tf) % timeframe_to_ms(base_tf) == 0:
+                rebuilt[tf] = self.update_level(name, tf)
+        return rebuilt
+
+    def update_level(self, name, timeframe):
+        level = self.level_name(name, timeframe)
+        base = self.store.info(name)
+        base_times = self.store.load_arrays(name, columns=['time'])['time']
+        rows = len(base_times)
+        meta = {
+            'symbol': base.get('symbol'), 'exchange': base.get('exchange'), 'timeframe': timeframe,
+            'derived_from': name, 'base_rows': rows, 'base_source_mtime': base.get('source_mtime'),
+            'base_first': int(base_times[0]) if rows else None,
+            'base_last': int(base_times[-1]) if rows else None,
+        }
+
+        entry = self.store.info(level) if level in self.store else None
+        if entry is not None and self._is_extension(entry, base, base_times):
+            if entry['base_rows'] == rows:
+                return 0
+            # Only appended: recompute from the level's last bar, which may have been incomplete.
+            level_times = self.store.load_arrays(level, columns=['time'])['time']
+            keep = len(level_times) - 1 if len(level_times) else 0
+            lo = int(np.searchsorted(base_times, level_times[-1])) if len(level_times) else 0
+            tail = rollup_arrays({col: values[lo:] for col, values in self.store.load_arrays(name).items()},
+                                 timeframe)
+            self.store.truncate(level, keep)
+            self.store.append(level, tail, **meta)
+            return len(tail['time'])
+
+        bars = rollup_arrays(self.store.load_arrays(name), timeframe)
+        self.store.write(level, bars, **meta)
+        return len(bars['time'])
+
+    @staticmethod
+    def _is_extension(entry, base, base_times):
+        """True if the base only grew at the end since the level was last built."""
+        built_rows = entry.get('base_rows')
+        if built_rows is None or built_rows > len(base_times) or built_rows == 0:
+            return False
+        if entry.get('base_source_mtime') != base.get('source_mtime'):
+            return False
+        return (int(base_times[0]) == entry.get('base_first')
+                and int(base_times[built_rows - 1]) == entry.get('base_last'))
@@ -0,0 +1,196 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from core import instrumentation
+from core.stats import summarize
+
+
+def params_matrix(combos):
+    """Turns optimizer param dicts (core.optimizer.PARAM_GRID keys) into one float64 column per parameter."""
+    return {
+        'rsi_threshold': np.array([p["RSI"] for p in combos], dtype=np.float64),
+        'tp2_atr': np.array([p["TP_ATR"] for p in combos], dtype=np.float64),
+        'trailing_sl_atr': np.array([p["SL_ATR"] for p in combos], dtype=np.float64),
+        'cooldown_ns': np.array([pd.Timedelta(minutes=p["Cooldown"]).value for p in combos], dtype=np.int64),
+        'atr_threshold': np.array([p["ATR_Thresh"] for p in combos], dtype=np.float64),
+        'tp1_atr': np.array([p["TP1_ATR"] for p in combos], dtype=np.float64),
+    }
+
+
+def run_batch(market, combos, starting_equity=1000, fees_pct=0.001, risk_per_trade=0.01, start_index=200):
+    """
+    Simulates every parameter set in `combos` in a single pass over the bars.
+    Per-configuration state (equity, in_trade, stops, cooldown end) lives in
+    NumPy vectors, so each bar updates all configurations at once. Follows the
+    same TP1/TP2/trailing-SL/cooldown rules as TradeEngine.run_backtest and
+    returns one {**params, **get_final_stats()}-style row per configuration,
+    in `combos` order.
+
+    Trades are counted one per entry, like the trade ids in TradeEngine.
+    Sharpe/Sortino come from running sums of the per-bar equity changes, and
+    drawdown, profit factor and exposure are tracked per configuration, so the
+    rows carry the same metrics as core.stats.summarize.
+    """
+    k = len(combos)
+    if k == 0:
+        return []
+    started = time.perf_counter()
+    p = params_matrix(combos)
+
+    times = market['time']
+    highs = market['high']
+    lows = market['low']
+    closes = market['close']
+    atrs = market['ATR']
+    n = len(times)
+
+    # Entry signals only depend on (rsi_threshold, atr_threshold), so build one mask per distinct pair.
+    pairs, group = np.unique(np.stack([p['rsi_threshold'], p['atr_threshold']], axis=1), axis=0, return_inverse=True)
+    group = group.ravel()
+    prev_rsi = np.empty_like(market['RSI'])
+    prev_rsi[0] = np.nan
+    prev_rsi[1:] = market['RSI'][:-1]
+    uptrend = closes > market['SMA200']
+    signal_matrix = np.empty((n, len(pairs)), dtype=bool)
+    for g, (rsi_threshold, atr_threshold) in enumerate(pairs):
+        signal_matrix[:, g] = (uptrend & (prev_rsi < rsi_threshold) & (market['RSI'] >= rsi_threshold)
+                               & (atrs > atr_threshold))
+    signal_matrix[:start_index] = False
+    any_signal = signal_matrix.any(axis=1)
+
+    tp1_atr, tp2_atr, trailing_sl_atr = p['tp1_atr'], p['tp2_atr'], p['trailing_sl_atr']
+    safe_tp2_atr = np.where(tp2_atr > 0, tp2_atr, 1.0)
+
+    equity = np.full(k, float(starting_equity))
+    in_trade = np.zeros(k, dtype=bool)
+    tp1_hit = np.zeros(k, dtype=bool)
+    cooldown_end = np.full(k, np.iinfo(np.int64).min, dtype=np.int64)
+    entry_price = np.zeros(k)
+    tp1_price = np.zeros(k)
+    tp2_price = np.zeros(k)
+    sl_price = np.zeros(k)
+    sl_offset = np.zeros(k)
+    high_since_entry = np.zeros(k)
+    position_size = np.zeros(k)
+    open_position_size = np.zeros(k)
+
+    trade_pnl = np.zeros(k)
+    trade_logged = np.zeros(k, dtype=bool)
+    total_trades = np.zeros(k, dtype=np.int64)
+    wins = np.zeros(k, dtype=np.int64)
+    sum_sq_diffs = np.zeros(k)
+    downside_sq = np.zeros(k)
+    peak = np.full(k, float(starting_equity))
+    max_drawdown = np.zeros(k)
+    max_drawdown_pct = np.zeros(k)
+    gross_profit = np.zeros(k)
+    gross_loss = np.zeros(k)
+    entry_bar = np.zeros(k, dtype=np.int64)
+    bars_in_market = np.zeros(k, dtype=np.int64)
+
+    for i in range(start_index, n):
+        trading = in_trade.any()
+        if not trading and not any_signal[i]:
+            continue
+        t = times[i]
+        equity_before = equity.copy()
+        # Entries are decided on the state at the start of the bar, exactly like the
+        # bar loop checks for a BUY before managing the open position.
+        entering = None
+        if any_signal[i]:
+            entering = ~in_trade & (t >= cooldown_end) & signal_matrix[i, group]
+
+        if trading:
+            high = highs[i]
+            m = in_trade.copy()
+            high_since_entry = np.where(m, np.maximum(high_since_entry, high), high_since_entry)
+            sl_price = np.where(m, np.maximum(sl_price, high_since_entry - sl_offset), sl_price)
+
+            tp1_now = m & ~tp1_hit & (high >= tp1_price)
+            if tp1_now.any():
+                size_to_sell = position_size / 2
+                trade_fee = (tp1_price * size_to_sell) * fees_pct
+                net_gain_loss = (tp1_price - entry_price) * size_to_sell - trade_fee
+                equity = np.where(tp1_now, equity + net_gain_loss, equity)
+                open_position_size = np.where(tp1_now, open_position_size - size_to_sell, open_position_size)
+                trade_pnl = np.where(tp1_now, trade_pnl + net_gain_loss, trade_pnl)
+                trade_logged |= tp1_now
+                tp1_hit |= tp1_now
+                sl_price = np.where(tp1_now, entry_price, sl_price)
+
+            exit_tp2 = m & (high >= tp2_price)
+            exit_sl = m & ~exit_tp2 & (lows[i] <= sl_price)
+            exiting = exit_tp2 | exit_sl
+            if exiting.any():
+                exit_price = np.where(exit_tp2, tp2_price, sl_price)
+                trade_fee = (exit_price * open_position_size) * fees_pct
+                net_gain_loss = (exit_price - entry_price) * open_position_size - trade_fee
+                equity = np.where(exiting, equity + net_gain_loss, equity)
+                closed_pnl = trade_pnl + net_gain_loss
+                total_trades += exiting
+                wins += exiting & (closed_pnl > 0)
+                gross_profit += np.where(exiting & (closed_pnl > 0), closed_pnl, 0.0)
+                gross_loss += np.where(exiting & (closed_pnl <= 0), -closed_pnl, 0.0)
+                bars_in_market += np.where(exiting, i - entry_bar, 0)
+                trade_pnl = np.where(exiting, 0.0, trade_pnl)
+                trade_logged &= ~exiting
+                in_trade &= ~exiting
+                cooldown_end = np.where(exiting, t + p['cooldown_ns'], cooldown_end)
+
+            diffs = equity - equity_before
+            sum_sq_diffs += diffs * diffs
+            downside_sq += np.where(diffs < 0, diffs * diffs, 0.0)
+            peak = np.maximum(peak, equity)
+            drawdown = peak - equity
+            max_drawdown = np.maximum(max_drawdown, drawdown)
+            max_drawdown_pct = np.maximum(max_drawdown_pct, np.where(peak > 0, drawdown / peak, 0.0))
+
+        if entering is not None and entering.any():
+            price = closes[i]
+            atr = atrs[i]
+            new_tp1 = price + (atr * tp1_atr)
+            new_tp2 = price + (atr * tp2_atr)
+            new_sl = price - (atr * trailing_sl_atr)
+            risk_per_unit = price - new_sl
+            with np.errstate(divide='ignore', invalid='ignore'):
+                new_size = np.where(risk_per_unit > 0, (equity * risk_per_trade) / risk_per_unit, 0.0)
+                new_offset = np.where(tp2_atr > 0, (new_tp2 - price) / safe_tp2_atr, 0.0) * trailing_sl_atr
+
+            entry_price = np.where(entering, price, entry_price)
+            tp1_price = np.where(entering, new_tp1, tp1_price)
+            tp2_price = np.where(entering, new_tp2, tp2_price)
+            sl_price = np.where(entering, new_sl, sl_price)
+            sl_offset = np.where(entering, new_offset, sl_offset)
+            high_since_entry = np.where(entering, price, high_since_entry)
+            entry_bar = np.where(entering, i, entry_bar)
+            position_size = np.where(entering, new_size, position_size)
+            open_position_size = np.where(entering, new_size, open_position_size)
+            tp1_hit &= ~entering
+            in_trade |= entering
+
+    # A position still open at the end counts if its TP1 partial made it into the log.
+    total_trades += trade_logged
+    wins += trade_logged & (trade_pnl > 0)
+    gross_profit += np.where(trade_logged, np.maximum(trade_pnl, 0.0), 0.0)
+    gross_loss += np.where(trade_logged, np.maximum(-trade_pnl, 0.0), 0.0)
+    bars_in_market += np.where(in_trade, n - 1 - entry_bar, 0)
+
+    bars = n - start_index
+    rows = []
+    for c, params in enumerate(combos):
+        mean = (equity[c] - starting_equity) / bars if bars > 0 else 0.0
+        m2 = max(sum_sq_diffs[c] - bars * mean * mean, 0.0)
+        stats = summarize(starting_equity, equity[c], bars, mean, m2, downside_sq[c], max_drawdown[c],
+                          max_drawdown_pct[c], int(total_trades[c]), int(wins[c]), gross_profit[c], gross_loss[c],
+                          int(bars_in_market[c]))
+        rows.append({**params, **stats})
+
+    instr = instrumentation.active()
+    if instr is not None:
+        # One pass simulates k backtests, so 'bars' counts bar updates of every configuration.
+        instr.record('bar_loop', time.perf_counter() - started)
+        instr.count('backtests', k)
+        instr.count('bars', max(bars, 0) * k)
+    return rows
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from core import instrumentation
+from core.data_store import DataStore, resolve_dataset
+from indicators.streaming import StreamingIndicators
+
+# Bars per chunk. Peak memory of a chunked backtest is a few hundred bytes per
+# chunk bar (column arrays plus the Python floats of the bar loop), whatever the dataset length.
+DEFAULT_CHUNK_BARS = 250_000
+
+CHUNK_COLUMNS = ('time', 'high', 'low', 'close')
+
+
+def iter_dataset_chunks(source, chunk_bars=DEFAULT_CHUNK_BARS, timeframe=None, store=None):
+    """
+    (time, high, low, close) column arrays of a store dataset (or the CSV it
+    was imported from), `chunk_bars` rows at a time. A new or changed CSV is
+    imported first, itself in chunks (DataStore.import_csv). Each chunk is copied out
+    of a fresh memory map that is dropped before the next one is read, so only
+    one chunk's pages are ever resident. `timeframe` reads the dataset's cached
+    core.bar_pyramid rollup instead of the base bars. A missing dataset
+    raises FileNotFoundError right away rather than on the first chunk.
+    """
+    store = store or DataStore()
+    name = resolve_dataset(source, store)
+    if timeframe is not None:
+        from core.bar_pyramid import BarPyramid
+        name = BarPyramid(store).dataset(name, timeframe)
+    return _read_chunks(store, name, chunk_bars)
+
+
+def _read_chunks(store, name, chunk_bars):
+    rows = store.time_bounds(name)[1]
+    for lo in range(0, rows, chunk_bars):
+        arrays = store.load_arrays(name, columns=CHUNK_COLUMNS)
+        chunk = {col: np.array(values[lo:lo + chunk_bars]) for col, values in arrays.items()}
+        del arrays
+        yield chunk
+
+
+def iter_frame_chunks(df, chunk_bars=DEFAULT_CHUNK_BARS):
+    """The same chunks from an in-memory DataFrame (datetime `time` column), e.g. to check against run_backtest."""
+    for lo in range(0, len(df), chunk_bars):
+        yield frame_columns(df.iloc[lo:lo + chunk_bars])
+
+
+def frame_columns(df):
+    columns = {'time': df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)}
+    for col in CHUNK_COLUMNS[1:]:
+        columns[col] = df[col].to_numpy(dtype=np.float64)
+    return columns
+
+
+def stream_markets(chunks, start_index=200, indicators=None):
+    """
+    Turns OHLC chunks (column-array dicts like iter_dataset_chunks yields, or
+    DataFrames) into the market dicts TradeEngine.run_backtest_arrays takes,
+    yielding (market, start_index) per chunk. RSI/ATR/SMA200 come from
+    indicators.streaming.StreamingIndicators, whose state carries over from
+    one chunk to the next, so they equal the `ta` values of the whole series.
+
+    Every market after the first starts with the previous chunk's last bar,
+    so the RSI cross on a chunk's first bar sees the RSI before it; its
+    start_index skips that bar, and the first `start_index` bars of the whole
+    series, exactly like one run over all of it.
+    """
+    indicators = indicators or StreamingIndicators()
+    previous = None
+    seen = 0
+    for chunk in chunks:
+        if isinstance(chunk, pd.DataFrame):
+            chunk = frame_columns(chunk)
+        n = len(chunk['time'])
+        if n == 0:
+            continue
+        market = {'time': np.asarray(chunk['time'], dtype=np.int64)}
+        for col in CHUNK_COLUMNS[1:]:
+            market[col] = np.ascontiguousarray(chunk[col], dtype=np.float64)
+        with instrumentation.stage('indicators'):
+            market.update(indicators.update_arrays(market['high'], market['low'], market['close']))
+
+        local_start = max(start_index - seen, 0)
+        if previous is not None:
+            market = {col: np.concatenate((previous[col], values)) for col, values in market.items()}
+            local_start += 1
+        previous = {col: values[-1:].copy() for col, values in market.items()}
+        seen += n
+        yield market, local_start
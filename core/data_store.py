@@ -0,0 +1,327 @@
+import json
+import os
+import re
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads of one process are still serialised
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.path.join("data", "store")
+
+# Column files are raw little-endian arrays so they can be memory-mapped and appended to.
+OHLCV_COLUMNS = {
+    'time': '<i8',  # epoch nanoseconds
+    'open': '<f8',
+    'high': '<f8',
+    'low': '<f8',
+    'close': '<f8',
+    'volume': '<f8',
+}
+
+# One lock per catalog file, shared by every DataStore on it in this process (see _write_catalog).
+_CATALOG_LOCKS = {}
+_CATALOG_LOCKS_GUARD = threading.Lock()
+
+_TIMEFRAMES = [(60, '1m'), (300, '5m'), (900, '15m'), (3600, '1h'), (14400, '4h'), (86400, '1d')]
+_FILENAME_RE = re.compile(
+    r'^(?P<base>[a-z0-9]+)_(?P<quote>[a-z0-9]+)_(?P<exchange>[a-z0-9]+)_(?P<days>\d+)d(?:_(?P<timeframe>\d+[mhdw]))?$')
+
+
+def infer_timeframe(times_ns):
+    """Names the median bar spacing ('1m', '1h', ...) or falls back to seconds for irregular series."""
+    if len(times_ns) < 2:
+        return None
+    seconds = int(np.median(np.diff(times_ns)) // 1_000_000_000)
+    for step, name in _TIMEFRAMES:
+        if seconds == step:
+            return name
+    return f"{seconds}s"
+
+
+def parse_dataset_name(name):
+    """Symbol/exchange/timeframe from the data/ naming scheme, e.g. eth_usd_kraken_90d_1h."""
+    match = _FILENAME_RE.match(name)
+    if not match:
+        return {}
+    meta = {
+        'symbol': f"{match['base'].upper()}/{match['quote'].upper()}",
+        'exchange': match['exchange'],
+        'days': int(match['days']),
+    }
+    if match['timeframe']:
+        meta['timeframe'] = match['timeframe']
+    return meta
+
+
+# Rows parsed at a time when a CSV is imported, so importing doesn't need the whole file in memory.
+CSV_CHUNK_ROWS = 1_000_000
+
+
+def read_ohlcv_csv(path):
+    """Parses one of the data/*.csv files into a frame with the standard OHLCV columns."""
+    return _standard_columns(pd.read_csv(path, parse_dates=['time']))
+
+
+def iter_ohlcv_csv(path, chunk_rows=CSV_CHUNK_ROWS):
+    """read_ohlcv_csv `chunk_rows` rows at a time."""
+    for chunk in pd.read_csv(path, parse_dates=['time'], chunksize=chunk_rows):
+        yield _standard_columns(chunk)
+
+
+def _standard_columns(df):
+    if "open" not in df.columns:
+        # Assume CoinGecko price-only data
+        df.rename(columns={"price": "close"}, inplace=True)
+        df["open"] = df["close"]
+        df["high"] = df["close"]
+        df["low"] = df["close"]
+        df["volume"] = 0.0  # filler
+    return df
+
+
+class DataStore:
+    """
+    Columnar on-disk market data. Each dataset is a directory of raw column files
+    (int64 epoch-ns `time`, float64 OHLCV) plus an entry in catalog.json with its
+    symbol, exchange, timeframe, date range and row count. Reads are memory-mapped,
+    and time-range reads binary-search the time column instead of scanning it.
+
+    Several stores may share one root (the dashboard thread and job workers
+    each open their own): a catalog write re-reads the file under a lock and
+    only replaces the entry being changed, so nobody overwrites another's datasets.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self.catalog_path = os.path.join(root, "catalog.json")
+        os.makedirs(root, exist_ok=True)
+        self._catalog = self._read_catalog()
+
+    # --- catalog ---
+
+    def _read_catalog(self):
+        try:
+            with open(self.catalog_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _catalog_lock(self):
+        with _CATALOG_LOCKS_GUARD:
+            return _CATALOG_LOCKS.setdefault(os.path.abspath(self.catalog_path), threading.Lock())
+
+    def _write_catalog(self, name):
+        """Saves entry `name` into catalog.json as it is on disk now, and picks up everyone else's entries."""
+        with self._catalog_lock(), open(self.catalog_path + ".lock", 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)  # other processes; released when the file closes
+            catalog = self._read_catalog()
+            catalog[name] = self._catalog[name]
+            tmp_path = self.catalog_path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(catalog, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.catalog_path)
+            self._catalog = catalog
+
+    def catalog(self):
+        return dict(self._catalog)
+
+    def __contains__(self, name):
+        return name in self._catalog
+
+    def info(self, name):
+        return self._catalog[name]
+
+    def needs_import(self, name, path):
+        """
+        True unless `name` was already imported from `path` (and the file hasn't
+        changed since) or was fetched straight into the store, which beats a CSV.
+        """
+        entry = self._catalog.get(name)
+        if not entry:
+            return True
+        if entry.get('source', '').startswith('ccxt:'):
+            return False
+        return entry.get('source_mtime') != os.path.getmtime(path)
+
+    def list_datasets(self, symbol=None, exchange=None, timeframe=None, derived=False):
+        """
+        Replaces prefix matching on file names: filter datasets by their catalog
+        fields. The cached core.bar_pyramid rollups (`name@5m`, ...) are left
+        out unless `derived` is set.
+        """
+        names = []
+        for name, meta in self._catalog.items():
+            if not derived and meta.get('derived_from'):
+                continue
+            if symbol and meta.get('symbol') != symbol:
+                continue
+            if exchange and meta.get('exchange') != exchange:
+                continue
+            if timeframe and meta.get('timeframe') != timeframe:
+                continue
+            names.append(name)
+        return sorted(names)
+
+    # --- writing ---
+
+    def _dataset_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def _column_path(self, name, column):
+        return os.path.join(self._dataset_dir(name), column + ".bin")
+
+    @staticmethod
+    def _frame_to_arrays(df):
+        arrays = {'time': df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)}
+        for col in OHLCV_COLUMNS:
+            if col != 'time':
+                arrays[col] = df[col].to_numpy(dtype=np.float64)
+        return arrays
+
+    def write(self, name, data, **meta):
+        """Replaces dataset `name` with `data` (a DataFrame with a time column, or a dict of arrays)."""
+        arrays = self._frame_to_arrays(data) if isinstance(data, pd.DataFrame) else data
+        os.makedirs(self._dataset_dir(name), exist_ok=True)
+        for col, dtype in OHLCV_COLUMNS.items():
+            np.ascontiguousarray(arrays[col], dtype=dtype).tofile(self._column_path(name, col))
+        entry = {**self._catalog.get(name, {}), **parse_dataset_name(name), **meta}
+        self._catalog[name] = entry
+        self._refresh_entry(name, arrays['time'])
+        return entry
+
+    def append(self, name, data, **meta):
+        """Appends rows to the end of dataset `name` (created if missing). Rows must be newer than what is stored."""
+        if name not in self._catalog:
+            return self.write(name, data, **meta)
+        arrays = self._frame_to_arrays(data) if isinstance(data, pd.DataFrame) else data
+        if len(arrays['time']) == 0:
+            return self._catalog[name]
+        for col, dtype in OHLCV_COLUMNS.items():
+            with open(self._column_path(name, col), 'ab') as f:
+                np.ascontiguousarray(arrays[col], dtype=dtype).tofile(f)
+        self._catalog[name].update(meta)
+        self._refresh_entry(name, None)
+        return self._catalog[name]
+
+    def truncate(self, name, rows):
+        """Drops every row after the first `rows`, e.g. to rewrite a bar that was still forming."""
+        for col, dtype in OHLCV_COLUMNS.items():
+            with open(self._column_path(name, col), 'r+b') as f:
+                f.truncate(rows * np.dtype(dtype).itemsize)
+        self._refresh_entry(name, None)
+        return self._catalog[name]
+
+    def update_meta(self, name, **meta):
+        self._catalog[name].update(meta)
+        self._write_catalog(name)
+
+    def _refresh_entry(self, name, times):
+        if times is None:
+            times = self._memmap(name, 'time')
+        entry = self._catalog[name]
+        entry['rows'] = int(len(times))
+        entry['start'] = str(pd.Timestamp(int(times[0]))) if len(times) else None
+        entry['end'] = str(pd.Timestamp(int(times[-1]))) if len(times) else None
+        if not entry.get('timeframe') and len(times) > 1:
+            entry['timeframe'] = infer_timeframe(np.asarray(times[:1000]))
+        self._write_catalog(name)
+
+    def import_csv(self, path, name=None, chunk_rows=CSV_CHUNK_ROWS):
+        """
+        Converts a data/*.csv file into the store once; later loads skip CSV
+        parsing entirely. The file is parsed and appended `chunk_rows` rows at
+        a time, so memory use doesn't grow with its length.
+        """
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        meta = {'source': os.path.abspath(path), 'source_mtime': os.path.getmtime(path)}
+        entry = None
+        for chunk in iter_ohlcv_csv(path, chunk_rows):
+            entry = self.write(name, chunk, **meta) if entry is None else self.append(name, chunk, **meta)
+        if entry is None:
+            # Header only: still an (empty) dataset, as before.
+            entry = self.write(name, read_ohlcv_csv(path), **meta)
+        return entry
+
+    def sync_csv_dir(self, data_dir="data"):
+        """Imports every OHLCV/price CSV in `data_dir` that is new or changed since it was last imported."""
+        imported = []
+        for f in sorted(os.listdir(data_dir)):
+            if not f.endswith(".csv"):
+                continue
+            path = os.path.join(data_dir, f)
+            with open(path, 'r') as fh:
+                header = fh.readline().strip().split(',')
+            if 'time' not in header or not ({'close', 'price'} & set(header)) or 'quantity' in header:
+                continue  # raw trade files (time,price,quantity) are not bars
+            name = os.path.splitext(f)[0]
+            if not self.needs_import(name, path):
+                continue
+            self.import_csv(path, name)
+            imported.append(name)
+        return imported
+
+    # --- reading ---
+
+    def _memmap(self, name, column):
+        rows = os.path.getsize(self._column_path(name, column)) // np.dtype(OHLCV_COLUMNS[column]).itemsize
+        if rows == 0:
+            return np.empty(0, dtype=OHLCV_COLUMNS[column])
+        return np.memmap(self._column_path(name, column), dtype=OHLCV_COLUMNS[column], mode='r', shape=(rows,))
+
+    def time_bounds(self, name, start=None, end=None):
+        """Row range [lo, hi) covering start <= time < end, found by binary search on the time column."""
+        times = self._memmap(name, 'time')
+        lo = 0 if start is None else int(np.searchsorted(times, pd.Timestamp(start).value, side='left'))
+        hi = len(times) if end is None else int(np.searchsorted(times, pd.Timestamp(end).value, side='left'))
+        return lo, hi
+
+    def load_arrays(self, name, start=None, end=None, columns=None):
+        """Zero-copy, read-only memory-mapped column slices for start <= time < end."""
+        lo, hi = self.time_bounds(name, start, end)
+        return {col: self._memmap(name, col)[lo:hi] for col in (columns or OHLCV_COLUMNS)}
+
+    def load_frame(self, name, start=None, end=None):
+        """The same slice as a DataFrame with a datetime `time` column, ready for TradeEngine.run_backtest."""
+        arrays = self.load_arrays(name, start, end)
+        df = pd.DataFrame({col: np.asarray(values) for col, values in arrays.items() if col != 'time'})
+        df.insert(0, 'time', np.asarray(arrays['time']).view('datetime64[ns]'))
+        return df
+
+    def last_time(self, name):
+        if name not in self._catalog:
+            return None
+        times = self._memmap(name, 'time')
+        return int(times[-1]) if len(times) else None
+
+
+def resolve_dataset(source, store):
+    """Store dataset name for a catalog name or CSV path, importing the CSV first if it is new or changed."""
+    name = source if source in store else os.path.splitext(os.path.basename(source))[0]
+    if os.path.exists(source) and store.needs_import(name, source):
+        store.import_csv(source, name)
+    if name not in store:
+        raise FileNotFoundError(source)
+    return name
+
+
+def load_ohlcv(source, store=None, timeframe=None):
+    """
+    Loads a dataset by catalog name or CSV path. CSVs are converted into the
+    store the first time (and again only if the file changes), so repeat
+    loads are memory-mapped reads rather than CSV parses. A CSV path that
+    doesn't exist falls back to the dataset with the same name, e.g. one the
+    fetch scripts wrote straight into the store. `timeframe` ('5m', '1h', ...)
+    returns the dataset's cached core.bar_pyramid rollup instead of the base bars.
+    """
+    store = store or DataStore()
+    name = resolve_dataset(source, store)
+    if timeframe is not None:
+        from core.bar_pyramid import BarPyramid
+        return BarPyramid(store).load_frame(name, timeframe)
+    return store.load_frame(name)
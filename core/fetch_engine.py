@@ -0,0 +1,160 @@
+import time
+
+import numpy as np
+
+from core.data_store import DataStore, OHLCV_COLUMNS
+
+_TIMEFRAME_UNITS = {'s': 1_000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+_NS_PER_MS = 1_000_000
+
+
+def timeframe_to_ms(timeframe):
+    return int(timeframe[:-1]) * _TIMEFRAME_UNITS[timeframe[-1]]
+
+
+def candles_to_arrays(candles):
+    """ccxt [[ms, o, h, l, c, v], ...] -> store column arrays, sorted and de-duplicated by time."""
+    raw = np.asarray(candles, dtype=np.float64).reshape(-1, 6)
+    arrays = {'time': raw[:, 0].astype(np.int64) * _NS_PER_MS}
+    for i, col in enumerate(('open', 'high', 'low', 'close', 'volume'), start=1):
+        arrays[col] = raw[:, i]
+    return merge_arrays([arrays])
+
+
+def merge_arrays(chunks):
+    """Concatenates store column arrays, sorted by time, keeping the first copy of any duplicate bar."""
+    merged = {col: np.concatenate([np.asarray(c[col]) for c in chunks]) for col in OHLCV_COLUMNS}
+    _, first = np.unique(merged['time'], return_index=True)
+    return {col: values[first] for col, values in merged.items()}
+
+
+class OHLCVFetcher:
+    """
+    Incremental OHLCV downloader on top of any object with a ccxt-style
+    fetch_ohlcv (a real exchange or the tests' fake_exchange.FakeExchange).
+
+    It asks the data store what it already has for a dataset and only requests
+    what is missing: older history before the first stored bar, holes inside the
+    stored range, and new bars after the last one. Pages advance by whole
+    timeframes from the last candle received. New bars are appended to disk
+    every `batch_pages` pages, so an interrupted run resumes from the last
+    stored bar. Holes the exchange has no data for are remembered in the
+    catalog and not requested again.
+    """
+
+    def __init__(self, exchange, store=None, batch_pages=10, retries=3, retry_delay=3.0, pause=0.0, log=print):
+        self.exchange = exchange
+        self.store = store or DataStore()
+        self.batch_pages = batch_pages
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.pause = pause
+        self.log = log
+
+    def missing_ranges(self, name, start_ms, end_ms, timeframe):
+        """[start, end) millisecond ranges inside the window that the store has no bars for."""
+        step = timeframe_to_ms(timeframe)
+        if name not in self.store or self.store.info(name)['rows'] == 0:
+            return [(start_ms, end_ms)]
+        times = np.asarray(self.store.load_arrays(name, columns=['time'])['time']) // _NS_PER_MS
+        info = self.store.info(name)
+        known_empty = {tuple(gap) for gap in info.get('empty_gaps', [])}
+
+        ranges = []
+        if start_ms < times[0] and info.get('no_data_before') != int(times[0]):
+            ranges.append((start_ms, int(times[0])))
+        inside = times[(times >= start_ms - step) & (times < end_ms)]
+        for gap_at in np.flatnonzero(np.diff(inside) > step):
+            gap = (int(inside[gap_at]) + step, int(inside[gap_at + 1]))
+            if gap not in known_empty:
+                ranges.append(gap)
+        if times[-1] + step < end_ms:
+            ranges.append((int(times[-1]) + step, end_ms))
+        return ranges
+
+    def record_empty_range(self, name, lo, hi, start_ms):
+        """The exchange has nothing in [lo, hi) (no trades, or history doesn't go back that far)."""
+        if lo == start_ms:
+            self.store.update_meta(name, no_data_before=hi)
+        else:
+            self.store.update_meta(name, empty_gaps=self.store.info(name).get('empty_gaps', []) + [[lo, hi]])
+
+    def fetch(self, name, symbol, timeframe, days=None, since_ms=None, limit=1000):
+        step = timeframe_to_ms(timeframe)
+        end_ms = (self.exchange.milliseconds() // step) * step
+        start_ms = since_ms if since_ms is not None else end_ms - days * 86_400_000
+        start_ms = (start_ms // step) * step
+        meta = {'symbol': symbol, 'exchange': getattr(self.exchange, 'id', None), 'timeframe': timeframe,
+                'source': f"ccxt:{getattr(self.exchange, 'id', 'exchange')}"}
+
+        ranges = self.missing_ranges(name, start_ms, end_ms, timeframe)
+        if not ranges:
+            self.log(f"{name}: already up to date")
+            return 0
+
+        total = 0
+        backfill = []
+        for lo, hi in ranges:
+            last = self.store.last_time(name)
+            self.log(f"{name}: fetching {self._fmt(lo)} -> {self._fmt(hi)}")
+            if last is None or lo > last // _NS_PER_MS:
+                total += self._fetch_range(name, symbol, timeframe, lo, hi, limit, step, meta, sink=None)
+                continue
+
+            got = self._fetch_range(name, symbol, timeframe, lo, hi, limit, step, meta, sink=backfill)
+            total += got
+            if got == 0:
+                self.record_empty_range(name, lo, hi, start_ms)
+
+        if backfill:
+            # Older history and holes land in the middle of the dataset, so merge and rewrite once.
+            self.store.write(name, merge_arrays([self.store.load_arrays(name)] + backfill), **meta)
+        self.log(f"{name}: {total} new bars, {self.store.info(name)['rows']} stored")
+        return total
+
+    def _fetch_range(self, name, symbol, timeframe, lo, hi, limit, step, meta, sink):
+        since = lo
+        pending = []
+        pages = 0
+        got = 0
+        while since < hi:
+            candles = self._fetch_page(symbol, timeframe, since, limit)
+            if not candles:
+                break
+            page = candles_to_arrays(candles)
+            keep = (page['time'] >= since * _NS_PER_MS) & (page['time'] < hi * _NS_PER_MS)
+            page = {col: values[keep] for col, values in page.items()}
+            if len(page['time']) == 0:
+                break
+            pending.append(page)
+            got += len(page['time'])
+            pages += 1
+            # Next page starts one bar after the last candle we received.
+            since = int(page['time'][-1] // _NS_PER_MS) + step
+
+            if sink is None and pages % self.batch_pages == 0:
+                self.store.append(name, merge_arrays(pending), **meta)
+                pending = []
+            if self.pause:
+                time.sleep(self.pause)
+
+        if pending:
+            if sink is None:
+                self.store.append(name, merge_arrays(pending), **meta)
+            else:
+                sink.append(merge_arrays(pending))
+        return got
+
+    def _fetch_page(self, symbol, timeframe, since, limit):
+        for attempt in range(self.retries + 1):
+            try:
+                return self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                self.log(f"[ERROR] {e} (retry {attempt + 1}/{self.retries})")
+                time.sleep(self.retry_delay * (attempt + 1))
+
+    @staticmethod
+    def _fmt(ms):
+        return np.datetime64(int(ms), 'ms').astype(str)
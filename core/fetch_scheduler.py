@@ -0,0 +1,170 @@
+import asyncio
+import inspect
+import json
+import random
+import time
+
+import numpy as np
+
+from core.data_store import DataStore
+from core.fetch_engine import OHLCVFetcher, merge_arrays, candles_to_arrays, timeframe_to_ms
+
+_NS_PER_MS = 1_000_000
+
+
+class TokenBucket:
+    """Per-exchange rate limiter: `rate` requests per second on average, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def load_jobs(path):
+    """
+    Reads a job file: {"exchanges": {id: {"rate_per_sec", "burst", "concurrency"}},
+    "jobs": [{"exchange", "symbol", "timeframe", "days", "limit", "dataset"?}]}.
+    """
+    with open(path, 'r') as f:
+        spec = json.load(f)
+    for job in spec['jobs']:
+        job.setdefault('limit', 1000)
+        if 'dataset' not in job:
+            base, quote = job['symbol'].lower().split('/')
+            job['dataset'] = f"{base}_{quote}_{job['exchange']}_{job['days']}d_{job['timeframe']}"
+    return spec
+
+
+class FetchScheduler:
+    """
+    Runs many fetch jobs (exchange, symbol, timeframe, days) at once on asyncio.
+    Each job's missing ranges (same rules as core.fetch_engine.OHLCVFetcher) are
+    split into page requests that run concurrently. Every exchange gets its own
+    token bucket and concurrency cap instead of fixed sleeps, and failed pages
+    are retried with exponential backoff. New bars are streamed into the data
+    store in time order as soon as the pages before them have arrived.
+    """
+
+    def __init__(self, exchanges, limits=None, store=None, retries=5, backoff=0.5, log=print):
+        self.exchanges = exchanges
+        self.store = store or DataStore()
+        self.retries = retries
+        self.backoff = backoff
+        self.log = log
+        self.buckets = {}
+        self.semaphores = {}
+        for exchange_id in exchanges:
+            conf = (limits or {}).get(exchange_id, {})
+            self.buckets[exchange_id] = TokenBucket(conf.get('rate_per_sec', 1.0), conf.get('burst', 1))
+            self.semaphores[exchange_id] = asyncio.Semaphore(conf.get('concurrency', 4))
+        self.requests = 0
+        self.retried = 0
+
+    async def run(self, jobs):
+        results = await asyncio.gather(*(self._run_job(job) for job in jobs))
+        return dict(zip((job['dataset'] for job in jobs), results))
+
+    async def _run_job(self, job):
+        exchange = self.exchanges[job['exchange']]
+        name, symbol, timeframe = job['dataset'], job['symbol'], job['timeframe']
+        step = timeframe_to_ms(timeframe)
+        end_ms = (exchange.milliseconds() // step) * step
+        start_ms = end_ms - job['days'] * 86_400_000
+        meta = {'symbol': symbol, 'exchange': job['exchange'], 'timeframe': timeframe,
+                'source': f"ccxt:{job['exchange']}"}
+
+        fetcher = OHLCVFetcher(exchange, store=self.store)
+        ranges = fetcher.missing_ranges(name, start_ms, end_ms, timeframe)
+        last = self.store.last_time(name)
+        page_span = job['limit'] * step
+        pages = []
+        for r, (lo, hi) in enumerate(ranges):
+            is_tail = last is None or lo > last // _NS_PER_MS
+            for since in range(lo, hi, page_span):
+                pages.append((since, min(since + page_span, hi), is_tail, r))
+        if not pages:
+            self.log(f"{name}: already up to date")
+            return 0
+
+        self.log(f"{name}: {len(pages)} page(s) to fetch")
+        tasks = [asyncio.ensure_future(self._fetch_page(job, exchange, since, until)) for since, until, _, _ in pages]
+
+        # Tail pages are appended strictly in order; a page that finishes early waits for the ones before it.
+        total = 0
+        backfill = []
+        range_rows = [0] * len(ranges)
+        try:
+            for (since, until, is_tail, r), task in zip(pages, tasks):
+                page = await task
+                total += len(page['time'])
+                range_rows[r] += len(page['time'])
+                if is_tail:
+                    self.store.append(name, page, **meta)
+                else:
+                    backfill.append(page)
+        finally:
+            # A failed page (or a cancelled job) stops the others instead of leaving them running unawaited.
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if backfill:
+            self.store.write(name, merge_arrays([self.store.load_arrays(name)] + backfill), **meta)
+        for (lo, hi), rows in zip(ranges, range_rows):
+            if rows == 0 and name in self.store:
+                fetcher.record_empty_range(name, lo, hi, start_ms)
+        self.log(f"{name}: {total} new bars, {self.store.info(name)['rows']} stored")
+        return total
+
+    async def _fetch_page(self, job, exchange, since, until):
+        """All bars in [since, until); keeps paging inside the window if the exchange caps `limit` lower."""
+        step = timeframe_to_ms(job['timeframe'])
+        chunks = []
+        while since < until:
+            candles = await self._request(job, exchange, since)
+            page = candles_to_arrays(candles if candles else np.empty((0, 6)))
+            keep = (page['time'] >= since * _NS_PER_MS) & (page['time'] < until * _NS_PER_MS)
+            page = {col: values[keep] for col, values in page.items()}
+            if len(page['time']) == 0:
+                break
+            chunks.append(page)
+            since = int(page['time'][-1] // _NS_PER_MS) + step
+        if not chunks:
+            return candles_to_arrays(np.empty((0, 6)))
+        return merge_arrays(chunks)
+
+    async def _request(self, job, exchange, since):
+        exchange_id = job['exchange']
+        for attempt in range(self.retries + 1):
+            async with self.semaphores[exchange_id]:
+                await self.buckets[exchange_id].acquire()
+                self.requests += 1
+                try:
+                    if inspect.iscoroutinefunction(exchange.fetch_ohlcv):
+                        return await exchange.fetch_ohlcv(job['symbol'], timeframe=job['timeframe'],
+                                                          since=since, limit=job['limit'])
+                    # Plain (sync) ccxt exchanges run in a thread so they don't block the loop.
+                    return await asyncio.to_thread(exchange.fetch_ohlcv, job['symbol'],
+                                                   timeframe=job['timeframe'], since=since, limit=job['limit'])
+                except Exception as e:
+                    if attempt == self.retries:
+                        raise
+                    error = e
+            self.retried += 1
+            delay = self.backoff * 2 ** attempt * (1 + random.random())
+            self.log(f"[RETRY] {exchange_id} {job['symbol']} {job['timeframe']}: {error} (in {delay:.2f}s)")
+            await asyncio.sleep(delay)
@@ -0,0 +1,97 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join("data", ".indicator_cache")
+
+
+def data_fingerprint(df):
+    """Content hash of the columns indicators are built from, so slices and reloads of the same data match."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(len(df)).encode())
+    if 'time' in df.columns:
+        h.update(df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64).tobytes())
+    for col in ('high', 'low', 'close'):
+        h.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Two-level cache for indicator arrays keyed by (data fingerprint, indicator name, window).
+    Level one is an in-memory LRU, level two is a directory of .npy files that
+    survives between runs. Both levels evict least-recently-used entries once
+    they go over their byte budget.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_memory_bytes=256 * 1024 ** 2,
+                 max_disk_bytes=2 * 1024 ** 3, persist=True):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.persist = persist
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if persist:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get_or_compute(self, fingerprint, name, window, compute):
+        key = f"{fingerprint}_{name}_{window}"
+
+        values = self._memory.get(key)
+        if values is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return values
+
+        path = os.path.join(self.cache_dir, key + ".npy")
+        if self.persist and os.path.exists(path):
+            values = np.load(path)
+            os.utime(path)  # mtime doubles as the disk LRU clock
+            self.disk_hits += 1
+        else:
+            values = np.asarray(compute(), dtype=np.float64)
+            self.misses += 1
+            if self.persist:
+                self._save(path, values)
+
+        # Cached arrays are shared between strategies, so nobody gets to write into them.
+        values.flags.writeable = False
+        self._remember(key, values)
+        return values
+
+    def clear_memory(self):
+        self._memory.clear()
+        self._memory_bytes = 0
+
+    def _remember(self, key, values):
+        self._memory[key] = values
+        self._memory_bytes += values.nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def _save(self, path, values):
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, values)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for f in os.listdir(self.cache_dir):
+            if f.endswith(".npy") and ".tmp" not in f:
+                full = os.path.join(self.cache_dir, f)
+                st = os.stat(full)
+                entries.append((st.st_mtime, st.st_size, full))
+        total = sum(size for _, size, _ in entries)
+        for _, size, full in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(full)
+            total -= size
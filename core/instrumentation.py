@@ -0,0 +1,161 @@
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# The Instrumentation collecting stage times and counters, or None (the default).
+# Code being measured only looks it up once per stage or backtest, never per bar,
+# so with nothing enabled the cost is a global read and a no-op context manager.
+_active = None
+_NULL = nullcontext()
+
+
+class Instrumentation:
+    """
+    Wall-clock time per pipeline stage and event counters for one run. Stages
+    nest: a stage entered inside another is reported as 'outer/inner', so
+    'search/indicators' is indicator time spent inside the search.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._stack = []
+        self.started = time.perf_counter()
+
+    def _path(self, name):
+        return '/'.join(self._stack + [name])
+
+    @contextmanager
+    def stage(self, name):
+        self._stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self._stack.pop()
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        """Adds `seconds` to stage `name` (nested under the current stage), for code timed by hand."""
+        entry = self.stages.setdefault(self._path(name), {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        report = {
+            'wall_s': round(elapsed, 6),
+            'stages': {name: {'seconds': round(s['seconds'], 6), 'calls': s['calls'],
+                              'pct': round(s['seconds'] / elapsed * 100, 2) if elapsed > 0 else 0.0}
+                       for name, s in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+        loop_seconds = sum(s['seconds'] for name, s in self.stages.items() if name.rsplit('/', 1)[-1] == 'bar_loop')
+        if self.counters.get('bars') and loop_seconds > 0:
+            report['bars_per_s'] = round(self.counters['bars'] / loop_seconds, 1)
+        return report
+
+
+def active():
+    """The enabled Instrumentation, or None."""
+    return _active
+
+
+def stage(name):
+    """Times the enclosed block as stage `name` when instrumentation is enabled; a no-op otherwise."""
+    return _NULL if _active is None else _active.stage(name)
+
+
+def count(name, n=1):
+    if _active is not None:
+        _active.count(name, n)
+
+
+def _profile_summary(profiler, top):
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({'function': f"{os.path.relpath(filename) if os.path.isabs(filename) else filename}:{line}({function})",
+                     'calls': calls, 'tottime_s': round(tottime, 6), 'cumtime_s': round(cumtime, 6)})
+    rows.sort(key=lambda row: row['cumtime_s'], reverse=True)
+    return {'total_calls': stats.total_calls, 'top_cumulative': rows[:top],
+            'top_own_time': sorted(rows, key=lambda row: row['tottime_s'], reverse=True)[:top]}
+
+
+def _memory_summary(snapshot, peak, top):
+    stats = snapshot.statistics('lineno')
+    return {
+        'peak_mb': round(peak / 2**20, 3),
+        'top_allocations': [{'location': f"{os.path.relpath(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+                             'size_mb': round(s.size / 2**20, 3), 'blocks': s.count} for s in stats[:top]],
+    }
+
+
+@contextmanager
+def instrumented(report_path=None, profile=False, label=None, top=25):
+    """
+    Enables stage timers and counters for the enclosed block and yields the
+    Instrumentation. With profile=True the block also runs under cProfile and
+    tracemalloc (several times slower, so timers are only comparable between
+    runs with the same setting). At the end the JSON report (stages, counters,
+    and the hottest functions and allocation sites when profiling) is written to
+    `report_path`, plus the raw cProfile data next to it as .prof for snakeviz
+    or pstats. Only work in this process is seen, not a process pool's workers.
+    """
+    global _active
+    previous, _active = _active, Instrumentation()
+    instrumentation = _active
+    profiler = None
+    if profile:
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield instrumentation
+    finally:
+        report = {'label': label, 'created': datetime.now().isoformat(timespec='seconds'), 'profiled': profile}
+        if profiler is not None:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        _active = previous
+        report.update(instrumentation.report())
+        if profiler is not None:
+            report['profile'] = _profile_summary(profiler, top)
+            report['memory'] = _memory_summary(snapshot, peak, top)
+        instrumentation.result = report
+        if report_path:
+            os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+            with open(report_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            if profiler is not None:
+                profiler.dump_stats(os.path.splitext(report_path)[0] + '.prof')
+            print(f"Instrumentation report saved to {report_path}")
+
+
+def add_arguments(parser, report):
+    """The --instrument / --profile / --report options of a command; see from_args."""
+    parser.add_argument('--instrument', action='store_true',
+                        help="Time each stage and count bars, signals, entries, partial exits and cooldown-skipped "
+                             "bars into a JSON report (counts backtests in this process only, so use --workers 1)")
+    parser.add_argument('--profile', action='store_true',
+                        help="--instrument plus cProfile and tracemalloc: hottest functions and allocation sites "
+                             "in the report and a .prof file next to it (runs several times slower)")
+    parser.add_argument('--report', default=report, help="Instrumentation report path")
+
+
+def from_args(args, label=None):
+    """`instrumented` as the add_arguments options ask for, or a no-op context when neither flag is given."""
+    if not (args.instrument or args.profile):
+        return nullcontext()
+    return instrumented(args.report, profile=args.profile, label=label)
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+
+from core.data_store import DataStore, resolve_dataset
+
+# Bar size trade CSVs are aggregated to for resolving (see IntrabarResolver.from_trades).
+TRADE_BARS = '1s'
+
+
+def is_ambiguous(high, low, entry_price, high_since_entry, sl_price, sl_offset, tp1_hit, tp1_price, tp2_price):
+    """
+    True if the order of the highs and lows inside one bar of an open trade
+    could change what the bar loop books for it. The loop takes the bar's
+    high first (raising the trailing stop, then TP1, then TP2) and its low
+    last, which is only guaranteed right when the low can't reach any stop
+    the trade could have during the bar, or when the stop was already fixed
+    at the start of the bar and no target is in reach.
+    """
+    raised = max(sl_price, max(high_since_entry, high) - sl_offset)
+    tp1_now = not tp1_hit and high >= tp1_price
+    # After a TP1 fill the stop moves to entry and keeps trailing from there.
+    if low > (max(raised, entry_price) if tp1_now else raised):
+        return False
+    if tp1_now or high >= tp2_price:
+        return True
+    return raised > sl_price
+
+
+class IntrabarResolver:
+    """
+    Finer-grained prices for the bars of a coarse backtest whose hit order is
+    ambiguous (see is_ambiguous). Holds time-sorted fine (time, high, low)
+    columns (1m bars, or 1s bars aggregated from trades, memory-mapped from
+    the data store) and hands out the slice inside one coarse bar by binary
+    search on time, so only the pages around ambiguous bars are ever read.
+    Trade CSVs are aggregated on the first request, so a backtest without
+    ambiguous bars never touches them.
+
+    `bars_resolved` counts the coarse bars replayed and `rows_read` the fine
+    rows used for them.
+    """
+
+    def __init__(self, times=None, highs=None, lows=None, loader=None):
+        self._columns = None if loader is not None else (times, highs, lows)
+        self._loader = loader
+        self.bars_resolved = 0
+        self.rows_read = 0
+
+    @classmethod
+    def from_store(cls, source, store=None):
+        """The base bars of a store dataset (or of the CSV it was imported from), memory-mapped."""
+        store = store or DataStore()
+        arrays = store.load_arrays(resolve_dataset(source, store), columns=['time', 'high', 'low'])
+        return cls(arrays['time'], arrays['high'], arrays['low'])
+
+    @classmethod
+    def from_frame(cls, df):
+        times = df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        return cls(times, df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64))
+
+    @classmethod
+    def from_trades(cls, path, store=None, timeframe=TRADE_BARS):
+        """
+        A time-sorted time,price,quantity trades CSV (like data/ethusd_trade.csv).
+        On first use it is aggregated in chunks (core.tick_aggregator) into a
+        `<file name>_<timeframe>` store dataset, which is then memory-mapped like
+        from_store; later runs reuse the dataset until the CSV changes.
+        """
+        store = store or DataStore()
+        name = f"{os.path.splitext(os.path.basename(path))[0]}_{timeframe}"
+
+        def load():
+            from core.tick_aggregator import aggregate_trades
+            if store.needs_import(name, path):
+                aggregate_trades(path, {timeframe: name}, store)
+            arrays = store.load_arrays(name, columns=['time', 'high', 'low'])
+            return arrays['time'], arrays['high'], arrays['low']
+        return cls(loader=load)
+
+    @classmethod
+    def open(cls, source, store=None):
+        """from_trades for a CSV with a price column but no high, from_store for anything else."""
+        if source.endswith('.csv') and os.path.exists(source):
+            with open(source, 'r') as f:
+                header = f.readline().strip().split(',')
+            if 'price' in header and 'high' not in header:
+                return cls.from_trades(source, store)
+        return cls.from_store(source, store)
+
+    def path(self, start, end=None):
+        """
+        (high, low) of every fine row with start <= time < end (to the end of
+        the data if `end` is None), in time order; empty if there are none.
+        """
+        if self._columns is None:
+            self._columns = self._loader()
+        times, highs, lows = self._columns
+        lo = int(np.searchsorted(times, start, side='left'))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side='left'))
+        if hi <= lo:
+            return []
+        self.bars_resolved += 1
+        self.rows_read += hi - lo
+        return list(zip(np.asarray(highs[lo:hi]).tolist(), np.asarray(lows[lo:hi]).tolist()))
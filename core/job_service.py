@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from core.data_store import DataStore, load_ohlcv
+from core.optimizer import make_strategy
+from core.results_store import DEFAULT_RESULTS_DB, ResultsStore
+from core.search import optimize_split
+from core.trade_engine import TradeEngine
+
+# Points kept from an equity curve for the dashboard chart (see utils.plotting.downsample).
+CHART_WIDTH = 1500
+
+
+def data_version(source):
+    """
+    Changes whenever load_ohlcv(source) could return different bars. Cheap
+    enough for the UI thread: nothing is imported here, the worker does that.
+    A CSV is versioned by its stat alone, since the store entry imported from
+    it follows the file; the store entry counts when there is no CSV or when
+    bars fetched straight into the store win over it (see DataStore.needs_import).
+    """
+    parts = []
+    if os.path.exists(source):
+        stat = os.stat(source)
+        parts.append(f"file:{stat.st_mtime_ns}:{stat.st_size}")
+    store = DataStore()
+    name = source if source in store else os.path.splitext(os.path.basename(source))[0]
+    entry = store.catalog().get(name)
+    if entry and (not parts or entry.get('source', '').startswith('ccxt:')):
+        parts.append(f"store:{entry.get('rows')}:{entry.get('end')}")
+    return "|".join(parts)
+
+
+class Job:
+    """
+    One submitted backtest or optimization. `status` goes queued -> running ->
+    done (or failed, with the traceback in `error`); `progress` runs from 0 to 1
+    and every update is also appended to `events` as (seconds since submit,
+    progress, message), so a viewer can show the whole history or just the latest.
+    """
+
+    def __init__(self, kind, args, key):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.args = args
+        self.key = key
+        self.status = 'queued'
+        self.progress = 0.0
+        self.message = 'Queued'
+        self.events = []
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._cond = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ('done', 'failed')
+
+    def report(self, progress, message):
+        with self._cond:
+            self.progress = max(self.progress, min(float(progress), 1.0))
+            self.message = message
+            self.events.append((time.time() - self.submitted, self.progress, message))
+            self._cond.notify_all()
+
+    def _finish(self, status, result=None, error=None):
+        with self._cond:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished = time.time()
+            if status == 'done':
+                self.progress = 1.0
+            self.events.append((self.finished - self.submitted, self.progress, status))
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """Blocks until the job ends; returns its result or raises RuntimeError if it failed."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.done, timeout):
+                raise TimeoutError(f"Job {self.id} still {self.status}")
+        if self.status == 'failed':
+            raise RuntimeError(f"Job {self.id} failed:\n{self.error}")
+        return self.result
+
+    def stream(self, timeout=None):
+        """Yields (seconds, progress, message) events as they happen, until the job ends."""
+        seen = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self.events) > seen or self.done, timeout)
+                new, done = self.events[seen:], self.done
+            seen += len(new)
+            yield from new
+            if done and seen == len(self.events):
+                return
+
+
+def _equity_frame(engine, times):
+    """Equity curve as a (time, equity) frame, downsampled for charting."""
+    from utils.plotting import downsample
+
+    curve = engine.equity_curve.values
+    times = times[len(times) - len(curve):]
+    picks = downsample(curve, CHART_WIDTH)
+    return pd.DataFrame({'time': times[picks].view('datetime64[ns]'), 'equity': curve[picks]})
+
+
+def _frame_times(df):
+    return df['time'].to_numpy(dtype='datetime64[ns]').view('int64')
+
+
+def backtest_job(job, data, params, timeframe=None, mode='arrays'):
+    """Backtests one parameter set on all of `data`."""
+    job.report(0.05, f"Loading {data}")
+    df = load_ohlcv(data, timeframe=timeframe)
+    job.report(0.2, f"Backtesting {len(df)} bars")
+    engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
+    stats = engine.run_backtest(df, make_strategy(params), mode=mode)
+    return {'params': params, 'stats': stats, 'equity': _equity_frame(engine, _frame_times(df)),
+            'trades': engine.trade_log.to_frame()}
+
+
+def optimize_job(job, data, timeframe=None, search='grid', budget=24, seed=0, mode='arrays', workers=1,
+                 train_fraction=0.8, results_db=DEFAULT_RESULTS_DB, config_path=None):
+    """
+    scripts/optimize.py's single-split run (core.search.optimize_split):
+    search parameters on the first `train_fraction` of the data, then validate
+    the best set (by TotalPnL) on the rest. With `config_path` the best set is
+    saved there as well.
+    """
+    job.report(0.0, f"Loading {data}")
+    df = load_ohlcv(data, timeframe=timeframe)
+    store = ResultsStore(results_db) if results_db else None
+    try:
+        outcome = optimize_split(df, search, budget=budget, workers=workers, mode=mode, seed=seed,
+                                 results_store=store, dataset=data, train_fraction=train_fraction,
+                                 config_path=config_path, report=job.report)
+    finally:
+        if store is not None:
+            store.close()
+    if outcome['best_params'] is None:
+        return {'best_params': None, 'train_results': [], 'stats': None, 'equity': None, 'trades': None}
+    engine = outcome['engine']
+    return {
+        'best_params': outcome['best_params'],
+        'train_results': outcome['train_results'],
+        'stats': outcome['stats'],
+        'equity': _equity_frame(engine, _frame_times(outcome['df_test'])),
+        'trades': engine.trade_log.to_frame(),
+        'calls': outcome['calls'],
+        'cost': outcome['cost'],
+    }
+
+
+JOB_KINDS = {
+    'backtest': backtest_job,
+    'optimize': optimize_job,
+}
+
+
+class JobService:
+    """
+    Runs JOB_KINDS jobs on a small pool of background threads and hands back
+    Job objects to poll, wait on or stream. A job identical to one already
+    queued or running (same kind, arguments and data version) returns that
+    job instead of starting another, and the last `cache_size` finished jobs
+    are kept, so asking again for a finished job returns it instantly. The
+    last `cache_size` failed jobs stay visible through get(), but a
+    resubmission runs again. Each optimization can still spread its
+    backtests over `workers` processes via run_search.
+    """
+
+    def __init__(self, max_jobs=1, cache_size=32):
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._active = {}
+        self._finished = OrderedDict()
+        self._failed = OrderedDict()
+
+    @staticmethod
+    def job_key(kind, args):
+        return json.dumps({'kind': kind, 'args': args, 'data': data_version(args['data'])}, sort_keys=True,
+                          default=str)
+
+    def submit(self, kind, **args):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        key = self.job_key(kind, args)
+        with self._lock:
+            if key in self._active:
+                return self._active[key]
+            if key in self._finished:
+                self._finished.move_to_end(key)
+                return self._finished[key]
+            job = Job(kind, args, key)
+            self._jobs[job.id] = job
+            self._active[key] = job
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Every job this service still knows about, newest first."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.submitted, reverse=True)
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started = time.time()
+        job.report(0.0, 'Started')
+        try:
+            result = JOB_KINDS[job.kind](job, **job.args)
+        except Exception:
+            job._finish('failed', error=traceback.format_exc())
+        else:
+            job._finish('done', result=result)
+        with self._lock:
+            del self._active[job.key]
+            # Finished jobs by key, so resubmissions find them; failed ones by id, only to bound _jobs.
+            kept, key = (self._finished, job.key) if job.status == 'done' else (self._failed, job.id)
+            kept[key] = job
+            while len(kept) > self.cache_size:
+                evicted = kept.popitem(last=False)[1]
+                self._jobs.pop(evicted.id, None)
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
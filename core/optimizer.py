@@ -0,0 +1,155 @@
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.batch_engine import run_batch
+from core.shared_market import SharedMarket
+from core.trade_engine import TradeEngine
+from strategies.strategy import EthScalpStrategyOHLCV
+
+# --- Grid Search including the TP1 parameter ---
+# Keys double as the column names of the optimizer results table.
+PARAM_GRID = {
+    "RSI": [10, 15],
+    "TP_ATR": [4.0, 6.0],  # This is our final target (TP2)
+    "SL_ATR": [1.5, 2.0],
+    "Cooldown": [10, 20],
+    "ATR_Thresh": [0.1, 0.2],
+    "TP1_ATR": [1.5, 2.0],  # The first, closer take-profit (TP1)
+}
+
+
+def is_valid(params):
+    """TP1 has to be the closer target."""
+    return params["TP1_ATR"] < params["TP_ATR"]
+
+
+def build_grid(grid=PARAM_GRID):
+    """Cartesian product of the grid in nested-loop order, skipping combinations where TP1 >= TP2."""
+    combos = []
+    for values in itertools.product(*grid.values()):
+        params = dict(zip(grid.keys(), values))
+        if not is_valid(params):
+            continue
+        combos.append(params)
+    return combos
+
+
+def best_config(params):
+    """configs/best_config.json contents for a parameter set, as launcher/run_best_strategy.py reads them."""
+    return {
+        "rsi_threshold": int(params["RSI"]),
+        "tp_atr": float(params["TP_ATR"]),
+        "sl_atr": float(params["SL_ATR"]),
+        "cooldown_minutes": int(params["Cooldown"]),
+        "atr_threshold": float(params["ATR_Thresh"]),
+        "tp1_atr": float(params["TP1_ATR"]),
+    }
+
+
+def make_strategy(params, indicator_cache=None):
+    return EthScalpStrategyOHLCV(
+        rsi_threshold=params["RSI"],
+        tp_atr=params["TP_ATR"],
+        sl_atr=params["SL_ATR"],
+        cooldown_minutes=params["Cooldown"],
+        atr_threshold=params["ATR_Thresh"],
+        tp1_atr=params["TP1_ATR"],
+        indicator_cache=indicator_cache
+    )
+
+
+def load_strategy(config_path='configs/best_config.json'):
+    """
+    The strategy a best_config JSON file describes. Keys other than best_config's are
+    ignored, and files from before atr_threshold/tp1_atr were saved get their defaults.
+    Raises FileNotFoundError if there is no such file.
+    """
+    with open(config_path) as f:
+        config = json.load(f)
+    return EthScalpStrategyOHLCV(
+        rsi_threshold=config["rsi_threshold"],
+        tp_atr=config["tp_atr"],
+        sl_atr=config["sl_atr"],
+        cooldown_minutes=config["cooldown_minutes"],
+        atr_threshold=config.get("atr_threshold", 0.1),
+        tp1_atr=config.get("tp1_atr", 2.0),
+    )
+
+
+def evaluate(market, params, mode='arrays'):
+    """Backtests one parameter set on precomputed market arrays and returns params + final stats."""
+    engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
+    strategy = make_strategy(params)
+    if mode == 'events':
+        metrics = engine.run_backtest_events(market, strategy)
+    else:
+        metrics = engine.run_backtest_arrays(market, strategy)
+    return {**params, **metrics}
+
+
+# Set once per worker process by _init_worker.
+_worker_shm = None
+_worker_market = None
+
+
+def _init_worker(spec):
+    global _worker_shm, _worker_market
+    _worker_shm, _worker_market = SharedMarket.attach(spec)
+
+
+def _evaluate_chunk_on(market, chunk, mode):
+    if mode == 'batch':
+        return run_batch(market, chunk)
+    return [evaluate(market, params, mode) for params in chunk]
+
+
+def _evaluate_chunk(task):
+    chunk, mode = task
+    return _evaluate_chunk_on(_worker_market, chunk, mode)
+
+
+def run_grid(market, combos, workers=1, mode='arrays', chunk_size=None, on_chunk=None):
+    """
+    Evaluates every parameter set in `combos` against `market`. With workers > 1
+    the arrays are published once in shared memory and chunks of combinations
+    are spread over a process pool. mode='batch' simulates a whole chunk in one
+    pass with core.batch_engine.run_batch. Results always come back in `combos` order.
+    `on_chunk` is called with each chunk's results as soon as they are in, in order.
+    """
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(combos)) if combos else 1
+    if workers <= 1:
+        if on_chunk is None:
+            if mode == 'batch':
+                return run_batch(market, combos)
+            return [evaluate(market, params, mode) for params in combos]
+        chunk_size = chunk_size or 32
+        results = []
+        for i in range(0, len(combos), chunk_size):
+            chunk_results = _evaluate_chunk_on(market, combos[i:i + chunk_size], mode)
+            on_chunk(chunk_results)
+            results.extend(chunk_results)
+        return results
+
+    if chunk_size is None:
+        # A few chunks per worker keeps the pool busy without paying per-task IPC on every
+        # backtest. Batched chunks are one pass each, so give every worker a single big one.
+        chunks_per_worker = 1 if mode == 'batch' else 4
+        chunk_size = max(1, math.ceil(len(combos) / (workers * chunks_per_worker)))
+    tasks = [(combos[i:i + chunk_size], mode) for i in range(0, len(combos), chunk_size)]
+
+    shared = SharedMarket.publish(market)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            results = []
+            for chunk_results in pool.map(_evaluate_chunk, tasks):
+                if on_chunk is not None:
+                    on_chunk(chunk_results)
+                results.extend(chunk_results)
+    finally:
+        shared.release()
+    return results
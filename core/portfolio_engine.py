@@ -0,0 +1,307 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from core import instrumentation
+from core.stats import summarize
+from core.trade_engine import TradeEngine
+from core.trade_log import TRADE_DTYPE, TYPE_CODES, TradeLog
+
+# Per-symbol columns of an aligned panel (see align_markets).
+PANEL_COLUMNS = ('high', 'low', 'close', 'ATR', 'RSI', 'prev_RSI', 'SMA200')
+
+
+def _prepare_symbol(task):
+    source, strategy, timeframe = task
+    if isinstance(source, str):
+        from core.data_store import load_ohlcv
+        source = load_ohlcv(source, timeframe=timeframe)
+    elif timeframe is not None:
+        from core.bar_pyramid import rollup_frame
+        source = rollup_frame(source, timeframe)
+    return TradeEngine.market_arrays(source, strategy)
+
+
+def prepare_markets(sources, strategy, timeframe=None, workers=1):
+    """
+    {symbol: market arrays} (TradeEngine.market_arrays) for {symbol: CSV path,
+    data store dataset name or OHLCV DataFrame}. Symbols are loaded and their
+    indicators computed in a process pool of `workers` (0 or None = all cores).
+    """
+    symbols = list(sources)
+    tasks = [(sources[symbol], strategy, timeframe) for symbol in symbols]
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks)) if tasks else 1
+    with instrumentation.stage('prepare_markets'):
+        if workers <= 1:
+            markets = [_prepare_symbol(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                markets = list(pool.map(_prepare_symbol, tasks))
+    return dict(zip(symbols, markets))
+
+
+def align_markets(markets):
+    """
+    Puts per-symbol market arrays on the union of their bar times: one
+    (bars, symbols) float64 matrix per PANEL_COLUMNS column, NaN where a symbol
+    has no bar. `prev_RSI` is each symbol's RSI on its own previous bar and
+    `bar` its own bar number (-1 where missing), so entry signals and the
+    warm-up skip work exactly as on the symbol alone, gaps or not.
+    """
+    symbols = list(markets)
+    times = np.unique(np.concatenate([markets[symbol]['time'] for symbol in symbols]))
+    n, k = len(times), len(symbols)
+    panel = {'time': times, 'symbols': symbols, 'bar': np.full((n, k), -1, dtype=np.int32)}
+    for col in PANEL_COLUMNS:
+        panel[col] = np.full((n, k), np.nan)
+    for j, symbol in enumerate(symbols):
+        market = markets[symbol]
+        rows = np.searchsorted(times, market['time'])
+        for col in PANEL_COLUMNS:
+            if col == 'prev_RSI':
+                panel[col][rows[1:], j] = market['RSI'][:-1]
+            else:
+                panel[col][rows, j] = market[col]
+        panel['bar'][rows, j] = np.arange(len(rows), dtype=np.int32)
+    return panel
+
+
+def panel_signals(panel, strategy, start_index=200):
+    """strategy.entry_signals for every symbol of the panel, False before each symbol's warm-up ends."""
+    rsi, threshold = panel['RSI'], strategy.rsi_threshold
+    return ((panel['close'] > panel['SMA200']) & (panel['prev_RSI'] < threshold) & (rsi >= threshold)
+            & (panel['ATR'] > strategy.atr_threshold) & (panel['bar'] >= start_index))
+
+
+def run_portfolio(panel, strategy, starting_equity=1000, fees_pct=0.001, risk_per_trade=0.01, max_positions=None,
+                  max_total_risk=None, start_index=200):
+    """
+    Backtests `strategy` on every symbol of an aligned panel (align_markets)
+    from one shared pool of capital. Each symbol follows TradeEngine's
+    TP1/TP2/trailing-SL/cooldown rules with its state in per-symbol vectors,
+    and all symbols step through the common bars together. Positions are
+    sized off the shared (realised) equity, so with one symbol this gives the
+    same trades, curve and stats as TradeEngine.
+
+    Entries compete for capacity: at most `max_positions` open at once, and
+    (as a fraction of equity) at most `max_total_risk` lost if every open
+    position hit its current stop. Signals on the same bar are taken in
+    symbol order, so list symbols in order of preference; the rest are
+    counted as SkippedEntries. Exits on a bar are booked before its entries.
+
+    Returns {'stats', 'equity_curve', 'times', 'open_positions', 'trade_log',
+    'trade_symbols', 'symbols'}: the curve has the starting equity and then
+    one point per bar from the first bar any symbol can trade, and
+    trade_symbols gives each trade log row's index into `symbols`.
+    """
+    started = time.perf_counter()
+    times = panel['time']
+    highs, lows, closes, atrs = panel['high'], panel['low'], panel['close'], panel['ATR']
+    n, k = highs.shape
+    signals = panel_signals(panel, strategy, start_index)
+    any_signal = signals.any(axis=1)
+    warm = np.flatnonzero((panel['bar'] == start_index).any(axis=1))
+    first = int(warm[0]) if len(warm) else n
+    offset = 1 - first  # curve position of bar i is offset + i
+
+    cooldown_ns = pd.Timedelta(minutes=strategy.cooldown_minutes).value
+    tp2_atr, trailing_sl_atr = strategy.tp2_atr, strategy.trailing_sl_atr
+    slots = k if max_positions is None else max_positions
+
+    equity = float(starting_equity)
+    curve = np.full(max(n - first, 0) + 1, np.nan)
+    curve[0] = equity
+    in_trade = np.zeros(k, dtype=bool)
+    tp1_hit = np.zeros(k, dtype=bool)
+    cooldown_end = np.full(k, np.iinfo(np.int64).min, dtype=np.int64)
+    entry_price = np.zeros(k)
+    tp1_price = np.zeros(k)
+    tp2_price = np.zeros(k)
+    sl_price = np.zeros(k)
+    sl_offset = np.zeros(k)
+    high_since_entry = np.zeros(k)
+    position_size = np.zeros(k)
+    open_position_size = np.zeros(k)
+    trade_id = np.zeros(k, dtype=np.int64)
+    trade_pnl = np.zeros(k)
+    next_trade_id = 0
+    skipped = 0
+
+    # Exits and trades are collected as small per-bar arrays and assembled at the end.
+    log_parts = []
+    closed_pnl = []
+    positions = []  # (curve position opened, curve position closed or None)
+    open_count = 0
+
+    def log_exits(t, idx, kinds, exit_prices, gains, fees, sizes):
+        part = np.empty(len(idx), dtype=TRADE_DTYPE)
+        part['time'] = t
+        part['type'] = kinds
+        part['trade_id'] = trade_id[idx]
+        part['entry'] = entry_price[idx]
+        part['exit'] = exit_prices
+        part['gain'] = gains
+        part['fee'] = fees
+        part['position_size'] = sizes
+        log_parts.append((part, idx))
+
+    for i in range(first, n):
+        if not open_count and not any_signal[i]:
+            continue
+        t = int(times[i])
+        equity_before = equity
+        # Entries are decided on the state at the start of the bar, like TradeEngine's bar loop.
+        entering = ~in_trade & (t >= cooldown_end) & signals[i] if any_signal[i] else None
+
+        if open_count:
+            high, low = highs[i], lows[i]
+            # fmax: a symbol with no bar here (NaN) keeps its running high.
+            high_since_entry = np.where(in_trade, np.fmax(high_since_entry, high), high_since_entry)
+            sl_price = np.where(in_trade, np.maximum(sl_price, high_since_entry - sl_offset), sl_price)
+
+            tp1_now = in_trade & ~tp1_hit & (high >= tp1_price)
+            if tp1_now.any():
+                idx = np.flatnonzero(tp1_now)
+                size_to_sell = position_size[idx] / 2
+                trade_fee = (tp1_price[idx] * size_to_sell) * fees_pct
+                net_gain_loss = (tp1_price[idx] - entry_price[idx]) * size_to_sell - trade_fee
+                log_exits(t, idx, TYPE_CODES['win_tp1'], tp1_price[idx], net_gain_loss, trade_fee, size_to_sell)
+                for gain in net_gain_loss.tolist():
+                    equity += gain
+                open_position_size[idx] -= size_to_sell
+                trade_pnl[idx] += net_gain_loss
+                tp1_hit[idx] = True
+                sl_price[idx] = entry_price[idx]
+
+            exit_tp2 = in_trade & (high >= tp2_price)
+            exiting = exit_tp2 | (in_trade & (low <= sl_price))
+            if exiting.any():
+                idx = np.flatnonzero(exiting)
+                at_tp2 = exit_tp2[idx]
+                exit_price = np.where(at_tp2, tp2_price[idx], sl_price[idx])
+                trade_fee = (exit_price * open_position_size[idx]) * fees_pct
+                net_gain_loss = (exit_price - entry_price[idx]) * open_position_size[idx] - trade_fee
+                kinds = np.where(at_tp2, TYPE_CODES['win_tp2'],
+                                 np.where(tp1_hit[idx], TYPE_CODES['breakeven_sl'], TYPE_CODES['loss']))
+                log_exits(t, idx, kinds, exit_price, net_gain_loss, trade_fee, open_position_size[idx])
+                for gain in net_gain_loss.tolist():
+                    equity += gain
+                closed_pnl.append(trade_pnl[idx] + net_gain_loss)
+                for j in idx.tolist():
+                    positions[trade_id[j]][1] = offset + i
+                trade_pnl[idx] = 0.0
+                in_trade[idx] = False
+                cooldown_end[idx] = t + cooldown_ns
+                open_count -= len(idx)
+
+        if entering is not None and entering.any():
+            idx = np.flatnonzero(entering)
+            price, atr = closes[i, idx], atrs[i, idx]
+            new_tp1, new_tp2, new_sl = strategy.get_exit_levels({'ATR': atr}, price)
+            risk_per_unit = price - new_sl
+            with np.errstate(divide='ignore', invalid='ignore'):
+                new_size = np.where(risk_per_unit > 0, (equity * risk_per_trade) / risk_per_unit, 0.0)
+            take = min(len(idx), max(slots - open_count, 0))
+            if max_total_risk is not None:
+                open_risk = float((np.maximum(entry_price - sl_price, 0.0) * open_position_size)[in_trade].sum())
+                total = open_risk + np.cumsum(new_size * np.maximum(risk_per_unit, 0.0))
+                take = min(take, int(np.searchsorted(total, max_total_risk * equity, side='right')))
+            skipped += len(idx) - take
+            idx, price = idx[:take], price[:take]
+            new_tp1, new_tp2, new_sl, new_size = new_tp1[:take], new_tp2[:take], new_sl[:take], new_size[:take]
+
+            entry_price[idx] = price
+            tp1_price[idx] = new_tp1
+            tp2_price[idx] = new_tp2
+            sl_price[idx] = new_sl
+            sl_offset[idx] = ((new_tp2 - price) / tp2_atr if tp2_atr > 0 else 0) * trailing_sl_atr
+            high_since_entry[idx] = price
+            position_size[idx] = new_size
+            open_position_size[idx] = new_size
+            tp1_hit[idx] = False
+            in_trade[idx] = True
+            trade_id[idx] = np.arange(next_trade_id, next_trade_id + take)
+            next_trade_id += take
+            positions.extend([offset + i, None] for _ in range(take))
+            open_count += take
+
+        if equity != equity_before:
+            curve[offset + i] = equity
+
+    # Forward-fill the curve between equity changes.
+    filled = np.where(np.isnan(curve), 0, np.arange(len(curve)))
+    curve = curve[np.maximum.accumulate(filled)]
+
+    # Bars with each number of positions open (a trade open at the end runs to the last point).
+    end = len(curve) - 1
+    open_by_bar = np.zeros(len(curve) + 1, dtype=np.int64)
+    for opened, closed in positions:
+        open_by_bar[opened] += 1
+        open_by_bar[end if closed is None else closed] -= 1
+    open_by_bar = np.cumsum(open_by_bar)[:end]
+
+    # A position still open at the end counts as a trade if its TP1 partial made it into the log.
+    pnls = np.concatenate(closed_pnl + [trade_pnl[in_trade & tp1_hit]]) if closed_pnl or in_trade.any() else np.empty(0)
+    n_returns = end
+    diffs = np.diff(curve)
+    mean = (curve[-1] - curve[0]) / n_returns if n_returns else 0.0
+    m2 = max(float(diffs @ diffs) - n_returns * mean * mean, 0.0)
+    peak = np.maximum.accumulate(curve)
+    drawdown = peak - curve
+    stats = summarize(starting_equity, equity, n_returns, mean, m2, float((diffs[diffs < 0] ** 2).sum()),
+                      drawdown.max(), (np.where(peak > 0, drawdown / peak, 0.0)).max(), len(pnls),
+                      int((pnls > 0).sum()), float(pnls[pnls > 0].sum()), float(-pnls[pnls <= 0].sum()),
+                      int(np.count_nonzero(open_by_bar)))
+    stats['AvgOpenPositions'] = round(float(open_by_bar.mean()), 2) if n_returns else 0
+    stats['MaxOpenPositions'] = int(open_by_bar.max()) if n_returns else 0
+    stats['SkippedEntries'] = skipped
+
+    log = TradeLog.from_array(np.concatenate([part for part, _ in log_parts]) if log_parts else
+                              np.empty(0, dtype=TRADE_DTYPE))
+    trade_symbols = (np.concatenate([idx for _, idx in log_parts]) if log_parts else np.empty(0, dtype=np.int64))
+
+    instr = instrumentation.active()
+    if instr is not None:
+        instr.record('bar_loop', time.perf_counter() - started)
+        instr.count('backtests')
+        instr.count('bars', int((panel['bar'] >= start_index).sum()))
+        instr.count('signals', np.count_nonzero(signals))
+        instr.count('entries', next_trade_id)
+        instr.count('skipped_entries', skipped)
+    return {
+        'stats': stats,
+        'equity_curve': curve,
+        # The starting point is stamped with the bar before the first traded one, like TradeEngine's curve.
+        'times': np.r_[times[max(first - 1, 0)], times[first:]],
+        'open_positions': open_by_bar,
+        'trade_log': log,
+        'trade_symbols': trade_symbols.astype(np.int32),
+        'symbols': list(panel['symbols']),
+    }
+
+
+def symbol_summary(result):
+    """Trades, win rate, PnL and fees per symbol of a run_portfolio result, best PnL first."""
+    log, symbols = result['trade_log'], result['symbols']
+    if len(log) == 0:
+        return pd.DataFrame(columns=['symbol', 'trades', 'win_rate', 'pnl', 'fees'])
+    ids, inverse = np.unique(log['trade_id'], return_inverse=True)
+    trade_pnl = np.bincount(inverse, weights=log['gain'], minlength=len(ids))
+    trade_symbol = np.zeros(len(ids), dtype=np.int64)
+    trade_symbol[inverse] = result['trade_symbols']
+    k = len(symbols)
+    trades = np.bincount(trade_symbol, minlength=k)
+    wins = np.bincount(trade_symbol, weights=trade_pnl > 0, minlength=k)
+    df = pd.DataFrame({
+        'symbol': symbols,
+        'trades': trades,
+        'win_rate': np.round(np.divide(wins * 100, trades, out=np.zeros(k), where=trades > 0), 2),
+        'pnl': np.round(np.bincount(result['trade_symbols'], weights=log['gain'], minlength=k), 2),
+        'fees': np.round(np.bincount(result['trade_symbols'], weights=log['fee'], minlength=k), 2),
+    })
+    return df.sort_values('pnl', ascending=False, ignore_index=True)
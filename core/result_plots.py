@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.optimizer import PARAM_GRID, make_strategy
+from core.shared_market import SharedMarket
+from core.trade_engine import TradeEngine
+from utils.plotting import render_equity_curve
+
+
+def result_plot_name(params):
+    return "equity_" + "_".join(f"{key}{params[key]:g}" for key in PARAM_GRID) + ".png"
+
+
+# Set once per worker process by _init_worker.
+_worker_shm = None
+_worker_market = None
+
+
+def _init_worker(spec):
+    global _worker_shm, _worker_market
+    _worker_shm, _worker_market = SharedMarket.attach(spec)
+
+
+def _render_on(market, params, out_dir, method):
+    engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
+    stats = engine.run_backtest_arrays(market, make_strategy(params))
+    title = ", ".join(f"{key} {params[key]:g}" for key in PARAM_GRID)
+    path = os.path.join(out_dir, result_plot_name(params))
+    times = market['time'][len(market['time']) - len(engine.equity_curve):].view('datetime64[ns]')
+    render_equity_curve(engine.equity_curve, path, times=times, title=f"{title}  (PnL {stats['TotalPnL']:.2f})",
+                        method=method)
+    return path
+
+
+def _render_task(task):
+    return _render_on(_worker_market, *task)
+
+
+def render_results(market, combos, out_dir='logs/plots', workers=1, method='minmax'):
+    """
+    Backtests every parameter set in `combos` (e.g. the top rows of the results
+    store) on `market` and saves its equity curve to `out_dir`, spreading the
+    backtests and rendering over a process pool that shares one copy of the
+    market arrays. Returns the PNG paths in `combos` order.
+    """
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(combos)) if combos else 1
+    tasks = [({key: params[key] for key in PARAM_GRID}, out_dir, method) for params in combos]
+    if workers <= 1:
+        return [_render_on(market, *task) for task in tasks]
+    shared = SharedMarket.publish(market)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            return list(pool.map(_render_task, tasks))
+    finally:
+        shared.release()
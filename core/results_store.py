@@ -0,0 +1,189 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from core.optimizer import run_grid
+
+DEFAULT_RESULTS_DB = os.path.join("data", "optimizer_results.sqlite")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Files whose behaviour decides a backtest's result. Editing any of them invalidates stored results.
+_CODE_FILES = {
+    'single': ('core/trade_engine.py', 'core/stats.py', 'strategies/strategy.py', 'core/optimizer.py'),
+    'batch': ('core/batch_engine.py', 'core/stats.py', 'strategies/strategy.py', 'core/optimizer.py'),
+}
+
+# Bumped when the stored metrics' encoding changes, so rows in the old encoding are never served.
+# 2: non-finite metrics stored as "inf" / "-inf" / "nan" instead of null.
+_FORMAT_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    data_fp TEXT NOT NULL,
+    code_hash TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    params TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    dataset TEXT,
+    bars INTEGER,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (data_fp, code_hash, engine, params)
+)
+"""
+
+
+def market_fingerprint(market):
+    """Content hash of precomputed market arrays (prices and indicators), see TradeEngine.market_arrays."""
+    h = hashlib.blake2b(digest_size=16)
+    for col in sorted(market):
+        h.update(col.encode())
+        h.update(np.ascontiguousarray(market[col]).tobytes())
+    return h.hexdigest()
+
+
+def engine_name(mode):
+    # rows/arrays/events give identical results; the batch engine is separate code.
+    return 'batch' if mode == 'batch' else 'single'
+
+
+def code_hash(mode='arrays'):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"format{_FORMAT_VERSION}".encode())
+    for path in _CODE_FILES[engine_name(mode)]:
+        with open(os.path.join(_ROOT, path), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def params_key(params):
+    """Canonical text form of a parameter set, so 10 and 10.0 are the same key."""
+    return json.dumps({key: float(value) for key, value in params.items()}, sort_keys=True)
+
+
+def _jsonable(value):
+    value = value.item() if isinstance(value, np.generic) else value
+    # SQLite's JSON functions reject Infinity (ProfitFactor with no losing trades), so store it as text.
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    return value
+
+
+_NON_FINITE = ('inf', '-inf', 'nan')
+
+
+def _decode_metrics(text):
+    """Stored metrics JSON back into the dict a fresh run returns (see _jsonable)."""
+    return {key: float(value) if value in _NON_FINITE else value for key, value in json.loads(text).items()}
+
+
+# A stored metric as a sortable SQL number: "inf" above every number, "nan" (NULL) below.
+_METRIC_SQL = ("CASE json_extract(metrics, {0}) WHEN 'inf' THEN 9e999 WHEN '-inf' THEN -9e999 "
+               "WHEN 'nan' THEN NULL ELSE json_extract(metrics, {0}) END")
+
+
+class ResultsStore:
+    """
+    SQLite table of optimizer results keyed by (data fingerprint, code hash,
+    engine, parameter set). Lookups let a rerun backtest only parameter sets
+    it hasn't seen on this exact data with this exact code, and results are
+    written chunk by chunk so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, path=DEFAULT_RESULTS_DB):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Walk-forward workers write from several processes; wait on the lock instead of failing.
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, data_fp, code, engine, combos):
+        """{params_key: metrics} for the parameter sets in `combos` that are already stored."""
+        keys = [params_key(params) for params in combos]
+        found = {}
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT params, metrics FROM results WHERE data_fp = ? AND code_hash = ? AND engine = ? "
+                f"AND params IN ({','.join('?' * len(batch))})", [data_fp, code, engine, *batch])
+            found.update((key, _decode_metrics(metrics)) for key, metrics in rows)
+        return found
+
+    def put_many(self, data_fp, code, engine, results, param_keys, dataset=None, bars=None):
+        now = time.time()
+        rows = []
+        for result in results:
+            params = {key: result[key] for key in param_keys}
+            metrics = {key: _jsonable(value) for key, value in result.items() if key not in params}
+            rows.append((data_fp, code, engine, params_key(params), json.dumps(metrics), dataset, bars, now))
+        self.conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+
+    def top(self, n=10, metric='TotalPnL', dataset=None, data_fp=None, code=None, min_trades=None, where=None):
+        """
+        Best `n` stored results by `metric`, optionally filtered by dataset, data
+        fingerprint, code hash, a minimum trade count and exact parameter values
+        (`where`, e.g. {'RSI': 10}). Each row is params + metrics + its key fields.
+        """
+        clauses, args = [], []
+        for column, value in (('dataset', dataset), ('data_fp', data_fp), ('code_hash', code)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if min_trades is not None:
+            clauses.append("json_extract(metrics, '$.TotalTrades') >= ?")
+            args.append(min_trades)
+        for key, value in (where or {}).items():
+            clauses.append("json_extract(params, ?) = ?")
+            args.extend([f"$.{key}", float(value)])
+        sql = "SELECT params, metrics, dataset, bars, data_fp, code_hash, engine, created_at FROM results"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY " + _METRIC_SQL.format('?') + " DESC LIMIT ?"
+        rows = self.conn.execute(sql, [*args, f"$.{metric}", f"$.{metric}", n])
+        return [{**json.loads(params), **_decode_metrics(metrics), 'dataset': dataset, 'bars': bars, 'data_fp': data_fp,
+                 'code_hash': code, 'engine': engine, 'created_at': created}
+                for params, metrics, dataset, bars, data_fp, code, engine, created in rows]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+def cached_run_grid(market, combos, store, workers=1, mode='arrays', chunk_size=None, dataset=None, on_chunk=None):
+    """
+    run_grid that skips every parameter set `store` already has a result for on
+    this market data and code, and stores new results as each chunk finishes.
+    Results come back in `combos` order with the same shape as run_grid's.
+    `on_chunk` sees only the newly backtested chunks, after they are stored.
+    """
+    if not combos:
+        return []
+    data_fp, code, engine = market_fingerprint(market), code_hash(mode), engine_name(mode)
+    param_keys = list(combos[0])
+    bars = len(market['close'])
+    known = store.get_many(data_fp, code, engine, combos)
+    todo = [params for params in combos if params_key(params) not in known]
+    store.hits += len(combos) - len(todo)
+    store.misses += len(todo)
+
+    if todo:
+        def save(chunk_results):
+            store.put_many(data_fp, code, engine, chunk_results, param_keys, dataset=dataset, bars=bars)
+            if on_chunk is not None:
+                on_chunk(chunk_results)
+        for result in run_grid(market, todo, workers=workers, mode=mode, chunk_size=chunk_size, on_chunk=save):
+            params = {key: result[key] for key in param_keys}
+            known[params_key(params)] = {key: value for key, value in result.items() if key not in params}
+    return [{**params, **known[params_key(params)]} for params in combos]
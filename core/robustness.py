@@ -0,0 +1,158 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Largest (simulations x steps) block simulated at once. Blocks that stay in cache beat one huge
+# block by almost 2x (every metric is a pass over it), and bigger runs are split into chunks of this size.
+CHUNK_ELEMENTS = 250_000
+
+
+def trade_pnls(trade_log):
+    """Net PnL of every trade in exit order, adding up a trade's partial exits (core.trade_log.TradeLog)."""
+    if len(trade_log) == 0:
+        return np.empty(0)
+    ids, first, inverse = np.unique(trade_log['trade_id'], return_index=True, return_inverse=True)
+    pnls = np.bincount(inverse, weights=trade_log['gain'], minlength=len(ids))
+    return pnls[np.argsort(first, kind='stable')]
+
+
+def period_returns(equity_curve, bars_per_period=1440):
+    """Equity changes summed over consecutive `bars_per_period`-bar periods (one day of 1m bars by default)."""
+    changes = np.diff(np.asarray(equity_curve, dtype=np.float64))
+    if len(changes) == 0:
+        return changes
+    starts = np.arange(0, len(changes), bars_per_period)
+    return np.add.reduceat(changes, starts)
+
+
+def path_metrics(steps, sharpe=True):
+    """
+    final_pnl, max_drawdown and sharpe (mean over standard deviation of a
+    step, like get_final_stats' per-bar Sharpe) of every row of `steps`, each
+    row one simulated sequence of PnL steps starting from zero.
+    """
+    cumulative = np.cumsum(steps, axis=1)
+    drawdown = np.maximum.accumulate(cumulative, axis=1)
+    np.maximum(drawdown, 0.0, out=drawdown)
+    np.subtract(drawdown, cumulative, out=drawdown)
+    metrics = {'final_pnl': cumulative[:, -1].copy(), 'max_drawdown': drawdown.max(axis=1)}
+    if sharpe:
+        metrics['sharpe'] = steps.mean(axis=1) / (steps.std(axis=1) + 1e-9)
+    return metrics
+
+
+def shuffle_trades(pnls, rng, n):
+    """The same trades in `n` random orders: final PnL and Sharpe are fixed, drawdown is what varies."""
+    metrics = path_metrics(rng.permuted(np.broadcast_to(pnls, (n, len(pnls))), axis=1), sharpe=False)
+    metrics['sharpe'] = np.full(n, pnls.mean() / (pnls.std() + 1e-9))
+    return metrics
+
+
+def skip_trades(pnls, rng, n, skip_prob=0.1):
+    """Each trade independently missed with probability `skip_prob` (missed fills, downtime)."""
+    taken = rng.random((n, len(pnls))) >= skip_prob
+    steps = np.where(taken, pnls, 0.0)
+    metrics = path_metrics(steps, sharpe=False)
+    # Sharpe over the trades actually taken, not the zero placeholders.
+    count = np.maximum(taken.sum(axis=1), 1)
+    mean = steps.sum(axis=1) / count
+    var = np.maximum((steps * steps).sum(axis=1) / count - mean * mean, 0.0)
+    metrics['sharpe'] = mean / (np.sqrt(var) + 1e-9)
+    return metrics
+
+
+def block_bootstrap(returns, rng, n, block=5):
+    """
+    Circular block bootstrap: `n` return series as long as `returns`, each built
+    from randomly placed runs of `block` consecutive periods, which keeps
+    short-range dependence (winning and losing streaks) that a plain
+    per-period resample would break up.
+    """
+    length = len(returns)
+    block = max(1, min(block, length))
+    n_blocks = -(-length // block)
+    starts = rng.integers(0, length, size=(n, n_blocks, 1))
+    index = ((starts + np.arange(block)) % length).reshape(n, -1)[:, :length]
+    return path_metrics(returns[index])
+
+
+SIMULATIONS = {
+    'shuffle': shuffle_trades,
+    'skip': skip_trades,
+    'bootstrap': block_bootstrap,
+}
+
+
+def _simulate_chunk(task):
+    name, data, n, seed, options = task
+    return SIMULATIONS[name](data, np.random.default_rng(seed), n, **options)
+
+
+def simulate(name, data, n_sims, seed=0, workers=1, **options):
+    """
+    Runs `n_sims` of SIMULATIONS[name] over `data` (trade PnLs, or period
+    returns for 'bootstrap') in chunks of about CHUNK_ELEMENTS numbers. Each
+    chunk gets its own child of `seed`, so results don't depend on `workers`.
+    Returns {'final_pnl', 'max_drawdown', 'sharpe'} arrays of length n_sims.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if len(data) == 0 or n_sims <= 0:
+        return {key: np.zeros(max(n_sims, 0)) for key in ('final_pnl', 'max_drawdown', 'sharpe')}
+    chunk = max(1, CHUNK_ELEMENTS // len(data))
+    sizes = [min(chunk, n_sims - start) for start in range(0, n_sims, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(name, data, size, child, options) for size, child in zip(sizes, seeds)]
+
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        parts = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, tasks))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def run_robustness(trade_log, equity_curve, n_sims=10000, seed=0, workers=1, skip_prob=0.1, block=5,
+                   bars_per_period=1440):
+    """
+    Trade-order shuffles, random trade skips and a block bootstrap of period
+    returns for one backtest (a TradeEngine's trade_log and equity_curve).
+    Returns {simulation: (actual metrics, simulated metric arrays)}.
+    """
+    pnls = trade_pnls(trade_log)
+    returns = period_returns(equity_curve, bars_per_period)
+    runs = {
+        'shuffle': (pnls, {}),
+        'skip': (pnls, {'skip_prob': skip_prob}),
+        'bootstrap': (returns, {'block': block}),
+    }
+    results = {}
+    for i, (name, (data, options)) in enumerate(runs.items()):
+        actual = {key: float(values[0]) for key, values in path_metrics(data[None, :]).items()} if len(data) else {}
+        results[name] = (actual, simulate(name, data, n_sims, seed=seed + i, workers=workers, **options))
+    return results
+
+
+def summarize_robustness(results, percentiles=(5, 25, 50, 75, 95)):
+    """
+    One row per (simulation, metric): the actual value, the simulated
+    percentiles, where the actual value ranks among the simulations and, for
+    final PnL, the share of simulations that lost money.
+    """
+    rows = []
+    for name, (actual, sims) in results.items():
+        for metric, values in sims.items():
+            row = {'simulation': name, 'metric': metric, 'actual': actual.get(metric)}
+            row.update({f"p{p}": value for p, value in zip(percentiles, np.percentile(values, percentiles))})
+            if metric in actual:
+                # With a little slack, so a metric a simulation can't change (shuffled final PnL) ranks 0, not noise.
+                slack = 1e-9 * max(1.0, abs(actual[metric]))
+                row['actual_rank_pct'] = float((values < actual[metric] - slack).mean() * 100)
+            if metric == 'final_pnl':
+                row['prob_loss_pct'] = float((values < 0).mean() * 100)
+            rows.append(row)
+    return pd.DataFrame(rows)
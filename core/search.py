@@ -0,0 +1,393 @@
+import json
+import math
+
+import numpy as np
+
+from core import instrumentation
+from core.indicator_cache import IndicatorCache
+from core.optimizer import PARAM_GRID, best_config, build_grid, is_valid, make_strategy, run_grid
+from core.results_store import cached_run_grid
+from core.trade_engine import TradeEngine
+
+# Continuous ranges around PARAM_GRID for the samplers: (low, high) tuples are
+# sampled uniformly (as ints when both ends are ints), lists are categorical.
+SEARCH_SPACE = {
+    "RSI": (5, 30),
+    "TP_ATR": (2.0, 8.0),
+    "SL_ATR": (1.0, 3.0),
+    "Cooldown": (0, 60),
+    "ATR_Thresh": (0.05, 0.4),
+    "TP1_ATR": (1.0, 3.0),
+}
+
+
+def sample_params(space, rng, max_tries=100):
+    """One random valid parameter set from `space`."""
+    for _ in range(max_tries):
+        params = {}
+        for key, spec in space.items():
+            if isinstance(spec, list):
+                params[key] = spec[rng.integers(len(spec))]
+            elif isinstance(spec[0], int) and isinstance(spec[1], int):
+                params[key] = int(rng.integers(spec[0], spec[1] + 1))
+            else:
+                params[key] = round(float(rng.uniform(spec[0], spec[1])), 2)
+        if is_valid(params):
+            return params
+    raise ValueError("Search space has no valid parameter sets")
+
+
+def _is_finite(space):
+    return all(isinstance(spec, list) for spec in space.values())
+
+
+def _key(params):
+    return tuple(params.values())
+
+
+class Evaluator:
+    """
+    Backtests parameter sets on the first `bars` bars of the training arrays.
+    Indicators are causal, so a prefix of the precomputed arrays is exactly
+    what a backtest on the shorter frame would see. Counts backtest calls and
+    their cost in full-length backtests, and never repeats an evaluation.
+    With a core.results_store.ResultsStore, results from earlier runs are reused
+    instead of backtested again (they still count, so a rerun repeats the same search).
+    `on_progress(calls, cost)` is called as each chunk of backtests finishes.
+    """
+
+    def __init__(self, market, workers=1, mode='arrays', metric='TotalPnL', results_store=None, dataset=None,
+                 on_progress=None):
+        self.market = market
+        self.on_progress = on_progress
+        self.results_store = results_store
+        self.dataset = dataset
+        self.workers = workers
+        self.mode = mode
+        self.metric = metric
+        self.n_bars = len(market['close'])
+        self.calls = 0
+        self.cost = 0.0
+        self.trials = []  # (bars, result) of every backtest run, in order
+        self._seen = {}
+
+    def score(self, result):
+        return (result[self.metric], result['Sharpe'])
+
+    def bars_for(self, fraction):
+        # The engine skips the first 200 bars while SMA200 warms up.
+        return min(self.n_bars, max(int(self.n_bars * fraction), 1000))
+
+    def __call__(self, combos, fraction=1.0):
+        bars = self.bars_for(fraction)
+        todo = [params for params in combos if (_key(params), bars) not in self._seen]
+        if todo:
+            market = {col: values[:bars] for col, values in self.market.items()}
+            on_chunk = None
+            finished = 0
+            if self.on_progress is not None:
+                def on_chunk(chunk_results):
+                    nonlocal finished
+                    finished += len(chunk_results)
+                    self.on_progress(self.calls + finished, self.cost + finished * bars / self.n_bars)
+            if self.results_store is None:
+                results = run_grid(market, todo, workers=self.workers, mode=self.mode, on_chunk=on_chunk)
+            else:
+                results = cached_run_grid(market, todo, self.results_store, workers=self.workers, mode=self.mode,
+                                          dataset=self.dataset, on_chunk=on_chunk)
+            for params, result in zip(todo, results):
+                self._seen[(_key(params), bars)] = result
+                self.trials.append((bars, result))
+            self.calls += len(todo)
+            self.cost += len(todo) * bars / self.n_bars
+            if self.on_progress is not None and finished < len(todo):
+                self.on_progress(self.calls, self.cost)  # results store hits never went through on_chunk
+        return [self._seen[(_key(params), bars)] for params in combos]
+
+    def full_results(self):
+        """Every parameter set that was run on the whole training set."""
+        return [result for bars, result in self.trials if bars == self.n_bars]
+
+
+class GridSearch:
+    """The exhaustive grid, as before: every combination on the full training set."""
+
+    def __init__(self, space=PARAM_GRID, budget=None, seed=0):
+        self.space = space
+
+    def run(self, evaluate):
+        evaluate(build_grid(self.space))
+
+
+class RandomSearch:
+    """`budget` random parameter sets, each on the full training set."""
+
+    def __init__(self, space=SEARCH_SPACE, budget=16, seed=0):
+        self.space = space
+        self.budget = budget
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, evaluate):
+        n = max(1, int(self.budget))
+        if _is_finite(self.space):
+            grid = build_grid(self.space)
+            combos = [grid[i] for i in self.rng.permutation(len(grid))[:n]]
+        else:
+            combos = [sample_params(self.space, self.rng) for _ in range(n)]
+        evaluate(combos)
+
+
+class SuccessiveHalving:
+    """
+    Starts many random parameter sets on a short slice of the training data
+    (`min_fraction` of it), keeps the best 1/eta and re-runs those on an
+    eta-times longer slice, until the survivors run on all of it. `budget` is
+    in full-length backtests and sets how many parameter sets start.
+    """
+
+    def __init__(self, space=SEARCH_SPACE, budget=16, seed=0, eta=3, min_fraction=1 / 9):
+        self.space = space
+        self.budget = budget
+        self.eta = eta
+        self.min_fraction = min_fraction
+        self.rng = np.random.default_rng(seed)
+
+    def rungs(self, min_fraction):
+        fractions = []
+        fraction = min_fraction
+        while fraction < 1.0 - 1e-9:
+            fractions.append(fraction)
+            fraction *= self.eta
+        return fractions + [1.0]
+
+    def run(self, evaluate):
+        rungs = self.rungs(self.min_fraction)
+        # Every rung costs about n * min_fraction full backtests.
+        n = max(self.eta, int(self.budget / (self.min_fraction * len(rungs))))
+        self.run_bracket(evaluate, self._candidates(n), rungs)
+
+    def run_bracket(self, evaluate, combos, rungs):
+        for fraction in rungs:
+            results = evaluate(combos, fraction)
+            if fraction == 1.0:
+                break
+            keep = max(1, len(combos) // self.eta)
+            order = sorted(range(len(combos)), key=lambda i: evaluate.score(results[i]), reverse=True)
+            combos = [combos[i] for i in order[:keep]]
+
+    def _candidates(self, n):
+        if _is_finite(self.space):
+            grid = build_grid(self.space)
+            return [grid[i] for i in self.rng.permutation(len(grid))[:n]]
+        combos, seen = [], set()
+        for _ in range(n * 10):
+            params = sample_params(self.space, self.rng)
+            if _key(params) not in seen:
+                seen.add(_key(params))
+                combos.append(params)
+            if len(combos) == n:
+                break
+        return combos
+
+
+class Hyperband(SuccessiveHalving):
+    """
+    Runs successive-halving brackets from aggressive (many sets, short first
+    slice) to conservative (few sets, full data only) and repeats them until
+    the budget is spent, so a metric that is noisy on short slices can't
+    prune every good set.
+    """
+
+    def run(self, evaluate):
+        s_max = max(0, round(math.log(1 / self.min_fraction, self.eta)))
+        brackets = []
+        for s in range(s_max, -1, -1):
+            n = math.ceil((s_max + 1) / (s + 1) * self.eta ** s)
+            brackets.append((n, self.eta ** -s))
+        while True:
+            cost_before = evaluate.cost
+            for n, min_fraction in brackets:
+                rungs = self.rungs(min_fraction)
+                planned = sum(max(1, n // self.eta ** i) * f for i, f in enumerate(rungs))
+                if evaluate.cost > 0 and evaluate.cost + planned > self.budget:
+                    return
+                self.run_bracket(evaluate, self._candidates(n), rungs)
+            if evaluate.cost == cost_before:
+                return  # a small discrete space has nothing new left to try
+
+
+class TPESearch(SuccessiveHalving):
+    """
+    Tree-structured Parzen estimator: after `n_startup` random sets, new sets
+    are drawn where earlier good results (top `gamma` on the full training set)
+    are dense and poor ones are sparse, one parameter at a time. Each set runs
+    on growing slices and is dropped at a slice where it scores below the
+    median of everything seen at that slice. `batch_size` sets run together so
+    a worker pool stays busy.
+    """
+
+    def __init__(self, space=SEARCH_SPACE, budget=16, seed=0, eta=3, min_fraction=1 / 9,
+                 n_startup=8, gamma=0.25, n_candidates=24, batch_size=4):
+        super().__init__(space, budget, seed, eta, min_fraction)
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.batch_size = batch_size
+        self.history = []  # (params, score on the full set, or None if pruned)
+
+    def run(self, evaluate):
+        rungs = self.rungs(self.min_fraction)
+        rung_scores = {fraction: [] for fraction in rungs}
+        seen = set()
+        worst_case = self.batch_size * sum(rungs)
+        while evaluate.cost == 0 or evaluate.cost + worst_case <= self.budget:
+            combos = []
+            for attempt in range(self.batch_size * 10):
+                if len(self.history) >= self.n_startup and attempt < self.batch_size * 2:
+                    params = self._propose()
+                else:
+                    params = sample_params(self.space, self.rng)
+                if _key(params) not in seen:
+                    seen.add(_key(params))
+                    combos.append(params)
+                if len(combos) == self.batch_size:
+                    break
+            if not combos:
+                return
+
+            for fraction in rungs:
+                results = evaluate(combos, fraction)
+                scores = [evaluate.score(r) for r in results]
+                if fraction == 1.0:
+                    self.history.extend(zip(combos, scores))
+                    break
+                past = rung_scores[fraction]
+                median = sorted(past)[len(past) // 2] if past else None
+                past.extend(scores)
+                alive = [i for i, score in enumerate(scores) if median is None or score >= median]
+                self.history.extend((combos[i], None) for i in range(len(combos)) if i not in alive)
+                combos = [combos[i] for i in alive]
+                if not combos:
+                    break
+
+    def _propose(self):
+        finished = sorted((s, i) for i, (_, s) in enumerate(self.history) if s is not None)
+        n_good = max(1, int(math.ceil(self.gamma * len(finished))))
+        good_ids = {i for _, i in finished[-n_good:]}
+        good = [p for i, (p, _) in enumerate(self.history) if i in good_ids]
+        bad = [p for i, (p, _) in enumerate(self.history) if i not in good_ids]
+
+        best, best_ratio = None, -math.inf
+        for _ in range(self.n_candidates):
+            params = {key: self._sample_near(spec, [p[key] for p in good]) for key, spec in self.space.items()}
+            if not is_valid(params):
+                continue
+            ratio = sum(math.log(self._density(spec, [p[key] for p in good], params[key]))
+                        - math.log(self._density(spec, [p[key] for p in bad], params[key]))
+                        for key, spec in self.space.items())
+            if ratio > best_ratio:
+                best, best_ratio = params, ratio
+        return best if best is not None else sample_params(self.space, self.rng)
+
+    def _sample_near(self, spec, values):
+        if isinstance(spec, list):
+            weights = np.array([1.0 + values.count(v) for v in spec])
+            return spec[self.rng.choice(len(spec), p=weights / weights.sum())]
+        low, high = spec
+        center = values[self.rng.integers(len(values))]
+        value = min(high, max(low, self.rng.normal(center, self._bandwidth(spec, values))))
+        return int(round(value)) if isinstance(low, int) and isinstance(high, int) else round(float(value), 2)
+
+    def _density(self, spec, values, x):
+        # Parzen estimate with a uniform prior mixed in, so unexplored values never score zero.
+        if isinstance(spec, list):
+            return (1.0 + values.count(x)) / (len(spec) + len(values))
+        low, high = spec
+        prior = 1.0 / (high - low)
+        if not values:
+            return prior
+        sigma = self._bandwidth(spec, values)
+        kernel = np.exp(-0.5 * ((x - np.array(values, dtype=float)) / sigma) ** 2) / (sigma * math.sqrt(2 * math.pi))
+        return (prior + kernel.sum()) / (len(values) + 1)
+
+    @staticmethod
+    def _bandwidth(spec, values):
+        low, high = spec
+        return (high - low) / max(1.0, len(values)) ** 0.5 * 0.3
+
+
+SEARCHERS = {
+    'grid': GridSearch,
+    'random': RandomSearch,
+    'halving': SuccessiveHalving,
+    'hyperband': Hyperband,
+    'tpe': TPESearch,
+}
+
+
+def run_search(market, search='grid', budget=16, space=None, workers=1, mode='arrays', seed=0, metric='TotalPnL',
+               results_store=None, dataset=None, on_progress=None):
+    """
+    Runs one of SEARCHERS over `market` and returns (full-training-set results,
+    evaluator). Results have the same shape as run_grid's; the evaluator holds
+    every trial (including pruned short-slice ones) and the call/cost counters.
+    """
+    if search not in SEARCHERS:
+        raise ValueError(f"Unknown search: {search}")
+    if space is None:
+        space = PARAM_GRID if search == 'grid' else SEARCH_SPACE
+    evaluate = Evaluator(market, workers=workers, mode=mode, metric=metric, results_store=results_store,
+                         dataset=dataset, on_progress=on_progress)
+    SEARCHERS[search](space, budget=budget, seed=seed).run(evaluate)
+    return evaluate.full_results(), evaluate
+
+
+def optimize_split(df, search='grid', budget=24, workers=1, mode='arrays', seed=0, results_store=None,
+                   dataset=None, train_fraction=0.8, config_path=None, indicator_cache=None, report=None):
+    """
+    The optimization scripts/optimize.py and the dashboard's job service both
+    run: search parameters on the first `train_fraction` of `df`, save the
+    best set (by TotalPnL) to `config_path` as best_config JSON if given, then
+    backtest it on the unseen rest. `report(progress, message)` hears about
+    every step, including the search's progress, with progress from 0 to 1.
+
+    Returns {'best_params', 'config', 'train_results' (ranked), 'stats',
+    'engine', 'df_train', 'df_test', 'calls', 'cost'}; 'best_params',
+    'config', 'stats' and 'engine' are None if no parameter set finished.
+    """
+    report = report or (lambda progress, message: None)
+    split_point = int(len(df) * train_fraction)
+    df_train, df_test = df.iloc[:split_point], df.iloc[split_point:]
+    # RSI/ATR/SMA200 don't depend on the parameters: computed once for every parameter set.
+    with instrumentation.stage('prepare'):
+        market = TradeEngine.market_arrays(df_train, make_strategy(build_grid()[0],
+                                                                   indicator_cache or IndicatorCache()))
+
+    total = len(build_grid()) if search == 'grid' else budget
+
+    def on_progress(calls, cost):
+        done = calls if search == 'grid' else cost
+        report(0.05 + 0.85 * min(done / total, 1.0), f"{calls} backtests ({cost:.1f} full-length equivalents)")
+
+    report(0.05, f"Running {search} search on {len(df_train)} training bars ({workers} worker(s))")
+    with instrumentation.stage('search'):
+        results, evaluator = run_search(market, search, budget=budget, workers=workers, mode=mode, seed=seed,
+                                        results_store=results_store, dataset=dataset, on_progress=on_progress)
+    outcome = {'best_params': None, 'config': None, 'train_results': [], 'stats': None, 'engine': None,
+               'df_train': df_train, 'df_test': df_test, 'calls': evaluator.calls, 'cost': evaluator.cost}
+    if not results:
+        return outcome
+
+    ranked = sorted(results, key=lambda r: r['TotalPnL'], reverse=True)
+    best_params = {key: ranked[0][key] for key in PARAM_GRID}
+    config = best_config(best_params)
+    if config_path:
+        with open(config_path, 'w') as f:
+            json.dump(config, f, indent=2)
+
+    report(0.92, f"Validating the best parameters on {len(df_test)} unseen bars")
+    engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
+    with instrumentation.stage('validation'):
+        stats = engine.run_backtest(df_test, make_strategy(best_params), mode='arrays' if mode == 'batch' else mode)
+    outcome.update(best_params=best_params, config=config, train_results=ranked, stats=stats, engine=engine)
+    return outcome
@@ -0,0 +1,49 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Keep every column cache-line aligned inside the shared block.
+_ALIGN = 64
+
+
+class SharedMarket:
+    """
+    Publishes a dict of market arrays (see TradeEngine.market_arrays) in a single
+    shared memory block. Worker processes attach by name using `spec`, so the
+    bars and indicators are never pickled per task.
+    """
+
+    def __init__(self, shm, spec):
+        self.shm = shm
+        self.spec = spec
+
+    @classmethod
+    def publish(cls, market):
+        layout = []
+        offset = 0
+        for name, values in market.items():
+            values = np.ascontiguousarray(values)
+            layout.append((name, values.dtype.str, offset, values.shape))
+            offset += -(-values.nbytes // _ALIGN) * _ALIGN
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, dtype, start, shape in layout:
+            target = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+            target[...] = market[name]
+            del target
+        return cls(shm, {'name': shm.name, 'layout': layout})
+
+    @staticmethod
+    def attach(spec):
+        """Returns (shm, market) where market holds read-only views into the shared block."""
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        market = {}
+        for name, dtype, start, shape in spec['layout']:
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+            view.flags.writeable = False
+            market[name] = view
+        return shm, market
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
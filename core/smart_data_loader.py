@@ -1,11 +1,11 @@
-import pandas as pd
-import os
+from core.data_store import DataStore
 
-def list_data_files(prefix):
-    return sorted([
-        f for f in os.listdir("data") 
-        if f.startswith(prefix) and f.endswith(".csv")
-    ])
+def list_datasets(exchange):
+    # New or changed CSVs are converted into data/store once; after that the
+    # catalog is the source of truth and loads are memory-mapped.
+    store = DataStore()
+    store.sync_csv_dir("data")
+    return store, store.list_datasets(exchange=exchange)
 
 def load_market_data():
     print("📊 Select data source:")
@@ -14,34 +14,28 @@ def load_market_data():
     choice = input("Enter 1 or 2: ").strip()
 
     if choice == "1":
-        files = list_data_files("eth_usd_kraken")
-        print("\nAvailable Kraken files:")
+        store, files = list_datasets("kraken")
+        print("\nAvailable Kraken datasets:")
     elif choice == "2":
-        files = list_data_files("eth_usd_coingecko")
-        print("\nAvailable CoinGecko files:")
+        store, files = list_datasets("coingecko")
+        print("\nAvailable CoinGecko datasets:")
     else:
         print("❌ Invalid choice.")
         return None
 
     for i, f in enumerate(files):
-        print(f"[{i}] {f}")
+        meta = store.info(f)
+        print(f"[{i}] {f}  ({meta.get('timeframe')}, {meta['rows']} rows, {meta['start']} -> {meta['end']})")
     
     index = input("Select file number: ").strip()
     if not index.isdigit() or int(index) not in range(len(files)):
         print("❌ Invalid selection.")
         return None
 
-    filepath = os.path.join("data", files[int(index)])
-    print(f"\n📂 Loading: {filepath}")
-    df = pd.read_csv(filepath, parse_dates=['time'])
+    name = files[int(index)]
+    print(f"\n📂 Loading: {name}")
+    # Price-only CoinGecko files were already expanded to OHLCV on import.
+    df = store.load_frame(name)
     df.set_index('time', inplace=True)
 
-    if "open" not in df.columns:
-        # Assume CoinGecko price-only data
-        df.rename(columns={"price": "close"}, inplace=True)
-        df["open"] = df["close"]
-        df["high"] = df["close"]
-        df["low"] = df["close"]
-        df["volume"] = 0.0  # filler
-
     return df
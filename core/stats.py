@@ -0,0 +1,239 @@
+import math
+
+import numpy as np
+
+
+class EquityBuffer:
+    """
+    Preallocated float64 equity curve. Grows by doubling, so appending is
+    amortised O(1) with no per-point Python objects, and `fill` writes a run of
+    identical values (flat stretches between trades) in one slice assignment.
+    Indexing, len(), iteration and np.asarray work like on the old list.
+
+    `drain` hands the points written so far to the caller and frees their
+    room, for streaming a long curve to disk; len() still counts them, so
+    curve positions stay global, while values and indexing only see the
+    points written since the last drain.
+    """
+
+    def __init__(self, capacity=1024):
+        self._data = np.empty(max(int(capacity), 1), dtype=np.float64)
+        self._size = 0
+        self._drained = 0
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            grown = np.empty(max(size, 2 * len(self._data)), dtype=np.float64)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def reserve(self, extra):
+        """Makes room for `extra` more points up front (e.g. one per bar of a backtest)."""
+        self._reserve(self._size + extra)
+
+    def append(self, value):
+        self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def fill(self, value, count):
+        self._reserve(self._size + count)
+        self._data[self._size:self._size + count] = value
+        self._size += count
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self._reserve(self._size + len(values))
+        self._data[self._size:self._size + len(values)] = values
+        self._size += len(values)
+
+    def drain(self):
+        """Removes and returns (as a copy) the points written since the last drain."""
+        drained = self._data[:self._size].copy()
+        self._drained += self._size
+        self._size = 0
+        return drained
+
+    @property
+    def values(self):
+        """Read-only view of the points written so far (since the last drain)."""
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def tolist(self):
+        return self._data[:self._size].tolist()
+
+    def __len__(self):
+        return self._drained + self._size
+
+    def __getitem__(self, item):
+        return self.values[item]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+
+def summarize(starting_equity, equity, n_returns, mean, m2, downside_sq, max_drawdown, max_drawdown_pct,
+              trades, wins, gross_profit, gross_loss, bars_in_market):
+    """
+    The stats dict every engine returns. Sharpe and Sortino are per bar (mean
+    equity change over its standard / downside deviation), like the original
+    get_final_stats Sharpe; Exposure is the percentage of bars with a position open.
+    """
+    if trades == 0:
+        return {'TotalTrades': 0, 'WinRate': 0, 'TotalPnL': 0, 'Sharpe': 0, 'Sortino': 0, 'MaxDrawdown': 0,
+                'MaxDrawdownPct': 0, 'ProfitFactor': 0, 'Exposure': 0}
+    std = math.sqrt(m2 / n_returns) if n_returns else 0.0
+    downside = math.sqrt(downside_sq / n_returns) if n_returns else 0.0
+    if gross_loss > 0:
+        profit_factor = round(gross_profit / gross_loss, 2)
+    else:
+        profit_factor = math.inf if gross_profit > 0 else 0.0
+    return {
+        'TotalTrades': int(trades),
+        'WinRate': round(wins / trades * 100, 2),
+        'TotalPnL': round(float(equity - starting_equity), 2),
+        'Sharpe': round(float(mean / (std + 1e-9)), 2),
+        'Sortino': round(float(mean / (downside + 1e-9)), 2),
+        'MaxDrawdown': round(float(max_drawdown), 2),
+        'MaxDrawdownPct': round(float(max_drawdown_pct) * 100, 2),
+        'ProfitFactor': profit_factor,
+        'Exposure': round(bars_in_market / n_returns * 100, 2) if n_returns else 0,
+    }
+
+
+class PerformanceStats:
+    """
+    Equity curve plus O(1) running accumulators for everything get_final_stats
+    reports: Welford mean/variance of the per-bar equity changes, downside
+    deviation, running peak and max drawdown, and per-trade PnL keyed by trade
+    id (so two trades that happen to share an entry price stay separate).
+
+    Engines call `hold(equity, bars)` once per run of bars with unchanged
+    equity rather than once per bar, and open_trade/fill/close_trade as
+    positions change, so the final stats are ready the moment a run ends.
+    """
+
+    def __init__(self, starting_equity, capacity=1024):
+        self.starting_equity = starting_equity
+        self.curve = EquityBuffer(capacity)
+        self.curve.append(starting_equity)
+        self.last = starting_equity
+        self.n_returns = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside_sq = 0.0
+        self.peak = starting_equity
+        self.max_drawdown = 0.0
+        self.max_drawdown_pct = 0.0
+        self.trades = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.bars_in_market = 0
+        self.next_trade_id = 0
+        self.open_trade_id = None
+        self.open_since = 0
+        self.open_pnl = 0.0
+        self.open_filled = False
+
+    def hold(self, equity, bars=1):
+        """Appends `bars` curve points at `equity`: one (possibly non-zero) change followed by bars-1 zeros."""
+        if bars <= 0:
+            return
+        self.curve.fill(equity, bars)
+        diff = equity - self.last
+        self.n_returns += 1
+        delta = diff - self.mean
+        self.mean += delta / self.n_returns
+        self.m2 += delta * (diff - self.mean)
+        if diff < 0:
+            self.downside_sq += diff * diff
+        zeros = bars - 1
+        if zeros:
+            # Chan et al. merge of `zeros` observations of 0.0 into the running mean/M2.
+            n = self.n_returns + zeros
+            delta = -self.mean
+            self.m2 += delta * delta * self.n_returns * zeros / n
+            self.mean += delta * zeros / n
+            self.n_returns = n
+        if diff:
+            self.last = equity
+            if equity > self.peak:
+                self.peak = equity
+            drawdown = self.peak - equity
+            if drawdown > self.max_drawdown:
+                self.max_drawdown = drawdown
+            if self.peak > 0 and drawdown / self.peak > self.max_drawdown_pct:
+                self.max_drawdown_pct = drawdown / self.peak
+
+    def open_trade(self, bar):
+        """Starts a trade at curve position `bar`; returns its trade id."""
+        self.open_trade_id = self.next_trade_id
+        self.next_trade_id += 1
+        self.open_since = bar
+        self.open_pnl = 0.0
+        self.open_filled = False
+        return self.open_trade_id
+
+    def fill(self, gain):
+        """A partial or final exit of the open trade realised `gain`."""
+        self.open_pnl += gain
+        self.open_filled = True
+
+    def close_trade(self, bar):
+        self._count_trade(self.open_pnl, bar - self.open_since)
+        self.open_trade_id = None
+
+    def _count_trade(self, pnl, bars):
+        self.trades += 1
+        self.bars_in_market += max(bars, 0)
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        else:
+            self.gross_loss -= pnl
+
+    def _trade_counts(self):
+        """(trades, wins, gross profit, gross loss, bars in market), counting an open trade as of now."""
+        trades, wins = self.trades, self.wins
+        gross_profit, gross_loss = self.gross_profit, self.gross_loss
+        bars_in_market = self.bars_in_market
+        if self.open_trade_id is not None:
+            # A position still open at the end counts if a partial exit was already logged.
+            if self.open_filled:
+                trades += 1
+                wins += self.open_pnl > 0
+                gross_profit += max(self.open_pnl, 0.0)
+                gross_loss += max(-self.open_pnl, 0.0)
+            bars_in_market += max(len(self.curve) - 1 - self.open_since, 0)
+        return trades, wins, gross_profit, gross_loss, bars_in_market
+
+    def extend(self, other):
+        """
+        Appends another run that started at this run's final equity (e.g. the
+        next walk-forward test window): its curve after the starting point is
+        replayed run by run, and its trades are added as of the end of that run.
+        """
+        values = other.curve.values[1:]
+        if len(values):
+            changes = np.flatnonzero(values[1:] != values[:-1]) + 1
+            starts = np.r_[0, changes]
+            ends = np.r_[changes, len(values)]
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.hold(float(values[start]), end - start)
+        trades, wins, gross_profit, gross_loss, bars_in_market = other._trade_counts()
+        self.trades += trades
+        self.wins += wins
+        self.gross_profit += gross_profit
+        self.gross_loss += gross_loss
+        self.bars_in_market += bars_in_market
+        self.next_trade_id += other.next_trade_id
+
+    def summary(self, equity=None):
+        return summarize(self.starting_equity, self.last if equity is None else equity, self.n_returns, self.mean,
+                         self.m2, self.downside_sq, self.max_drawdown, self.max_drawdown_pct, *self._trade_counts())
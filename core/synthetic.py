@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from core.fetch_engine import timeframe_to_ms
+
+# Per-bar log-return volatility of the calm, normal and stressed regimes (1m ETH is roughly 0.1%).
+DEFAULT_VOLS = (0.0004, 0.001, 0.0025)
+
+
+def iter_synthetic_ohlcv(n_bars, seed=0, start='2024-01-01', timeframe='1m', start_price=2500.0,
+                         vols=DEFAULT_VOLS, mean_regime_bars=2000, chunk_bars=1_000_000):
+    """
+    Yields OHLCV column-array chunks (time as epoch ns, like DataStore.load_arrays)
+    of a seeded random walk whose volatility switches between `vols` regimes,
+    each lasting an exponentially distributed number of bars. Chunks continue
+    the price and regime of the one before, so any length is generated in
+    bounded memory. The same arguments always give the same bars.
+    """
+    rng = np.random.default_rng(seed)
+    vols = np.asarray(vols, dtype=np.float64)
+    step = timeframe_to_ms(timeframe) * 1_000_000
+    t0 = pd.Timestamp(start).value
+    price = float(start_price)
+    regime, remaining = 1 % len(vols), 1 + int(rng.exponential(mean_regime_bars))
+
+    for first in range(0, n_bars, chunk_bars):
+        m = min(chunk_bars, n_bars - first)
+        regimes = np.empty(m, dtype=np.int8)
+        filled = 0
+        while filled < m:
+            take = min(remaining, m - filled)
+            regimes[filled:filled + take] = regime
+            filled += take
+            remaining -= take
+            if remaining == 0:
+                regime = (regime + int(rng.integers(1, len(vols)))) % len(vols) if len(vols) > 1 else regime
+                remaining = 1 + int(rng.exponential(mean_regime_bars))
+
+        sigma = vols[regimes]
+        close = price * np.exp(np.cumsum(rng.standard_normal(m) * sigma))
+        open_ = np.empty(m)
+        open_[0] = price
+        open_[1:] = close[:-1]
+        # Wicks beyond the body scale with the regime's volatility.
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.standard_normal(m)) * sigma * 0.5)
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.standard_normal(m)) * sigma * 0.5)
+        volume = rng.lognormal(0.0, 0.5, m) * (sigma / vols.min())
+        price = float(close[-1])
+        yield {
+            'time': t0 + (first + np.arange(m, dtype=np.int64)) * step,
+            'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume,
+        }
+
+
+def synthetic_ohlcv(n_bars, seed=0, **kwargs):
+    """All of iter_synthetic_ohlcv's chunks in preallocated column arrays."""
+    columns = {'time': np.empty(n_bars, dtype=np.int64)}
+    for col in ('open', 'high', 'low', 'close', 'volume'):
+        columns[col] = np.empty(n_bars, dtype=np.float64)
+    pos = 0
+    for chunk in iter_synthetic_ohlcv(n_bars, seed, **kwargs):
+        m = len(chunk['time'])
+        for col, values in chunk.items():
+            columns[col][pos:pos + m] = values
+        pos += m
+    return columns
+
+
+def synthetic_frame(n_bars, seed=0, **kwargs):
+    """synthetic_ohlcv as the DataFrame TradeEngine.run_backtest takes (datetime `time` column)."""
+    columns = synthetic_ohlcv(n_bars, seed, **kwargs)
+    df = pd.DataFrame({col: columns[col] for col in ('open', 'high', 'low', 'close', 'volume')})
+    df.insert(0, 'time', columns['time'].view('datetime64[ns]'))
+    return df
@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.data_store import DataStore
+from core.fetch_engine import timeframe_to_ms
+
+_NS_PER_MS = 1_000_000
+DEFAULT_TIMEFRAMES = ('1m', '5m', '15m', '1h')
+_FIELDS = ('bucket', 'open', 'high', 'low', 'close', 'volume')
+
+
+def iter_trade_chunks(path, chunk_size=1_000_000):
+    """Yields (time_ns, price, quantity) arrays from a time,price,quantity CSV, `chunk_size` trades at a time."""
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        times = pd.to_datetime(chunk['time']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        yield times, chunk['price'].to_numpy(dtype=np.float64), chunk['quantity'].to_numpy(dtype=np.float64)
+
+
+class _BarBuilder:
+    """Bars for one timeframe. The last bar of each chunk stays open until a later trade closes it."""
+
+    def __init__(self, timeframe):
+        self.timeframe = timeframe
+        self.step = timeframe_to_ms(timeframe) * _NS_PER_MS
+        self.partial = None  # [bucket, open, high, low, close, volume]
+
+    def feed(self, times, prices, quantities):
+        buckets = times // self.step
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)]
+        bars = {
+            'bucket': buckets[starts],
+            'open': prices[starts],
+            'high': np.maximum.reduceat(prices, starts),
+            'low': np.minimum.reduceat(prices, starts),
+            'close': prices[ends - 1],
+            'volume': np.add.reduceat(quantities, starts),
+        }
+
+        if self.partial is not None:
+            bucket, open_, high, low, close, volume = self.partial
+            if bars['bucket'][0] == bucket:
+                # The chunk boundary split a bar: fold the carried part into the first group.
+                bars['open'][0] = open_
+                bars['high'][0] = max(high, bars['high'][0])
+                bars['low'][0] = min(low, bars['low'][0])
+                bars['volume'][0] = volume + bars['volume'][0]
+            else:
+                bars = {col: np.r_[value, bars[col]] for col, value in zip(_FIELDS, self.partial)}
+
+        self.partial = [bars[col][-1] for col in _FIELDS]
+        return self._to_arrays({col: values[:-1] for col, values in bars.items()})
+
+    def flush(self):
+        if self.partial is None:
+            return self.empty()
+        bars = {col: np.array([value]) for col, value in zip(_FIELDS, self.partial)}
+        self.partial = None
+        return self._to_arrays(bars)
+
+    def empty(self):
+        return self._to_arrays({col: np.empty(0) for col in _FIELDS})
+
+    def _to_arrays(self, bars):
+        arrays = {'time': bars['bucket'].astype(np.int64) * self.step}
+        for col in ('open', 'high', 'low', 'close', 'volume'):
+            arrays[col] = bars[col].astype(np.float64)
+        return arrays
+
+
+class TickAggregator:
+    """
+    Turns a stream of trades into OHLCV bars for several timeframes in one pass.
+    Trades arrive in chunks (from iter_trade_chunks, a memory-mapped array, or
+    a live feed) and are bucketed with vectorised reduceat calls per chunk. Only
+    the still-open bar of each timeframe is carried between chunks, so memory
+    is bounded by the chunk size, not the file size. Bar times are the bar's
+    open time in epoch ns, the same convention as the exchange candles in the
+    data store; minutes without trades produce no bar.
+    """
+
+    def __init__(self, timeframes=DEFAULT_TIMEFRAMES):
+        self.builders = {tf: _BarBuilder(tf) for tf in timeframes}
+        self.last_time = None
+        self.trades = 0
+
+    def feed(self, times, prices, quantities):
+        """Adds a chunk of time-ordered trades; returns {timeframe: arrays of bars completed by it}."""
+        times = np.asarray(times, dtype=np.int64)
+        if len(times) == 0:
+            return {tf: builder.empty() for tf, builder in self.builders.items()}
+        if np.any(times[1:] < times[:-1]) or (self.last_time is not None and times[0] < self.last_time):
+            raise ValueError("trades must be in time order")
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        self.last_time = int(times[-1])
+        self.trades += len(times)
+        return {tf: builder.feed(times, prices, quantities) for tf, builder in self.builders.items()}
+
+    def flush(self):
+        """Closes the open bar of every timeframe (end of file or end of session)."""
+        return {tf: builder.flush() for tf, builder in self.builders.items()}
+
+
+def aggregate_trades(path, names, store=None, chunk_size=1_000_000, **meta):
+    """
+    Streams a time,price,quantity trades CSV through a TickAggregator into data
+    store datasets ({timeframe: dataset name}), `chunk_size` trades at a time,
+    appending each chunk's completed bars. The datasets record the CSV as their
+    source (DataStore.needs_import). Returns the aggregator, for its trade count.
+    """
+    store = store or DataStore()
+    meta = {'source': os.path.abspath(path), 'source_mtime': os.path.getmtime(path), **meta}
+    aggregator = TickAggregator(tuple(names))
+    for tf, name in names.items():
+        # Start each dataset empty; completed bars are appended as chunks are processed.
+        store.write(name, aggregator.builders[tf].empty(), timeframe=tf, **meta)
+    for times, prices, quantities in iter_trade_chunks(path, chunk_size):
+        for tf, bars in aggregator.feed(times, prices, quantities).items():
+            store.append(names[tf], bars)
+    for tf, bars in aggregator.flush().items():
+        store.append(names[tf], bars)
+    return aggregator
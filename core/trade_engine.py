@@ -2,7 +2,12 @@ import pandas as pd
 import numpy as np
 from datetime import timedelta
 import os
-import matplotlib.pyplot as plt
+import time
+
+from core import instrumentation
+from core.intrabar import is_ambiguous
+from core.stats import PerformanceStats
+from core.trade_log import TYPE_CODES, TradeLog
 
 class TradeEngine:
     def __init__(self, starting_equity=1000, fees_pct=0.001, risk_per_trade=0.01):
@@ -10,9 +15,12 @@ class TradeEngine:
         self.fees_pct = fees_pct
         self.risk_per_trade = risk_per_trade
         self.equity = starting_equity
-        self.equity_curve = [self.starting_equity]
-        self.trade_log = []
+        # Preallocated equity curve plus running accumulators for get_final_stats.
+        self.stats = PerformanceStats(starting_equity)
+        self.equity_curve = self.stats.curve
+        self.trade_log = TradeLog()
         self.in_trade = False
+        self.entry_price = 0
         self.position_size = 0
         self.cooldown_end = None
         self.tp1_price = 0
@@ -21,19 +29,60 @@ class TradeEngine:
         self.high_since_entry = 0
         self.tp1_hit = False
         self.open_position_size = 0
+        # Bars of the last flat run that run_backtest_arrays(flush=False) left for the next call to write.
+        self._pending_bars = 0
+
+    def run_backtest(self, df, strategy, mode='rows', timeframe=None, intrabar=None):
+        # mode='arrays' runs the same state machine over NumPy arrays instead of df.iloc rows,
+        # mode='events' jumps straight from one entry/exit to the next.
+        # timeframe ('5m', '1h', ...) backtests on coarser bars: df may then also be a data
+        # store dataset name, whose cached rollup is used instead of resampling.
+        # intrabar (a core.intrabar.IntrabarResolver, or the 1m dataset / trades CSV to build
+        # one from) replays bars whose TP/SL hit order is ambiguous on the finer data.
+        # mode='chunked' streams df (or a data store dataset name / CSV path) through
+        # run_backtest_chunked without ever building indicator columns for all of it.
+        if intrabar is not None:
+            if mode not in ('arrays', 'events'):
+                raise ValueError("intrabar resolution needs mode='arrays' or 'events'")
+            if isinstance(intrabar, str):
+                from core.intrabar import IntrabarResolver
+                intrabar = IntrabarResolver.open(intrabar)
+        if mode == 'chunked':
+            from core.chunked import iter_dataset_chunks, iter_frame_chunks
+            if isinstance(df, str):
+                return self.run_backtest_chunked(iter_dataset_chunks(df, timeframe=timeframe), strategy)
+            if timeframe is not None:
+                from core.bar_pyramid import rollup_frame
+                df = rollup_frame(df, timeframe)
+            return self.run_backtest_chunked(iter_frame_chunks(df), strategy)
+        if timeframe is not None:
+            if isinstance(df, str):
+                from core.data_store import load_ohlcv
+                df = load_ohlcv(df, timeframe=timeframe)
+            else:
+                from core.bar_pyramid import rollup_frame
+                df = rollup_frame(df, timeframe)
+        if mode == 'arrays':
+            return self.run_backtest_arrays(self.market_arrays(df, strategy), strategy, intrabar=intrabar)
+        if mode == 'events':
+            return self.run_backtest_events(self.market_arrays(df, strategy), strategy, intrabar=intrabar)
+        if mode != 'rows':
+            raise ValueError(f"Unknown backtest mode: {mode}")
 
-    def run_backtest(self, df, strategy):
         df = strategy.prepare_indicators(df.copy())
+        instr, started, mark = instrumentation.active(), time.perf_counter(), self._run_mark()
         
-        entry_price = 0
+        entry_price = self.entry_price
         start_index = 200 
+        trade_id = self.stats.open_trade_id
+        self.equity_curve.reserve(len(df) - start_index)
 
         for i in range(start_index, len(df)):
             row = df.iloc[i]
             prev_row = df.iloc[i-1]
 
             if self.cooldown_end and row['time'] < self.cooldown_end:
-                self.equity_curve.append(self.equity)
+                self.stats.hold(self.equity)
                 continue
 
             signal = strategy.generate_signal(row, prev_row)
@@ -41,6 +90,7 @@ class TradeEngine:
                 entry_price = row['close']
                 self.in_trade = True
                 self.tp1_hit = False
+                trade_id = self.stats.open_trade(len(self.equity_curve))
                 
                 self.tp1_price, self.tp2_price, initial_sl_price = strategy.get_exit_levels(row, entry_price)
                 self.sl_price = initial_sl_price
@@ -55,7 +105,7 @@ class TradeEngine:
                     self.open_position_size = 0
 
                 self.high_since_entry = entry_price
-                self.equity_curve.append(self.equity)
+                self.stats.hold(self.equity)
                 continue
             
             if self.in_trade:
@@ -79,12 +129,10 @@ class TradeEngine:
                     self.open_position_size -= size_to_sell
                     self.tp1_hit = True
                     self.sl_price = entry_price
+                    self.stats.fill(net_gain_loss)
 
-                    self.trade_log.append({
-                        'time': row['time'], 'type': 'win_tp1', 'entry': entry_price,
-                        'exit': exit_price, 'gain': net_gain_loss, 'fee': trade_fee,
-                        'position_size': size_to_sell
-                    })
+                    self.trade_log.append(row['time'].value, 'win_tp1', entry_price, exit_price, net_gain_loss,
+                        trade_fee, size_to_sell, trade_id)
 
                 exit_price_final = 0
                 trade_type_final = ''
@@ -102,61 +150,434 @@ class TradeEngine:
                     net_gain_loss = total_gross_pnl - trade_fee
                     
                     self.equity += net_gain_loss
+                    self.stats.fill(net_gain_loss)
+                    self.stats.close_trade(len(self.equity_curve))
 
-                    self.trade_log.append({
-                        'time': row['time'], 'type': trade_type_final, 'entry': entry_price,
-                        'exit': exit_price_final, 'gain': net_gain_loss, 'fee': trade_fee,
-                        'position_size': self.open_position_size
-                    })
+                    self.trade_log.append(row['time'].value, trade_type_final, entry_price, exit_price_final,
+                                          net_gain_loss, trade_fee, self.open_position_size, trade_id)
                     self.in_trade = False
                     self.cooldown_end = row['time'] + timedelta(minutes=strategy.cooldown_minutes)
 
-            self.equity_curve.append(self.equity)
+            self.stats.hold(self.equity)
 
+        self.entry_price = entry_price
+        if instr is not None:
+            market = {col: df[col].to_numpy(dtype=np.float64) for col in ('close', 'RSI', 'ATR', 'SMA200')}
+            self._record_run(instr, started, mark, df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64),
+                             strategy.entry_signals(market), start_index, strategy)
         # The return value from run_backtest should be the final stats
         return self.get_final_stats()
 
-    def get_final_stats(self):
-        """Calculates and returns the final performance statistics."""
-        df_log = pd.DataFrame(self.trade_log)
-        # We consider a "trade" to be a full open-to-close cycle.
-        # Since we log partials, we count unique entry times.
-        total_trades = df_log['entry'].nunique()
-
-        if total_trades == 0:
-            return {'TotalTrades': 0, 'WinRate': 0, 'TotalPnL': 0, 'Sharpe': 0}
-
-        # A trade is a "win" if its net PnL is positive.
-        # We group by entry time to sum up partials.
-        trade_pnl = df_log.groupby('entry')['gain'].sum()
-        wins = len(trade_pnl[trade_pnl > 0])
-        winrate = (wins / total_trades) * 100 if total_trades > 0 else 0
-        pnl = self.equity - self.starting_equity
-        
-        diffs = np.diff(self.equity_curve)
-        sharpe = np.mean(diffs) / (np.std(diffs) + 1e-9)
+    @staticmethod
+    def market_arrays(df, strategy):
+        """Prepares indicators once and returns the columns the bar loop needs as contiguous arrays."""
+        df = strategy.prepare_indicators(df.copy())
+        market = {'time': df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)}
+        for col in ('high', 'low', 'close', 'ATR', 'RSI', 'SMA200'):
+            market[col] = np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+        return market
+
+    def run_backtest_arrays(self, market, strategy, start_index=200, intrabar=None, flush=True):
+        """
+        Same TP1/TP2/trailing-SL/cooldown logic as run_backtest, but over plain
+        Python scalars pulled out of `market` (see market_arrays). Produces the
+        same trade_log, equity_curve and stats as the row-by-row path.
+
+        With a core.intrabar.IntrabarResolver, a bar of an open trade whose
+        outcome depends on the order of its high and low is replayed over the
+        resolver's finer rows inside it, in time order, instead of assuming the
+        high came first. A bar spans one bar length (the smallest spacing
+        between bar times) from its time, cut short by the next bar, so a gap
+        in the coarse data never pulls in later prices. Exits keep the coarse bar's time.
+
+        flush=False leaves the flat run the data ends in unwritten, for the
+        next call (the next chunk of the same series, see run_backtest_chunked)
+        to continue, so the curve and stats come out bit for bit as from one
+        call over the whole series. The last call must flush.
+        """
+        instr, started, mark = instrumentation.active(), time.perf_counter(), self._run_mark()
+        times = market['time'].tolist()
+        highs = market['high'].tolist()
+        lows = market['low'].tolist()
+        closes = market['close'].tolist()
+        atrs = market['ATR'].tolist()
+        bar_ns = None
+        if intrabar is not None and len(times) > 1:
+            steps = np.diff(market['time'])
+            bar_ns = int(steps[steps > 0].min()) if (steps > 0).any() else None
+        entry_mask = strategy.entry_signals(market)
+        signals = entry_mask.tolist()
+
+        cooldown_ns = pd.Timedelta(minutes=strategy.cooldown_minutes).value
+        tp2_atr = strategy.tp2_atr
+        trailing_sl_atr = strategy.trailing_sl_atr
+        fees_pct = self.fees_pct
+
+        equity = self.equity
+        in_trade = self.in_trade
+        tp1_hit = self.tp1_hit
+        tp1_price, tp2_price, sl_price = self.tp1_price, self.tp2_price, self.sl_price
+        position_size = self.position_size
+        open_position_size = self.open_position_size
+        high_since_entry = self.high_since_entry
+        cooldown_end = self.cooldown_end.value if self.cooldown_end is not None else None
+        entry_price = self.entry_price
+
+        # The curve is written one run of unchanged equity at a time: `run_start` is the
+        # first bar of the current run and is flushed whenever equity is about to change.
+        # A run an earlier flush=False call left open continues from `pending` bars before start_index.
+        stats = self.stats
+        hold = stats.hold
+        pending, self._pending_bars = self._pending_bars, 0
+        self.equity_curve.reserve(max(len(times) - start_index, 0) + pending)
+        offset = len(self.equity_curve) + pending - start_index  # curve position of bar i is offset + i
+        trade_id = stats.open_trade_id
+        run_start = start_index - pending
+        log_append = self.trade_log.append
+
+        for i in range(start_index, len(times)):
+            t = times[i]
+            if cooldown_end is not None and t < cooldown_end:
+                continue
+
+            if not in_trade and signals[i]:
+                entry_price = closes[i]
+                in_trade = True
+                tp1_hit = False
+                trade_id = stats.open_trade(offset + i)
+
+                tp1_price, tp2_price, sl_price = strategy.get_exit_levels({'ATR': atrs[i]}, entry_price)
+
+                risk_per_unit = entry_price - sl_price
+                if risk_per_unit > 0:
+                    equity_to_risk = equity * self.risk_per_trade
+                    position_size = equity_to_risk / risk_per_unit
+                    open_position_size = position_size
+                else:
+                    position_size = 0
+                    open_position_size = 0
+
+                high_since_entry = entry_price
+                continue
+
+            if in_trade:
+                # The bar's (high, low), or the finer rows inside it when their order matters.
+                path = ((highs[i], lows[i]),)
+                if intrabar is not None:
+                    atr_at_entry = (tp2_price - entry_price) / tp2_atr if tp2_atr > 0 else 0
+                    if is_ambiguous(highs[i], lows[i], entry_price, high_since_entry, sl_price,
+                                    atr_at_entry * trailing_sl_atr, tp1_hit, tp1_price, tp2_price):
+                        end = t + bar_ns if bar_ns is not None else None
+                        if i + 1 < len(times):
+                            end = times[i + 1] if end is None else min(end, times[i + 1])
+                        path = intrabar.path(t, end) or path
+
+                for high, low in path:
+                    high_since_entry = max(high_since_entry, high)
+                    atr_at_entry = (tp2_price - entry_price) / tp2_atr if tp2_atr > 0 else 0
+                    new_sl_price = high_since_entry - (atr_at_entry * trailing_sl_atr)
+                    sl_price = max(sl_price, new_sl_price)
+
+                    if not tp1_hit and high >= tp1_price:
+                        exit_price = tp1_price
+                        size_to_sell = position_size / 2
+                        trade_fee = (exit_price * size_to_sell) * fees_pct
+                        net_gain_loss = (exit_price - entry_price) * size_to_sell - trade_fee
+
+                        hold(equity, i - run_start)
+                        run_start = i
+                        equity += net_gain_loss
+                        open_position_size -= size_to_sell
+                        tp1_hit = True
+                        sl_price = entry_price
+                        stats.fill(net_gain_loss)
+
+                        log_append(t, 'win_tp1', entry_price, exit_price, net_gain_loss,
+                            trade_fee, size_to_sell, trade_id)
+
+                    trade_type_final = ''
+                    if high >= tp2_price:
+                        exit_price_final = tp2_price
+                        trade_type_final = 'win_tp2'
+                    elif low <= sl_price:
+                        exit_price_final = sl_price
+                        trade_type_final = 'loss' if not tp1_hit else 'breakeven_sl'
+
+                    if trade_type_final:
+                        trade_fee = (exit_price_final * open_position_size) * fees_pct
+                        net_gain_loss = (exit_price_final - entry_price) * open_position_size - trade_fee
+
+                        hold(equity, i - run_start)
+                        run_start = i
+                        equity += net_gain_loss
+                        stats.fill(net_gain_loss)
+                        stats.close_trade(offset + i)
+
+                        log_append(t, trade_type_final, entry_price, exit_price_final, net_gain_loss,
+                            trade_fee, open_position_size, trade_id)
+                        in_trade = False
+                        cooldown_end = t + cooldown_ns
+                        break
 
-        stats = {
-            'TotalTrades': total_trades,
-            'WinRate': round(winrate, 2),
-            'TotalPnL': round(pnl, 2),
-            'Sharpe': round(sharpe, 2)
-        }
-        return stats
+        if flush:
+            hold(equity, len(times) - run_start)
+        else:
+            self._pending_bars = max(len(times) - run_start, 0)
+        self.equity = equity
+        self.in_trade = in_trade
+        self.entry_price = entry_price
+        self.tp1_hit = tp1_hit
+        self.tp1_price, self.tp2_price, self.sl_price = tp1_price, tp2_price, sl_price
+        self.position_size = position_size
+        self.open_position_size = open_position_size
+        self.high_since_entry = high_since_entry
+        self.cooldown_end = pd.Timestamp(cooldown_end) if cooldown_end is not None else None
+        if instr is not None:
+            self._record_run(instr, started, mark, market['time'], entry_mask, start_index, strategy)
+        return self.get_final_stats()
+
+    def run_backtest_events(self, market, strategy, start_index=200, intrabar=None):
+        """
+        Event-driven version of run_backtest_arrays. Entries come from the
+        vectorized entry mask, the next eligible one after the cooldown is found
+        with searchsorted on time, and each exit (TP1, TP2 or the ratcheting
+        trailing stop) is located with vectorized forward scans. Flat bars are
+        never visited, so the cost scales with the number of trades.
+        """
+        if self.in_trade or intrabar is not None:
+            # Resuming an open position, or replaying ambiguous bars, needs the bar-by-bar state machine.
+            return self.run_backtest_arrays(market, strategy, start_index, intrabar)
+
+        instr, started, mark = instrumentation.active(), time.perf_counter(), self._run_mark()
+        times = market['time']
+        highs = market['high']
+        lows = market['low']
+        closes = market['close']
+        atrs = market['ATR']
+        n = len(times)
+        signals = strategy.entry_signals(market)
+        signals[:start_index] = False
+        candidates = np.flatnonzero(signals)
+
+        cooldown_ns = pd.Timedelta(minutes=strategy.cooldown_minutes).value
+        tp2_atr = strategy.tp2_atr
+        trailing_sl_atr = strategy.trailing_sl_atr
+        fees_pct = self.fees_pct
+        equity = self.equity
+        cooldown_end = self.cooldown_end.value if self.cooldown_end is not None else None
+
+        # Equity is flat between exits, so the curve is written one run at a time.
+        stats = self.stats
+        self.equity_curve.reserve(max(n - start_index, 0))
+        offset = len(self.equity_curve) - start_index  # curve position of bar i is offset + i
+        run_start = start_index
+
+        pos = start_index
+        while pos < n:
+            if cooldown_end is not None:
+                pos = max(pos, int(np.searchsorted(times, cooldown_end, side='left')))
+            k = int(np.searchsorted(candidates, pos))
+            if k == len(candidates):
+                break
+            e = int(candidates[k])
+
+            entry_price = float(closes[e])
+            tp1_price, tp2_price, sl_price = strategy.get_exit_levels({'ATR': float(atrs[e])}, entry_price)
+            risk_per_unit = entry_price - sl_price
+            if risk_per_unit > 0:
+                position_size = (equity * self.risk_per_trade) / risk_per_unit
+            else:
+                position_size = 0
+            open_position_size = position_size
+            atr_at_entry = (tp2_price - entry_price) / tp2_atr if tp2_atr > 0 else 0
+            sl_offset = atr_at_entry * trailing_sl_atr
+
+            high_since_entry = entry_price
+            tp1_hit = False
+            in_trade = True
+            trade_id = stats.open_trade(offset + e)
+            j = e + 1
+            while True:
+                target = tp2_price if tp1_hit else min(tp1_price, tp2_price)
+                j, high_since_entry, sl_price = self._scan_for_exit(
+                    highs, lows, j, high_since_entry, sl_price, sl_offset, target)
+                if j is None:
+                    break
+                hit_high = float(highs[j])
+                t = int(times[j])
+
+                if not tp1_hit and hit_high >= tp1_price:
+                    size_to_sell = position_size / 2
+                    trade_fee = (tp1_price * size_to_sell) * fees_pct
+                    net_gain_loss = (tp1_price - entry_price) * size_to_sell - trade_fee
+                    stats.hold(equity, j - run_start)
+                    run_start = j
+                    equity += net_gain_loss
+                    open_position_size -= size_to_sell
+                    tp1_hit = True
+                    sl_price = entry_price
+                    stats.fill(net_gain_loss)
+                    self.trade_log.append(t, 'win_tp1', entry_price, tp1_price, net_gain_loss,
+                        trade_fee, size_to_sell, trade_id)
+
+                trade_type_final = ''
+                if hit_high >= tp2_price:
+                    exit_price_final = tp2_price
+                    trade_type_final = 'win_tp2'
+                elif float(lows[j]) <= sl_price:
+                    exit_price_final = sl_price
+                    trade_type_final = 'loss' if not tp1_hit else 'breakeven_sl'
+
+                if not trade_type_final:
+                    # TP1 only: keep trailing from the next bar with the stop at breakeven.
+                    j += 1
+                    continue
+
+                trade_fee = (exit_price_final * open_position_size) * fees_pct
+                net_gain_loss = (exit_price_final - entry_price) * open_position_size - trade_fee
+                stats.hold(equity, j - run_start)
+                run_start = j
+                equity += net_gain_loss
+                stats.fill(net_gain_loss)
+                stats.close_trade(offset + j)
+                self.trade_log.append(t, trade_type_final, entry_price, exit_price_final, net_gain_loss,
+                    trade_fee, open_position_size, trade_id)
+                in_trade = False
+                cooldown_end = t + cooldown_ns
+                break
+
+            if in_trade:
+                # Data ran out with the position still open.
+                self.in_trade = True
+                self.entry_price = entry_price
+                self.tp1_hit = tp1_hit
+                self.tp1_price, self.tp2_price, self.sl_price = tp1_price, tp2_price, sl_price
+                self.position_size = position_size
+                self.open_position_size = open_position_size
+                self.high_since_entry = high_since_entry
+                break
+            pos = j + 1
+
+        stats.hold(equity, n - run_start)
+        self.equity = equity
+        self.cooldown_end = pd.Timestamp(cooldown_end) if cooldown_end is not None else None
+        if instr is not None:
+            self._record_run(instr, started, mark, times, signals, start_index, strategy)
+        return self.get_final_stats()
+
+    def run_backtest_chunked(self, chunks, strategy, start_index=200, curve_path=None, keep_curve=False):
+        """
+        Out-of-core backtest over bars arriving in chunks (see
+        core.chunked.iter_dataset_chunks), for series too long to hold with
+        their indicator columns in memory. Indicator state and the whole trade
+        state carry across chunk boundaries, so the trade log and stats equal
+        run_backtest(mode='arrays') on the concatenated data.
+
+        Only one chunk is held at a time. The equity curve is the one thing
+        that grows with the data: it is appended to `curve_path` (raw float64,
+        np.fromfile reads it back) as it is written, kept in memory with
+        keep_curve=True, and otherwise dropped after every chunk. Trade
+        positions and Exposure don't need it either way.
+        """
+        from core.chunked import stream_markets
+
+        curve_file = open(curve_path, 'wb') if curve_path else None
+        try:
+            for market, local_start in stream_markets(chunks, start_index):
+                instrumentation.count('chunks')
+                self.run_backtest_arrays(market, strategy, local_start, flush=False)
+                del market
+                if not keep_curve:
+                    points = self.equity_curve.drain()
+                    if curve_file is not None:
+                        points.tofile(curve_file)
+            self.stats.hold(self.equity, self._pending_bars)
+            self._pending_bars = 0
+            if curve_file is not None:
+                (self.equity_curve.values if keep_curve else self.equity_curve.drain()).tofile(curve_file)
+        finally:
+            if curve_file is not None:
+                curve_file.close()
+        return self.get_final_stats()
+
+    @staticmethod
+    def _scan_for_exit(highs, lows, start, high_since_entry, sl_price, sl_offset, target):
+        """
+        Finds the first bar from `start` whose high reaches `target` or whose low
+        reaches the trailing stop, which ratchets as max(sl_price, running high - sl_offset)
+        exactly like the bar loop. Scans in doubling windows so short trades stay cheap.
+        Returns (bar, high_since_entry, sl_price) as of that bar, or bar=None if the data ends first.
+        """
+        n = len(highs)
+        window = 64
+        while start < n:
+            stop = min(start + window, n)
+            running_high = np.maximum(np.maximum.accumulate(highs[start:stop]), high_since_entry)
+            stops = np.maximum(running_high - sl_offset, sl_price)
+            hits = (highs[start:stop] >= target) | (lows[start:stop] <= stops)
+            if hits.any():
+                k = int(hits.argmax())
+                return start + k, float(running_high[k]), float(stops[k])
+            high_since_entry = float(running_high[-1])
+            sl_price = float(stops[-1])
+            start = stop
+            window *= 2
+        return None, high_since_entry, sl_price
+
+    def _run_mark(self):
+        """Where the trade log, trade ids and cooldown stood when a run started (see _record_run)."""
+        return len(self.trade_log), self.stats.next_trade_id, self.cooldown_end
+
+    def _record_run(self, instr, started, mark, times, signals, start_index, strategy):
+        """
+        Bar-loop time and counters of a finished run for core.instrumentation.
+        The counters are worked out afterwards from the entry mask, trade log and
+        times instead of being bumped inside the bar loops, so every engine
+        reports the same numbers and none of them pays for counting when
+        instrumentation is off.
+        """
+        instr.record('bar_loop', time.perf_counter() - started)
+        log_start, first_trade_id, cooldown_end = mark
+        n = len(times)
+        log = self.trade_log.values[log_start:]
+        partial = log['type'] == TYPE_CODES['win_tp1']
+        # Bars skipped after each final exit, up to the bar its cooldown ends on.
+        exit_times = log['time'][~partial]
+        exit_bars = np.searchsorted(times, exit_times, side='left')
+        resume_bars = np.searchsorted(times, exit_times + pd.Timedelta(minutes=strategy.cooldown_minutes).value,
+                                      side='left')
+        cooldown_bars = int(np.maximum(resume_bars - exit_bars - 1, 0).sum())
+        if cooldown_end is not None:
+            cooldown_bars += max(int(np.searchsorted(times, cooldown_end.value, side='left')) - start_index, 0)
+
+        instr.count('backtests')
+        instr.count('bars', max(n - start_index, 0))
+        instr.count('signals', np.count_nonzero(signals[start_index:]))
+        instr.count('entries', self.stats.next_trade_id - first_trade_id)
+        instr.count('partial_exits', np.count_nonzero(partial))
+        instr.count('exits', len(exit_times))
+        instr.count('cooldown_bars', cooldown_bars)
+
+    def get_final_stats(self):
+        """
+        Final performance statistics, read straight off the running accumulators in
+        self.stats (see core.stats.PerformanceStats), so this costs nothing extra.
+        Trades are counted by trade id; partial exits of one trade add up to its PnL.
+        """
+        with instrumentation.stage('final_stats'):
+            return self.stats.summary(self.equity)
 
     def save_trade_log(self, filename):
+        # .csv / .npy / .parquet / .arrow, see core.trade_log.TradeLog.save.
         os.makedirs("logs", exist_ok=True)
-        pd.DataFrame(self.trade_log).to_csv(filename, index=False)
+        with instrumentation.stage('save_trade_log'):
+            self.trade_log.save(filename)
         print(f"Trade log saved to {filename}")
 
-    def plot_equity_curve(self, save_path='logs/equity_curve.png'):
-        plt.figure(figsize=(12, 6))
-        plt.plot(self.equity_curve)
-        plt.title('Strategy Equity Curve')
-        plt.xlabel('Time (in minutes)')
-        plt.ylabel(f'Equity (starting from ${self.starting_equity})')
-        plt.grid(True)
-        
-        plt.savefig(save_path)
-        plt.close()
-        print(f"Equity curve plot saved to {save_path}")
\ No newline at end of file
+    def plot_equity_curve(self, save_path='logs/equity_curve.png', times=None):
+        # Downsampled to the figure width (keeping the max drawdown), so a year of 1m bars plots as fast as a day.
+        from utils.plotting import render_equity_curve
+        with instrumentation.stage('plot'):
+            render_equity_curve(self.equity_curve, save_path, times=times,
+                                ylabel=f'Equity (starting from ${self.starting_equity})')
+        print(f"Equity curve plot saved to {save_path}")
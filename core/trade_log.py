@@ -0,0 +1,181 @@
+import importlib
+import os
+
+import numpy as np
+import pandas as pd
+
+# Trade types in the log are stored as these int8 codes.
+TRADE_TYPES = ('win_tp1', 'win_tp2', 'loss', 'breakeven_sl')
+TYPE_CODES = {name: code for code, name in enumerate(TRADE_TYPES)}
+
+TRADE_DTYPE = np.dtype([
+    ('time', np.int64),  # exit bar time, epoch ns
+    ('type', np.int8),
+    ('trade_id', np.int32),
+    ('entry', np.float64),
+    ('exit', np.float64),
+    ('gain', np.float64),
+    ('fee', np.float64),
+    ('position_size', np.float64),
+])
+
+
+class TradeLog:
+    """
+    Columnar trade log: one row per exit (a TP1 partial or the final exit)
+    in a growable structured NumPy array, 41 bytes a row with no per-trade
+    Python objects. Columns are read as arrays (`log['gain']`); to_frame()
+    gives the old DataFrame layout with a datetime `time` and string `type`.
+
+    save/load pick the format from the extension: .csv (the old text format,
+    and the scripts' default), .npy (the raw array, loaded memory-mapped) or
+    .parquet / .arrow/.feather (opt-in, needs pyarrow; `type` is written
+    dictionary-encoded).
+    """
+
+    def __init__(self, capacity=256):
+        self._data = np.empty(max(int(capacity), 1), dtype=TRADE_DTYPE)
+        self._size = 0
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            grown = np.empty(max(size, 2 * len(self._data)), dtype=TRADE_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def append(self, time, kind, entry, exit, gain, fee, position_size, trade_id):
+        """Logs one exit; `time` is epoch ns and `kind` one of TRADE_TYPES."""
+        self._reserve(self._size + 1)
+        self._data[self._size] = (time, TYPE_CODES[kind], trade_id, entry, exit, gain, fee, position_size)
+        self._size += 1
+
+    def extend(self, other, id_offset=0):
+        """Appends another log's rows, shifting their trade ids by `id_offset`."""
+        rows = other.values if isinstance(other, TradeLog) else np.asarray(other, dtype=TRADE_DTYPE)
+        self._reserve(self._size + len(rows))
+        self._data[self._size:self._size + len(rows)] = rows
+        self._data['trade_id'][self._size:self._size + len(rows)] += id_offset
+        self._size += len(rows)
+
+    @property
+    def values(self):
+        """Read-only structured view of the logged rows."""
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def nbytes(self):
+        return self._size * TRADE_DTYPE.itemsize
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, column):
+        return self.values[column]
+
+    def records(self):
+        """The rows as the list of dicts the engine used to keep."""
+        return self.to_frame().assign(type=lambda df: df['type'].astype(str)).to_dict('records')
+
+    def to_frame(self):
+        values = self.values
+        return pd.DataFrame({
+            'time': values['time'].view('datetime64[ns]'),
+            'type': pd.Categorical.from_codes(values['type'], TRADE_TYPES),
+            'entry': values['entry'],
+            'exit': values['exit'],
+            'gain': values['gain'],
+            'fee': values['fee'],
+            'position_size': values['position_size'],
+            'trade_id': values['trade_id'],
+        })
+
+    @classmethod
+    def from_array(cls, values):
+        log = cls(len(values))
+        log.extend(values)
+        return log
+
+    @classmethod
+    def from_frame(cls, df):
+        """From the DataFrame layout (to_frame, or an old CSV log with string times and types)."""
+        values = np.empty(len(df), dtype=TRADE_DTYPE)
+        values['time'] = pd.to_datetime(df['time']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        values['type'] = [TYPE_CODES[kind] for kind in df['type'].astype(str)]
+        # Logs written before trade ids existed: every final exit closes the current trade.
+        if 'trade_id' in df:
+            values['trade_id'] = df['trade_id'].to_numpy()
+        else:
+            final = values['type'] != TYPE_CODES['win_tp1']
+            values['trade_id'] = np.r_[0, np.cumsum(final)[:-1]] if len(df) else []
+        for col in ('entry', 'exit', 'gain', 'fee', 'position_size'):
+            values[col] = df[col].to_numpy(dtype=np.float64)
+        return cls.from_array(values)
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.npy':
+            np.save(path, self.values)
+        elif ext == '.csv':
+            self.to_frame().to_csv(path, index=False)
+        elif ext in ('.parquet', '.arrow', '.feather'):
+            if ext == '.parquet':
+                _pyarrow_module('parquet', path).write_table(self.to_arrow(), path)
+            else:
+                _pyarrow_module('feather', path).write_feather(self.to_arrow(), path)
+        else:
+            raise ValueError(f"Unknown trade log format: {path}")
+
+    @classmethod
+    def load(cls, path):
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.npy':
+            return cls.from_array(np.load(path, mmap_mode='r'))
+        if ext == '.csv':
+            # round_trip: pandas' default float parser can be off by an ulp from what to_csv wrote.
+            return cls.from_frame(pd.read_csv(path, float_precision='round_trip'))
+        if ext == '.parquet':
+            return cls.from_arrow(_pyarrow_module('parquet', path).read_table(path))
+        if ext in ('.arrow', '.feather'):
+            return cls.from_arrow(_pyarrow_module('feather', path).read_table(path))
+        raise ValueError(f"Unknown trade log format: {path}")
+
+    def to_arrow(self):
+        """pyarrow Table with a timestamp `time` and dictionary-encoded `type`."""
+        import pyarrow as pa
+        values = self.values
+        columns = {
+            'time': pa.array(values['time'].view('datetime64[ns]')),
+            'type': pa.DictionaryArray.from_arrays(pa.array(values['type']), pa.array(TRADE_TYPES)),
+        }
+        for col in ('entry', 'exit', 'gain', 'fee', 'position_size', 'trade_id'):
+            columns[col] = pa.array(values[col])
+        return pa.table(columns)
+
+    @classmethod
+    def from_arrow(cls, table):
+        import pyarrow as pa
+        values = np.empty(table.num_rows, dtype=TRADE_DTYPE)
+        values['time'] = table.column('time').cast(pa.timestamp('ns')).cast(pa.int64()).to_numpy()
+        kinds = table.column('type').combine_chunks()
+        if pa.types.is_dictionary(kinds.type):
+            # Remap through the file's own dictionary rather than assuming it matches TRADE_TYPES.
+            remap = np.array([TYPE_CODES[kind] for kind in kinds.dictionary.to_pylist()], dtype=np.int8)
+            values['type'] = remap[kinds.indices.to_numpy(zero_copy_only=False)]
+        else:
+            values['type'] = [TYPE_CODES[kind] for kind in kinds.to_pylist()]
+        for col in ('entry', 'exit', 'gain', 'fee', 'position_size', 'trade_id'):
+            values[col] = table.column(col).to_numpy()
+        return cls.from_array(values)
+
+
+def _pyarrow_module(name, path):
+    """pyarrow.<name>, which only the Parquet/Arrow formats need, with an error that says what to do without it."""
+    try:
+        return importlib.import_module(f"pyarrow.{name}")
+    except ImportError:
+        raise ImportError(f"{path}: Parquet/Arrow trade logs need pyarrow (pip install pyarrow); "
+                          f"use a .csv or .npy trade log instead") from None
@@ -0,0 +1,138 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.optimizer import PARAM_GRID, make_strategy
+from core.results_store import ResultsStore
+from core.search import run_search
+from core.shared_market import SharedMarket
+from core.trade_engine import TradeEngine
+
+# Bars the engine skips before trading (SMA200 warm-up); see run_backtest_arrays.
+WARMUP_BARS = 200
+
+
+def walk_forward_windows(n_bars, n_windows=5, train_ratio=4.0, anchored=False, train_bars=None, test_bars=None):
+    """
+    (train_start, train_end, test_start, test_end) bar ranges. Test windows
+    tile the series after the first training window; each training window is
+    the `train_bars` before its test window (rolling) or everything since the
+    warm-up (anchored). Leftover bars at the end join the last test window.
+    """
+    usable = n_bars - WARMUP_BARS
+    if test_bars is None:
+        test_bars = int(usable // (train_ratio + n_windows))
+    if train_bars is None:
+        train_bars = int(test_bars * train_ratio)
+    windows = []
+    test_start = WARMUP_BARS + train_bars
+    while test_bars > 0 and test_start + test_bars <= n_bars:
+        train_start = WARMUP_BARS if anchored else test_start - train_bars
+        windows.append([train_start, test_start, test_start, test_start + test_bars])
+        test_start += test_bars
+    if not windows:
+        raise ValueError(f"{n_bars} bars is too short for walk-forward windows of {train_bars}+{test_bars} bars")
+    windows[-1][3] = n_bars
+    return [tuple(w) for w in windows]
+
+
+def window_market(market, start, end):
+    """
+    Bars [start, end) of the precomputed arrays plus the warm-up bars before
+    them, so the engine's usual 200-bar skip lands exactly on `start` and the
+    indicators are the full-series values rather than recomputed ones.
+    """
+    return {col: values[start - WARMUP_BARS:end] for col, values in market.items()}
+
+
+def optimize_window(market, train_start, train_end, search='grid', budget=24, mode='arrays', seed=0,
+                    results_db=None, dataset=None):
+    """
+    Best parameter set (by the search's score) on one training window, with its
+    training stats. `results_db` is a core.results_store path: each worker opens
+    its own connection, so windows seen in an earlier run aren't backtested again.
+    """
+    store = ResultsStore(results_db) if results_db else None
+    try:
+        results, evaluator = run_search(window_market(market, train_start, train_end), search, budget=budget,
+                                        mode=mode, seed=seed, results_store=store, dataset=dataset)
+    finally:
+        if store is not None:
+            store.close()
+    return max(results, key=evaluator.score)
+
+
+# Set once per worker process by _init_worker.
+_worker_shm = None
+_worker_market = None
+
+
+def _init_worker(spec):
+    global _worker_shm, _worker_market
+    _worker_shm, _worker_market = SharedMarket.attach(spec)
+
+
+def _optimize_task(task):
+    return optimize_window(_worker_market, *task)
+
+
+def walk_forward(market, n_windows=5, train_ratio=4.0, anchored=False, search='grid', budget=24,
+                 workers=1, mode='arrays', seed=0, starting_equity=1000, fees_pct=0.001, results_db=None, dataset=None):
+    """
+    Optimizes on every training window (in parallel across windows, sharing
+    one copy of the market arrays) and validates each window's best parameters
+    on the test window after it. The test windows run in order, each starting
+    from the equity the previous one ended with; a trade still open at the end
+    of a test window is dropped, as in the single-split validation.
+
+    Returns {'windows': per-window rows, 'stats': out-of-sample get_final_stats,
+    'engine': a TradeEngine holding the stitched out-of-sample equity curve and
+    trade log, 'times': the epoch-ns time of every point on that curve}.
+    """
+    windows = walk_forward_windows(len(market['close']), n_windows, train_ratio, anchored)
+    tasks = [(train_start, train_end, search, budget, mode, seed, results_db, dataset)
+             for train_start, train_end, _, _ in windows]
+
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        bests = [optimize_window(market, *task) for task in tasks]
+    else:
+        shared = SharedMarket.publish(market)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+                bests = list(pool.map(_optimize_task, tasks))
+        finally:
+            shared.release()
+
+    equity = starting_equity
+    combined = TradeEngine(starting_equity=starting_equity, fees_pct=fees_pct)
+    rows = []
+    for (train_start, train_end, test_start, test_end), best in zip(windows, bests):
+        params = {key: best[key] for key in PARAM_GRID}
+        engine = TradeEngine(starting_equity=equity, fees_pct=fees_pct)
+        test_market = window_market(market, test_start, test_end)
+        if mode == 'events':
+            stats = engine.run_backtest_events(test_market, make_strategy(params))
+        else:
+            stats = engine.run_backtest_arrays(test_market, make_strategy(params))
+        # Trade ids restart in every window's engine; shift them to stay unique in the stitched log.
+        combined.trade_log.extend(engine.trade_log, id_offset=combined.stats.next_trade_id)
+        combined.stats.extend(engine.stats)
+        equity = engine.equity
+        rows.append({
+            'train_start': train_start, 'train_end': train_end, 'test_start': test_start, 'test_end': test_end,
+            **params,
+            'TrainPnL': best['TotalPnL'], 'TrainSharpe': best['Sharpe'],
+            **{f"Test{key}": value for key, value in stats.items()},
+            'Equity': equity,
+        })
+    combined.equity = equity
+
+    first_test = windows[0][2]
+    return {
+        'windows': rows,
+        'stats': combined.get_final_stats(),
+        'engine': combined,
+        'times': market['time'][first_test - 1:windows[-1][3]],
+    }
@@ -0,0 +1,229 @@
+import math
+
+import numpy as np
+
+
+class StreamingRSI:
+    """
+    Wilder RSI updated one close at a time, matching ta.momentum.RSIIndicator
+    (fillna=False): both averages are pandas-style ewm(alpha=1/window, adjust=False)
+    means, replicated step for step so the outputs agree to the last bit.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        # Same alpha -> com -> alpha round trip pandas does, so the weights match bit for bit.
+        alpha = 1.0 / window
+        com = (1 - alpha) / alpha
+        alpha = 1.0 / (1.0 + com)
+        self._new_wt = alpha
+        self._old_wt = 1.0 - alpha
+        self.prev_close = None
+        self.avg_up = None
+        self.avg_down = None
+        self.nobs = 0
+        self.value = math.nan
+
+    def _ewm(self, weighted, cur):
+        if weighted != cur:
+            weighted = (self._old_wt * weighted + self._new_wt * cur) / (self._old_wt + self._new_wt)
+        return weighted
+
+    def update(self, close):
+        if self.prev_close is None:
+            # The first diff is NaN, which ta turns into a 0.0 gain and loss.
+            up = down = 0.0
+        else:
+            diff = close - self.prev_close
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else 0.0
+        self.prev_close = close
+        self.nobs += 1
+        if self.avg_up is None:
+            self.avg_up, self.avg_down = up, down
+        else:
+            self.avg_up = self._ewm(self.avg_up, up)
+            self.avg_down = self._ewm(self.avg_down, down)
+
+        if self.nobs < self.window:
+            self.value = math.nan
+        elif self.avg_down == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + self.avg_up / self.avg_down))
+        return self.value
+
+    def snapshot(self):
+        return {'window': self.window, 'prev_close': self.prev_close, 'avg_up': self.avg_up,
+                'avg_down': self.avg_down, 'nobs': self.nobs, 'value': self.value}
+
+    @classmethod
+    def restore(cls, state):
+        ind = cls(state['window'])
+        ind.prev_close, ind.avg_up, ind.avg_down = state['prev_close'], state['avg_up'], state['avg_down']
+        ind.nobs, ind.value = state['nobs'], state['value']
+        return ind
+
+
+class StreamingATR:
+    """
+    Average True Range updated one bar at a time, matching
+    ta.volatility.AverageTrueRange: 0.0 for the first window-1 bars, the plain
+    mean of the first `window` true ranges, then Wilder smoothing.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self.prev_close = None
+        self.count = 0
+        self.seed = []  # first `window` true ranges, only kept until the first ATR value exists
+        self.value = 0.0
+
+    def update(self, high, low, close):
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.window:
+            self.seed.append(true_range)
+            self.value = 0.0
+        elif self.count == self.window:
+            self.seed.append(true_range)
+            # Same summation as the pandas mean ta uses for the seed value.
+            self.value = float(np.array(self.seed).sum() / self.window)
+            self.seed = []
+        else:
+            self.value = (self.value * (self.window - 1) + true_range) / float(self.window)
+        return self.value
+
+    def snapshot(self):
+        return {'window': self.window, 'prev_close': self.prev_close, 'count': self.count,
+                'seed': list(self.seed), 'value': self.value}
+
+    @classmethod
+    def restore(cls, state):
+        ind = cls(state['window'])
+        ind.prev_close, ind.count, ind.seed, ind.value = (
+            state['prev_close'], state['count'], list(state['seed']), state['value'])
+        return ind
+
+
+class StreamingSMA:
+    """
+    Simple moving average over a ring buffer, matching ta.trend.SMAIndicator
+    (pandas rolling(window).mean()). Uses the same compensated running sum as
+    pandas, so values agree exactly instead of drifting apart over long series.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self.buffer = [0.0] * window
+        self.count = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_ct = 0
+        self.same_run = 0
+        self.prev_value = None
+        self.value = math.nan
+
+    def update(self, x):
+        slot = self.count % self.window
+        if self.count >= self.window:
+            old = self.buffer[slot]
+            y = -old - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, old) < 0:
+                self.neg_ct -= 1
+        if self.prev_value is None:
+            self.prev_value = x
+
+        y = x - self.comp_add
+        t = self.sum_x + y
+        self.comp_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, x) < 0:
+            self.neg_ct += 1
+        self.same_run = self.same_run + 1 if x == self.prev_value else 1
+        self.prev_value = x
+
+        self.buffer[slot] = x
+        self.count += 1
+        nobs = min(self.count, self.window)
+        if nobs < self.window:
+            self.value = math.nan
+        elif self.same_run >= nobs:
+            self.value = self.prev_value
+        else:
+            value = self.sum_x / nobs
+            if self.neg_ct == 0 and value < 0:
+                value = 0.0
+            elif self.neg_ct == nobs and value > 0:
+                value = 0.0
+            self.value = value
+        return self.value
+
+    def snapshot(self):
+        # Store the window oldest-first so the snapshot doesn't depend on the ring position.
+        slot = self.count % self.window
+        ordered = self.buffer[slot:] + self.buffer[:slot]
+        return {'window': self.window, 'values': ordered, 'count': self.count, 'sum_x': self.sum_x,
+                'comp_add': self.comp_add, 'comp_remove': self.comp_remove, 'neg_ct': self.neg_ct,
+                'same_run': self.same_run, 'prev_value': self.prev_value, 'value': self.value}
+
+    @classmethod
+    def restore(cls, state):
+        ind = cls(state['window'])
+        slot = state['count'] % ind.window
+        values = list(state['values'])
+        ind.buffer = values[ind.window - slot:] + values[:ind.window - slot]
+        for key in ('count', 'sum_x', 'comp_add', 'comp_remove', 'neg_ct', 'same_run', 'prev_value', 'value'):
+            setattr(ind, key, state[key])
+        return ind
+
+
+class StreamingIndicators:
+    """
+    The three indicators EthScalpStrategyOHLCV.prepare_indicators builds (RSI(3),
+    ATR(14), SMA(200)), fed one bar at a time in O(1) per bar.
+    """
+
+    def __init__(self, rsi_window=3, atr_window=14, sma_window=200):
+        self.rsi = StreamingRSI(rsi_window)
+        self.atr = StreamingATR(atr_window)
+        self.sma = StreamingSMA(sma_window)
+
+    def update(self, bar):
+        close = bar['close']
+        return {
+            'RSI': self.rsi.update(close),
+            'ATR': self.atr.update(bar['high'], bar['low'], close),
+            'SMA200': self.sma.update(close),
+        }
+
+    def update_arrays(self, high, low, close):
+        """update() over a block of bars in order; returns {'RSI', 'ATR', 'SMA200'} float64 arrays."""
+        rsi_update, atr_update, sma_update = self.rsi.update, self.atr.update, self.sma.update
+        rsi, atr, sma = [], [], []
+        for h, l, c in zip(np.asarray(high).tolist(), np.asarray(low).tolist(), np.asarray(close).tolist()):
+            rsi.append(rsi_update(c))
+            atr.append(atr_update(h, l, c))
+            sma.append(sma_update(c))
+        return {'RSI': np.array(rsi, dtype=np.float64), 'ATR': np.array(atr, dtype=np.float64),
+                'SMA200': np.array(sma, dtype=np.float64)}
+
+    def snapshot(self):
+        return {'rsi': self.rsi.snapshot(), 'atr': self.atr.snapshot(), 'sma': self.sma.snapshot()}
+
+    @classmethod
+    def restore(cls, state):
+        ind = cls.__new__(cls)
+        ind.rsi = StreamingRSI.restore(state['rsi'])
+        ind.atr = StreamingATR.restore(state['atr'])
+        ind.sma = StreamingSMA.restore(state['sma'])
+        return ind
@@ -0,0 +1,65 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Command -> (module with a main(argv), help). A command's module is imported
+# only when it runs, so `fetch` never loads matplotlib or `ta`, `report` never
+# loads ccxt, and a second command in the same process reuses what the first imported.
+COMMANDS = {
+    'fetch': ('scripts.fetch_all', "Fetch every job in a fetch-jobs file into the data store"),
+    'optimize': ('scripts.optimize', "Search strategy parameters and save configs/best_config.json"),
+    'backtest': ('launcher.run_best_strategy', "Backtest configs/best_config.json and save its trade log"),
+    'report': ('scripts.report', "Summarize a saved trade log"),
+    'robustness': ('scripts.robustness', "Monte Carlo robustness of configs/best_config.json"),
+    'portfolio': ('scripts.portfolio', "Backtest configs/best_config.json on many symbols with shared capital"),
+    'query': ('scripts.query_results', "Show the best stored optimizer results"),
+    'render': ('scripts.render_results', "Save equity curves of the best stored results"),
+    'bench': ('scripts.bench_suite', "Benchmark every stage on synthetic data and compare against a baseline"),
+}
+
+# Modules worth reporting with --import-times.
+HEAVY_MODULES = ('pandas', 'matplotlib', 'ta', 'ccxt', 'pyarrow', 'streamlit')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="ETH scalp bot: every step runs in this one process.",
+        epilog="Options after the command go to it; see '<command> --help'.")
+    parser.add_argument('--import-times', action='store_true',
+                        help="Print how long the command's imports took and which heavy modules they loaded")
+    commands = parser.add_subparsers(dest='command', metavar='command', required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        # No -h on the subcommand itself: --help is passed on to the command's own parser.
+        commands.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def load(command):
+    """The command's module, imported on first use."""
+    return importlib.import_module(COMMANDS[command][0])
+
+
+def run(command, argv=()):
+    """Runs one command in this process with `argv` as its command-line options."""
+    return load(command).main(list(argv))
+
+
+def main(argv=None):
+    args, rest = build_parser().parse_known_args(argv)
+    if args.import_times:
+        start = time.perf_counter()
+        module = load(args.command)
+        elapsed = time.perf_counter() - start
+        heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"[{args.command}] imports took {elapsed * 1000:.0f} ms, "
+              f"loaded {', '.join(heavy) if heavy else 'no heavy modules'}")
+        return module.main(rest)
+    return run(args.command, rest)
+
+
+if __name__ == '__main__':
+    main()
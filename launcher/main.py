@@ -4,6 +4,7 @@ import traceback
 from datetime import datetime
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from launcher.cli import run
 
 def setup_error_logging():
     os.makedirs("logs/errors", exist_ok=True)
@@ -23,18 +24,20 @@ def prompt_user_recovery(error_msg):
 error_log_file = setup_error_logging()
 
 try:
-    import subprocess
-
+    # Each option runs in this process (see launcher/cli.py) instead of a fresh interpreter.
     print("=== ETH Scalp Backtest Launcher ===\n")
     print("1) Optimize Strategy Parameters")
     print("2) Run Backtest with Best Strategy")
-    print("3) Exit")
-    option = input("Enter option [1-3]: ").strip()
+    print("3) Summarize Last Backtest")
+    print("4) Exit")
+    option = input("Enter option [1-4]: ").strip()
 
     if option == "1":
-        subprocess.run(["python", "scripts/optimize.py"], check=True)
+        run("optimize")
     elif option == "2":
-        subprocess.run(["python", "launcher/run_best_strategy.py"], check=True)
+        run("backtest")
+    elif option == "3":
+        run("report")
     else:
         print("Exiting...")
 
@@ -47,8 +50,6 @@ except Exception as e:
 
     if "No such file or directory" in error_details:
         error_log_file.write("Hint: Make sure paths to scripts/configs/data are correct.\n")
-    elif "CalledProcessError" in error_details:
-        error_log_file.write("Hint: One of the subprocess commands failed.\n")
 
     error_log_file.close()
 
@@ -1,13 +1,19 @@
-﻿import os
+﻿import argparse
+import os
 import sys
-import json
 import pandas as pd
 
 # This line helps Python find your other code files, like strategy.py.
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from strategies.strategy import EthScalpStrategyOHLCV
+from core import instrumentation
+from core.data_store import load_ohlcv
+from core.optimizer import load_strategy
+from core.trade_engine import TradeEngine
 
-def run_backtest_with_best_config():
+def run_backtest_with_best_config(config_path='configs/best_config.json',
+                                  data_path='data/eth_usd_binanceus_120d_1m.csv', timeframe=None, mode='arrays',
+                                  log_filename='logs/best_strategy_full_backtest_log.csv', intrabar=None,
+                                  chunk_bars=None):
     """
     This function loads the best configuration and runs a single backtest.
     """
@@ -16,44 +22,54 @@ def run_backtest_with_best_config():
     # --- 1. Load the Best Configuration ---
     # This is the core of our "smart" system. We read the settings that
     # 'optimize.py' automatically saved for us.
-    config_path = 'configs/best_config.json'
     try:
-        with open(config_path, 'r') as f:
-            best_config = json.load(f)
+        strategy = load_strategy(config_path)
     except FileNotFoundError:
         print(f"Error: Configuration file not found at {config_path}")
         print("Please run 'optimize.py' first to generate the configuration.")
         return # Exit the function if the file doesn't exist.
 
     print("\nLoaded Best Configuration:")
-    print(best_config)
+    print({key: value for key, value in vars(strategy).items() if key != 'indicator_cache'})
 
     # --- 2. Load the Data ---
-    # The data path is now also stored in the config, but we will hardcode
-    # it here for simplicity in this script. For a more advanced system,
-    # you would also read the data_path from the config.
-    data_path = 'data/eth_usd_binanceus_120d_1m.csv'
+    # The data path defaults to the 120-day file; pass --data to use another
+    # CSV or data store dataset (and --timeframe for coarser bars).
     try:
-        df = pd.read_csv(data_path, parse_dates=['time'])
+        # Converted into data/store on first use, memory-mapped after that.
+        with instrumentation.stage('load'):
+            if mode == 'chunked':
+                # Read a chunk at a time during the backtest instead of all at once.
+                from core.chunked import DEFAULT_CHUNK_BARS, iter_dataset_chunks
+                df = iter_dataset_chunks(data_path, chunk_bars=chunk_bars or DEFAULT_CHUNK_BARS, timeframe=timeframe)
+            else:
+                df = load_ohlcv(data_path, timeframe=timeframe)
         print(f"\nData loaded successfully from: {data_path}")
     except FileNotFoundError:
         print(f"Error: Data file not found at {data_path}")
         print("Please run a data fetching script first.")
         return
 
-    # --- 3. Initialize and Run the Strategy ---
-    # We create an instance of our strategy, passing in the best settings
-    # that we loaded from the JSON file.
-    strategy = EthScalpStrategyOHLCV(
-        rsi_threshold=best_config["rsi_threshold"],
-        tp_atr=best_config["tp_atr"],
-        sl_atr=best_config["sl_atr"],
-        cooldown_minutes=best_config["cooldown_minutes"]
-    )
+    # --- 3. Run the Strategy ---
+    # The strategy was built above from the best settings in the JSON file
+    # (core.optimizer.load_strategy ignores keys it doesn't know).
 
-    # Run the backtest on the full dataset.
+    # Run the backtest on the full dataset. The strategy only produces signals;
+    # the TradeEngine does the simulating and keeps the trade log.
     print("\n--- Running backtest on the full dataset... ---")
-    trade_log, final_stats = strategy.run_backtest(df.copy())
+    engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
+    resolver = None
+    if intrabar is not None:
+        # Bars that touch both a target and a stop are replayed on this finer data, looked up only for them.
+        from core.intrabar import IntrabarResolver
+        resolver = IntrabarResolver.open(intrabar)
+    with instrumentation.stage('backtest'):
+        if mode == 'chunked':
+            final_stats = engine.run_backtest_chunked(df, strategy)
+        else:
+            final_stats = engine.run_backtest(df, strategy, mode=mode, intrabar=resolver)
+    if resolver is not None:
+        print(f"Intrabar: {resolver.bars_resolved} ambiguous bars replayed on {resolver.rows_read} rows of {intrabar}")
 
     # --- 4. Display Results and Save Log ---
     print("\n\n--- BACKTEST PERFORMANCE (Full Dataset) ---")
@@ -61,11 +77,33 @@ def run_backtest_with_best_config():
     print("-------------------------------------------------")
 
     # Save the detailed log of all trades for analysis.
-    log_filename = 'logs/best_strategy_full_backtest_log.csv'
-    strategy.save_trade_log(log_filename)
+    engine.save_trade_log(log_filename)
+    return final_stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the parameters optimize.py saved to configs/best_config.json.")
+    parser.add_argument('--config', default='configs/best_config.json', help="Best-parameters JSON file")
+    parser.add_argument('--data', default='data/eth_usd_binanceus_120d_1m.csv', help="OHLCV CSV path or data store dataset name")
+    parser.add_argument('--timeframe', default=None, help="Bar size to backtest on, e.g. 5m or 1h")
+    parser.add_argument('--mode', choices=['rows', 'arrays', 'events', 'chunked'], default='arrays',
+                        help="Backtest engine mode ('chunked' streams the data from disk in flat memory)")
+    parser.add_argument('--chunk-bars', type=int, default=None, help="Bars per chunk in chunked mode")
+    parser.add_argument('--log', default='logs/best_strategy_full_backtest_log.csv',
+                        help="Trade log output (.csv, .npy, or .parquet/.arrow with pyarrow installed)")
+    parser.add_argument('--intrabar', default=None, metavar='SOURCE',
+                        help="With --timeframe: finer bars (CSV path or dataset name) or a time,price,quantity trades "
+                             "CSV to resolve bars whose TP/SL hit order is ambiguous (arrays/events modes)")
+    instrumentation.add_arguments(parser, report='logs/backtest_report.json')
+    args = parser.parse_args(argv)
+    if args.intrabar and args.mode == 'chunked':
+        parser.error("--intrabar needs --mode arrays or events")
+    with instrumentation.from_args(args, label='backtest'):
+        run_backtest_with_best_config(args.config, args.data, args.timeframe, args.mode, args.log, args.intrabar,
+                                     args.chunk_bars)
 
 
 if __name__ == '__main__':
-    # This line means the 'run_backtest_with_best_config' function will
-    # only be executed when you run this script directly from the command line.
-    run_backtest_with_best_config()
\ No newline at end of file
+    # This line means the backtest will only be executed when you run this
+    # script directly from the command line, not when the CLI imports it.
+    main()
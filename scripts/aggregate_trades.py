@@ -0,0 +1,37 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_store import DataStore
+from core.tick_aggregator import DEFAULT_TIMEFRAMES, aggregate_trades
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate raw time,price,quantity trades into OHLCV bars in the data store.")
+    parser.add_argument('--trades', default='data/ethusd_trade.csv', help="Trade CSV")
+    parser.add_argument('--timeframes', default=','.join(DEFAULT_TIMEFRAMES), help="Comma-separated bar sizes")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="Trades read per chunk")
+    parser.add_argument('--symbol', default='ETH/USD')
+    parser.add_argument('--name', default=None, help="Dataset name prefix (default: trade file name)")
+    args = parser.parse_args(argv)
+
+    timeframes = args.timeframes.split(',')
+    prefix = args.name or os.path.splitext(os.path.basename(args.trades))[0]
+    names = {tf: f"{prefix}_{tf}" for tf in timeframes}
+
+    store = DataStore()
+    start = time.perf_counter()
+    aggregator = aggregate_trades(args.trades, names, store, args.chunk_size, symbol=args.symbol)
+    elapsed = time.perf_counter() - start
+
+    print(f"{aggregator.trades} trades in {elapsed:.2f}s ({aggregator.trades / elapsed:,.0f} trades/s)")
+    for tf, name in names.items():
+        info = store.info(name)
+        print(f"{name:28} {info['rows']:>8} bars  {info['start']} -> {info['end']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ('pandas', 'matplotlib', 'ta', 'ccxt', 'pyarrow')
+
+# Cold-start cost of each launcher/cli.py command: a fresh interpreter that
+# imports the command and parses `--help`, so no real work is timed. -X importtime
+# shows which heavy modules each command loads and how long all imports take.
+# "chained" is the old launcher's cost for one action: its own interpreter plus a
+# second one started with subprocess for the script.
+parser = argparse.ArgumentParser()
+parser.add_argument("--repeat", type=int, default=5, help="Runs per command; the fastest is reported")
+parser.add_argument("commands", nargs='*', default=['fetch', 'optimize', 'backtest', 'report', 'query'])
+args = parser.parse_args()
+
+
+def cold_start(argv):
+    """(best wall seconds, import seconds, heavy top-level modules imported) for `python -X importtime argv`."""
+    best, imports, heavy = None, 0.0, set()
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=ROOT, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv)} failed:\n{proc.stderr[-2000:]}")
+        if best is None or elapsed < best:
+            best, imports, heavy = elapsed, 0.0, set()
+            for line in proc.stderr.splitlines():
+                if not line.startswith('import time:') or '|' not in line or 'self [us]' in line:
+                    continue
+                _, cumulative, name = line.split('|')
+                if len(name) - len(name.lstrip()) == 1:
+                    imports += int(cumulative) / 1e6  # top-level imports only; nested ones are included
+                top = name.strip().split('.')[0]
+                if top in HEAVY_MODULES:
+                    heavy.add(top)
+    return best, imports, sorted(heavy)
+
+
+bare, _, _ = cold_start(['-c', 'pass'])
+print(f"bare interpreter: {bare * 1000:.0f} ms")
+print(f"{'command':10} {'cli.py':>8} {'imports':>8} {'chained':>8}  heavy modules")
+for command in args.commands:
+    wall, imports, heavy = cold_start(['launcher/cli.py', command, '--help'])
+    print(f"{command:10} {wall * 1000:>6.0f}ms {imports * 1000:>6.0f}ms {(wall + bare) * 1000:>6.0f}ms  "
+          f"{', '.join(heavy) or '-'}")
+
+# A second command in an already-running CLI process imports only what is new.
+sys.path.insert(0, ROOT)
+from launcher.cli import load  # noqa: E402
+
+for command in args.commands:
+    start = time.perf_counter()
+    try:
+        load(command)
+    except ImportError as exc:
+        print(f"in-process {command:10} not importable here ({exc})")
+        continue
+    print(f"in-process {command:10} {(time.perf_counter() - start) * 1000:>6.1f} ms of new imports")
@@ -0,0 +1,50 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_store import load_ohlcv
+from indicators.streaming import StreamingIndicators
+from strategies.strategy import EthScalpStrategyOHLCV
+
+# Feeds a dataset through the streaming indicators one bar at a time and compares
+# against the batch `ta` values the strategy uses. Halfway through, the state is
+# snapshotted, round-tripped through JSON and restored, as a live bot restart would.
+parser = argparse.ArgumentParser()
+parser.add_argument("--data", default="data/eth_usd_kraken_90d.csv", help="CSV path or data store dataset name")
+args = parser.parse_args()
+
+df = load_ohlcv(args.data)
+highs, lows, closes = df['high'].tolist(), df['low'].tolist(), df['close'].tolist()
+
+start = time.perf_counter()
+reference = EthScalpStrategyOHLCV().prepare_indicators(df.copy())
+batch_seconds = time.perf_counter() - start
+
+indicators = StreamingIndicators()
+out = {'RSI': [], 'ATR': [], 'SMA200': []}
+restart_at = len(closes) // 2
+start = time.perf_counter()
+for i, (high, low, close) in enumerate(zip(highs, lows, closes)):
+    if i == restart_at:
+        indicators = StreamingIndicators.restore(json.loads(json.dumps(indicators.snapshot())))
+    values = indicators.update({'high': high, 'low': low, 'close': close})
+    for key in out:
+        out[key].append(values[key])
+stream_seconds = time.perf_counter() - start
+
+print(f"{len(closes)} bars from {args.data}")
+print(f"Batch (ta):  {batch_seconds * 1000:.1f} ms total")
+print(f"Streaming:   {stream_seconds * 1e6 / len(closes):.2f} us per bar (snapshot/restore at bar {restart_at})")
+for key, values in out.items():
+    expected = reference[key].to_numpy()
+    got = np.array(values)
+    if np.array_equal(expected, got, equal_nan=True):
+        print(f"{key:7} identical to ta")
+    else:
+        print(f"{key:7} max abs diff vs ta: {np.nanmax(np.abs(expected - got)):.3e}")
@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_DIR = os.path.join('results', 'benchmarks')
+
+# Largest input each stage is run on unless --no-caps is given: the row-by-row
+# engine manages under 10k bars/s, `ta` needs ~200 bytes per bar, and the Python
+# engines and the optimizer hold every bar as a Python float, so 50M bars is
+# only sensible for the generator.
+STAGE_MAX_BARS = {
+    'generate': 50_000_000,
+    'indicators': 10_000_000,
+    'backtest_rows': 200_000,
+    'backtest_arrays': 10_000_000,
+    'backtest_events': 10_000_000,
+    'batch': 5_000_000,
+    'optimize': 2_000_000,
+}
+STAGES = tuple(STAGE_MAX_BARS)
+
+
+def parse_size(text):
+    """'10k' -> 10_000, '50M' -> 50_000_000 (k/m in either case)."""
+    text = text.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, or None where it can't be read."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    except ImportError:
+        return None
+
+
+def reset_peak_rss():
+    """Restarts the peak-RSS count on Linux, so the input data set up before a stage isn't charged to it."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def prepare(stage, bars, seed):
+    """The untimed input of a stage and the number of backtests one run of it does."""
+    from core.synthetic import synthetic_frame
+    from core.trade_engine import TradeEngine
+    from strategies.strategy import EthScalpStrategyOHLCV
+
+    if stage == 'generate':
+        return None, 0
+    df = synthetic_frame(bars, seed)
+    if stage in ('indicators', 'backtest_rows'):
+        return df, 1
+    market = TradeEngine.market_arrays(df, EthScalpStrategyOHLCV())
+    del df
+    if stage in ('batch', 'optimize'):
+        from core.optimizer import build_grid
+        return market, len(build_grid())
+    return market, 1
+
+
+def run_once(stage, data, bars, seed, workers):
+    from core.trade_engine import TradeEngine
+    from strategies.strategy import EthScalpStrategyOHLCV
+
+    if stage == 'generate':
+        from core.synthetic import synthetic_ohlcv
+        synthetic_ohlcv(bars, seed)
+    elif stage == 'indicators':
+        EthScalpStrategyOHLCV().prepare_indicators(data.copy())
+    elif stage == 'backtest_rows':
+        TradeEngine().run_backtest(data, EthScalpStrategyOHLCV(), mode='rows')
+    elif stage == 'backtest_arrays':
+        TradeEngine().run_backtest_arrays(data, EthScalpStrategyOHLCV())
+    elif stage == 'backtest_events':
+        TradeEngine().run_backtest_events(data, EthScalpStrategyOHLCV())
+    elif stage == 'batch':
+        from core.batch_engine import run_batch
+        from core.optimizer import build_grid
+        run_batch(data, build_grid())
+    elif stage == 'optimize':
+        from core.search import run_search
+        run_search(data, 'grid', workers=workers)
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+
+def measure(stage, bars, seed, repeat, workers):
+    """Runs one stage in this process and returns its result row (see run_stage)."""
+    data, backtests = prepare(stage, bars, seed)
+    exact_peak = reset_peak_rss()
+    baseline = peak_rss_mb()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_once(stage, data, bars, seed, workers)
+        times.append(time.perf_counter() - start)
+    wall = min(times)
+    peak = peak_rss_mb()
+    return {
+        'stage': stage, 'bars': bars, 'backtests': backtests, 'wall_s': wall,
+        # Bars through the engine per second, counting every backtest of a sweep.
+        'bars_per_s': bars * max(backtests, 1) / wall if wall > 0 else None,
+        'peak_rss_mb': peak,
+        'input_rss_mb': baseline if exact_peak else None,
+        'times_s': times,
+    }
+
+
+def run_stage(stage, bars, seed, repeat, workers):
+    """Measures a stage in a fresh interpreter, so earlier stages can't warm it up or inflate its peak RSS."""
+    cmd = [sys.executable, os.path.abspath(__file__), '_stage', stage, str(bars), '--seed', str(seed),
+           '--repeat', str(repeat), '--workers', str(workers)]
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'stage': stage, 'bars': bars, 'error': proc.stderr.strip().splitlines()[-1] if proc.stderr else 'failed'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def machine_info():
+    import numpy
+    import pandas
+    return {'python': platform.python_version(), 'numpy': numpy.__version__, 'pandas': pandas.__version__,
+            'platform': platform.platform(), 'cpus': os.cpu_count()}
+
+
+def compare(base, new, threshold):
+    """Rows comparing two result files; `regression` is set where throughput fell or peak RSS grew past `threshold`."""
+    base_rows = {(r['stage'], r['bars']): r for r in base['results'] if 'error' not in r}
+    rows = []
+    for r in new['results']:
+        old = base_rows.get((r['stage'], r['bars']))
+        if old is None or 'error' in r:
+            continue
+        speed = r['bars_per_s'] / old['bars_per_s'] - 1
+        memory = (r['peak_rss_mb'] / old['peak_rss_mb'] - 1) if r.get('peak_rss_mb') and old.get('peak_rss_mb') else 0.0
+        rows.append({
+            'stage': r['stage'], 'bars': r['bars'],
+            'base_bars_per_s': old['bars_per_s'], 'bars_per_s': r['bars_per_s'], 'speed_change': speed,
+            'base_peak_rss_mb': old.get('peak_rss_mb'), 'peak_rss_mb': r.get('peak_rss_mb'), 'rss_change': memory,
+            'regression': speed < -threshold or memory > threshold,
+        })
+    return rows
+
+
+def print_compare(rows, threshold):
+    print(f"{'stage':16} {'bars':>10} {'base bars/s':>13} {'bars/s':>13} {'speed':>8} {'base MB':>8} {'MB':>8} {'mem':>7}")
+    for r in rows:
+        flag = '  REGRESSION' if r['regression'] else ''
+        print(f"{r['stage']:16} {r['bars']:>10} {r['base_bars_per_s']:>13,.0f} {r['bars_per_s']:>13,.0f} "
+              f"{r['speed_change']:>+7.1%} {r['base_peak_rss_mb'] or 0:>8.0f} {r['peak_rss_mb'] or 0:>8.0f} "
+              f"{r['rss_change']:>+6.1%}{flag}")
+    regressions = sum(r['regression'] for r in rows)
+    print(f"\n{regressions} regression(s) past {threshold:.0%}" if regressions else f"\nNo regressions past {threshold:.0%}")
+    return regressions
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the data generator, indicators, "
+                                                 "engines and optimizer on seeded synthetic OHLCV.")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='{run,compare}')
+
+    run = commands.add_parser('run', help="Run the benchmarks and save a JSON result file")
+    run.add_argument('--sizes', default='10k,100k,1M', help="Comma-separated bar counts, e.g. 10k,1M,50M")
+    run.add_argument('--stages', default=','.join(STAGES), help=f"Comma-separated subset of {', '.join(STAGES)}")
+    run.add_argument('--repeat', type=int, default=3, help="Timed runs per stage and size; the fastest is kept")
+    run.add_argument('--seed', type=int, default=0, help="Synthetic data seed")
+    run.add_argument('--workers', type=int, default=1, help="Worker processes for the optimize stage")
+    run.add_argument('--no-caps', action='store_true', help="Run every stage at every size (see STAGE_MAX_BARS)")
+    run.add_argument('--label', default=None, help="Result name (default: a timestamp)")
+    run.add_argument('--out', default=None, help=f"Result JSON path (default: {DEFAULT_DIR}/<label>.json)")
+    run.add_argument('--compare', default=None, metavar='BASELINE', help="Compare against this result file afterwards")
+    run.add_argument('--threshold', type=float, default=0.10, help="Regression threshold, as a fraction")
+
+    cmp = commands.add_parser('compare', help="Compare two result files and flag regressions")
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=0.10, help="Regression threshold, as a fraction")
+
+    # Internal: one measurement in a fresh process (see run_stage). Kept out of --help by the metavar above.
+    stage = commands.add_parser('_stage')
+    stage.add_argument('stage', choices=STAGES)
+    stage.add_argument('bars', type=int)
+    stage.add_argument('--seed', type=int, default=0)
+    stage.add_argument('--repeat', type=int, default=3)
+    stage.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == '_stage':
+        print(json.dumps(measure(args.stage, args.bars, args.seed, args.repeat, args.workers)))
+        return 0
+
+    if args.command == 'compare':
+        return 1 if print_compare(compare(load_results(args.baseline), load_results(args.current), args.threshold),
+                                  args.threshold) else 0
+
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    stages = [name.strip() for name in args.stages.split(',')]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    label = args.label or datetime.now().strftime('%Y%m%d_%H%M%S')
+    out = args.out or os.path.join(DEFAULT_DIR, f"{label}.json")
+
+    results = []
+    print(f"{'stage':16} {'bars':>10} {'wall s':>9} {'bars/s':>14} {'peak MB':>9}")
+    for name in stages:
+        for bars in sizes:
+            if bars > STAGE_MAX_BARS[name] and not args.no_caps:
+                print(f"{name:16} {bars:>10}   skipped (over {STAGE_MAX_BARS[name]:,} bars; --no-caps to force)")
+                continue
+            row = run_stage(name, bars, args.seed, args.repeat, args.workers)
+            results.append(row)
+            if 'error' in row:
+                print(f"{name:16} {bars:>10}   failed: {row['error']}")
+            else:
+                print(f"{name:16} {bars:>10} {row['wall_s']:>9.3f} {row['bars_per_s']:>14,.0f} "
+                      f"{row['peak_rss_mb'] or 0:>9.0f}")
+
+    report = {'label': label, 'created': datetime.now().isoformat(timespec='seconds'), 'seed': args.seed,
+              'repeat': args.repeat, 'machine': machine_info(), 'results': results}
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {out}")
+
+    if args.compare:
+        print()
+        return 1 if print_compare(compare(load_results(args.compare), report, args.threshold), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.bar_pyramid import BarPyramid
+from core.data_store import DataStore
+
+# Converts every data/*.csv into the columnar store (data/store) once.
+# Unchanged files are skipped, so this is cheap to re-run after each fetch.
+start = time.perf_counter()
+store = DataStore()
+imported = store.sync_csv_dir("data")
+print(f"Imported {len(imported)} file(s) in {time.perf_counter() - start:.2f}s")
+
+print("\n--- Catalog ---")
+for name, meta in sorted(store.catalog().items()):
+    print(f"{name:32} {meta.get('symbol', '?'):8} {meta.get('exchange', '?'):10} "
+          f"{meta.get('timeframe', '?'):4} {meta['rows']:>9} rows  {meta['start']} -> {meta['end']}")
+
+# Coarser timeframes of every 1m dataset, so backtests can ask for e.g. 1h bars by name.
+pyramid = BarPyramid(store)
+for name, meta in sorted(store.catalog().items()):
+    if meta.get('timeframe') == '1m' and not meta.get('derived_from'):
+        start = time.perf_counter()
+        rebuilt = pyramid.update(name)
+        print(f"{name}: rollups {', '.join(f'{tf} (+{rows})' for tf, rows in rebuilt.items())} "
+              f"in {time.perf_counter() - start:.2f}s")
@@ -1,11 +1,14 @@
 import ccxt
-import pandas as pd
-import time
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fetch_engine import OHLCVFetcher
+
 # === CONFIG ===
-exchange = ccxt.binanceus()
+exchange = ccxt.binanceus({'enableRateLimit': True})
 symbol = 'ETH/USD'
 timeframe = '1m'
 limit = 1000
@@ -13,11 +16,11 @@ limit = 1000
 # --- CHANGE 1: Set days to 60 ---
 days = 60 
 
-# --- CHANGE 2: Set a new output path ---
-output_path = f'data/eth_usd_binanceus_{days}d_1m.csv' 
+# --- CHANGE 2: Set a new dataset name ---
+# Bars go into the data store (data/store/<name>); re-running only fetches what's missing.
+dataset = f'eth_usd_binanceus_{days}d_1m'
 log_file = f'logs/binanceus_1m_{days}d_log.txt'
 
-os.makedirs("data", exist_ok=True)
 os.makedirs("logs", exist_ok=True)
 
 def log(msg):
@@ -26,32 +29,8 @@ def log(msg):
     with open(log_file, "a", encoding="utf-8", errors="ignore") as f:
         f.write(line + "\n")
 
-# === FETCH LOOP ===
-since = exchange.parse8601((pd.Timestamp.utcnow() - pd.Timedelta(days=days)).isoformat())
-now = exchange.milliseconds()
-all_candles = []
-
+# === FETCH ===
 log(f"Starting fetch: {symbol}, {timeframe}, {days}d")
-
-while since < now:
-    try:
-        log(f"Fetching from: {pd.to_datetime(since, unit='ms')}")
-        candles = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
-        if not candles:
-            log("[WARN] No candles returned. Exiting.")
-            break
-        all_candles.extend(candles)
-        since = candles[-1][0] + 60_000
-        time.sleep(1.25)
-    except Exception as e:
-        log(f"[ERROR] {e}")
-        time.sleep(3)
-
-# === SAVE ===
-if all_candles:
-    df = pd.DataFrame(all_candles, columns=["time", "open", "high", "low", "close", "volume"])
-    df['time'] = pd.to_datetime(df['time'], unit='ms')
-    df.to_csv(output_path, index=False)
-    log(f"[SUCCESS] Saved {len(df)} rows to: {output_path}")
-else:
-    log("[FAILED] No data collected.")
\ No newline at end of file
+fetcher = OHLCVFetcher(exchange, log=log)
+new_rows = fetcher.fetch(dataset, symbol, timeframe, days=days, limit=limit)
+log(f"[SUCCESS] {new_rows} new rows, {fetcher.store.info(dataset)['rows']} stored in: {dataset}")
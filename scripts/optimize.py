@@ -1,99 +1,125 @@
-﻿import os
+import os
 import sys
+import argparse
 import pandas as pd
-import json
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from core import instrumentation
 from core.trade_engine import TradeEngine
-from strategies.strategy import EthScalpStrategyOHLCV
-
-print("--- Starting Optimization Process (Partial Take-Profit) ---")
-
-data_path = 'data/eth_usd_binanceus_60d_1m.csv'
-df = pd.read_csv(data_path, parse_dates=['time'])
-print(f"Data loaded successfully from: {data_path}")
-
-print("\n--- Splitting data into Training and Testing sets ---")
-split_point = int(len(df) * 0.8)
-df_train = df.iloc[:split_point].copy()
-df_test = df.iloc[split_point:].copy()
-print(f"Training set size: {len(df_train)} data points")
-print(f"Testing set size: {len(df_test)} data points")
-
-# --- Grid Search including the new TP1 parameter ---
-rsi_values = [10, 15]
-tp2_atr_values = [4.0, 6.0] # This is our final target (TP2)
-sl_atr_values = [1.5, 2.0]
-cooldowns = [10, 20]
-atr_threshold_values = [0.1, 0.2]
-# NEW: Add values for our first, closer take-profit (TP1)
-tp1_atr_values = [1.5, 2.0]
-results = []
-print("\n--- Running optimization on TRAINING data... ---")
-
-for rsi in rsi_values:
-    for tp2 in tp2_atr_values:
-        for sl in sl_atr_values:
-            for cooldown in cooldowns:
-                for atr_thresh in atr_threshold_values:
-                    for tp1 in tp1_atr_values: # New inner loop for TP1
-                        # Ensure TP1 is always less than TP2
-                        if tp1 >= tp2:
-                            continue
-
-                        engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
-                        strategy = EthScalpStrategyOHLCV(
-                            rsi_threshold=rsi,
-                            tp_atr=tp2, # Pass the final target
-                            sl_atr=sl,
-                            cooldown_minutes=cooldown,
-                            atr_threshold=atr_thresh,
-                            tp1_atr=tp1 # Pass the new partial target
-                        )
-                        metrics = engine.run_backtest(df_train, strategy)
-                        # Log all parameters
-                        results.append({
-                            "RSI": rsi, "TP_ATR": tp2, "SL_ATR": sl,
-                            "Cooldown": cooldown, "ATR_Thresh": atr_thresh,
-                            "TP1_ATR": tp1, **metrics
-                        })
-
-df_result = pd.DataFrame(results).sort_values(by="TotalPnL", ascending=False)
-
-if not df_result.empty:
-    best_params = df_result.iloc[0].to_dict()
+from core.indicator_cache import IndicatorCache
+from core.data_store import load_ohlcv
+from core.optimizer import build_grid, make_strategy
+from core.search import SEARCHERS, optimize_split
+from core.walk_forward import walk_forward
+from core.results_store import DEFAULT_RESULTS_DB, ResultsStore
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Grid-search EthScalpStrategyOHLCV parameters.")
+    parser.add_argument('--data', default='data/eth_usd_binanceus_60d_1m.csv', help="OHLCV CSV path or data store dataset name")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for the grid search (0 = all cores)")
+    parser.add_argument('--mode', choices=['arrays', 'events', 'batch'], default='arrays',
+                        help="Backtest engine mode ('batch' simulates many parameter sets per pass)")
+    parser.add_argument('--timeframe', default=None,
+                        help="Bar size to optimize on, e.g. 5m or 1h (rolled up from the base data and cached)")
+    parser.add_argument('--search', choices=sorted(SEARCHERS), default='grid',
+                        help="'grid' runs every PARAM_GRID combination; the others sample SEARCH_SPACE "
+                             "and prune losing parameter sets on short slices of the training data")
+    parser.add_argument('--budget', type=float, default=24,
+                        help="Evaluation budget for the non-grid searches, in full-length backtests")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the non-grid searches")
+    parser.add_argument('--results-db', default=DEFAULT_RESULTS_DB,
+                        help="SQLite file of earlier results; parameter sets already run on this data and code are skipped")
+    parser.add_argument('--no-results-db', action='store_true', help="Backtest everything, without reading or saving results")
+    parser.add_argument('--walk-forward', type=int, default=0, metavar='N',
+                        help="Walk-forward validation over N test windows instead of one 80/20 split")
+    parser.add_argument('--train-ratio', type=float, default=4.0, help="Walk-forward training window length, in test windows")
+    parser.add_argument('--anchored', action='store_true', help="Walk-forward training windows all start at the beginning")
+    instrumentation.add_arguments(parser, report='logs/optimize_report.json')
+    return parser.parse_args(argv)
+
+
+def run_walk_forward(df, args):
+    print(f"\n--- Walk-forward: {args.walk_forward} {'anchored' if args.anchored else 'rolling'} windows, "
+          f"{args.search} search, {args.workers} worker(s) ---")
+    # Indicators over the whole series once; every window is a slice of these arrays.
+    with instrumentation.stage('prepare'):
+        market = TradeEngine.market_arrays(df, make_strategy(build_grid()[0], IndicatorCache()))
+    with instrumentation.stage('walk_forward'):
+        result = walk_forward(market, n_windows=args.walk_forward, train_ratio=args.train_ratio, anchored=args.anchored,
+                              search=args.search, budget=args.budget, workers=args.workers, mode=args.mode,
+                              seed=args.seed, results_db=None if args.no_results_db else args.results_db,
+                              dataset=args.data)
+
+    windows = pd.DataFrame(result['windows'])
+    print(windows.to_string(index=False))
+    os.makedirs('logs', exist_ok=True)
+    windows.to_csv('logs/walk_forward_windows.csv', index=False)
+
+    print("\n\n--- OUT-OF-SAMPLE PERFORMANCE (stitched test windows) ---")
+    print(pd.Series(result['stats']).to_string())
+    print("-------------------------------------------------")
+    result['engine'].plot_equity_curve(save_path='logs/walk_forward_equity_curve.png',
+                                       times=result['times'].view('datetime64[ns]'))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # --instrument / --profile: stage times and counters of the whole run in args.report.
+    with instrumentation.from_args(args, label='optimize'):
+        run_optimization(args)
+
+
+def run_optimization(args):
+    print("--- Starting Optimization Process (Partial Take-Profit) ---")
+
+    data_path = args.data
+    with instrumentation.stage('load'):
+        df = load_ohlcv(data_path, timeframe=args.timeframe)
+    print(f"Data loaded successfully from: {data_path}" + (f" ({args.timeframe} bars)" if args.timeframe else ""))
+
+    if args.walk_forward:
+        run_walk_forward(df, args)
+        return
+
+    if args.search == 'grid':
+        print(f"\n--- Running optimization on TRAINING data ({len(build_grid())} combinations, {args.workers} worker(s))... ---")
+    else:
+        print(f"\n--- Running {args.search} search on TRAINING data (budget {args.budget:g} backtests, {args.workers} worker(s))... ---")
+    # RSI/ATR/SMA200 don't depend on the grid, so they are computed once per dataset and reused
+    # for every combination (and across runs, via data/.indicator_cache).
+    indicator_cache = IndicatorCache()
+    results_store = None if args.no_results_db else ResultsStore(args.results_db)
+    try:
+        outcome = optimize_split(df, args.search, budget=args.budget, workers=args.workers, mode=args.mode,
+                                 seed=args.seed, results_store=results_store, dataset=args.data,
+                                 config_path='configs/best_config.json', indicator_cache=indicator_cache)
+    finally:
+        if results_store is not None:
+            results_store.close()
+    print(f"Training set size: {len(outcome['df_train'])} data points")
+    print(f"Testing set size: {len(outcome['df_test'])} data points")
+    print(f"Indicator cache: {indicator_cache.hits} memory hits, {indicator_cache.disk_hits} disk hits, {indicator_cache.misses} computed")
+    if results_store is not None:
+        print(f"Results store: {results_store.hits} reused, {results_store.misses} backtested ({args.results_db})")
+    print(f"{outcome['calls']} backtest calls, {outcome['cost']:.1f} full-length equivalents, "
+          f"{len(outcome['train_results'])} parameter sets run on the full training set")
+
+    if outcome['best_params'] is None:
+        print("\n--- No trades were executed during the optimization. ---")
+        return
+
     print("\n--- Best parameters found during training ---")
-    print(best_params)
-
-    best_config = {
-        "rsi_threshold": int(best_params["RSI"]),
-        "tp_atr": float(best_params["TP_ATR"]),
-        "sl_atr": float(best_params["SL_ATR"]),
-        "cooldown_minutes": int(best_params["Cooldown"]),
-        "atr_threshold": float(best_params["ATR_Thresh"]),
-        "tp1_atr": float(best_params["TP1_ATR"]) # Save the best TP1
-    }
-    with open('configs/best_config.json', 'w') as f:
-        json.dump(best_config, f, indent=2)
+    print(outcome['train_results'][0])
     print("\nBest settings automatically saved to 'configs/best_config.json'")
 
-    print("\n--- Running a final validation test on UNSEEN data... ---")
-    final_engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
-    final_strategy = EthScalpStrategyOHLCV(
-        rsi_threshold=best_config["rsi_threshold"],
-        tp_atr=best_config["tp_atr"],
-        sl_atr=best_config["sl_atr"],
-        cooldown_minutes=best_config["cooldown_minutes"],
-        atr_threshold=best_config["atr_threshold"],
-        tp1_atr=best_config["tp1_atr"] # Use the best TP1
-    )
-    final_stats = final_engine.run_backtest(df_test, final_strategy)
-
-    print("\n\n--- FINAL VALIDATION PERFORMANCE ---")
-    print(pd.Series(final_stats).to_string())
+    print("\n\n--- FINAL VALIDATION PERFORMANCE (unseen data) ---")
+    print(pd.Series(outcome['stats']).to_string())
     print("-------------------------------------------------")
 
-    final_engine.plot_equity_curve(save_path='logs/final_validation_equity_curve.png')
-else:
-    print("\n--- No trades were executed during the optimization. ---")
\ No newline at end of file
+    outcome['engine'].plot_equity_curve(save_path='logs/final_validation_equity_curve.png')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import instrumentation
+from core.portfolio_engine import align_markets, prepare_markets, run_portfolio, symbol_summary
+from core.optimizer import load_strategy
+from strategies.strategy import EthScalpStrategyOHLCV
+
+
+def parse_sources(specs):
+    """'SYMBOL=path' (or a bare path, named after its file) -> {symbol: path or dataset name}."""
+    sources = {}
+    for spec in specs:
+        symbol, sep, path = spec.partition('=')
+        if not sep:
+            path, symbol = spec, os.path.splitext(os.path.basename(spec))[0]
+        sources[symbol] = path
+    return sources
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the strategy on many symbols from one shared pool of capital.")
+    parser.add_argument('data', nargs='*', help="SYMBOL=path entries (CSV path or data store dataset name), "
+                                                "in order of preference when entries compete")
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                        help="Add N seeded synthetic symbols (core.synthetic), e.g. for offline tests")
+    parser.add_argument('--bars', type=int, default=90 * 1440, help="Bars per synthetic symbol (default 90 days of 1m)")
+    parser.add_argument('--config', default='configs/best_config.json', help="Strategy parameters JSON file")
+    parser.add_argument('--timeframe', default=None, help="Bar size to backtest on, e.g. 5m or 1h")
+    parser.add_argument('--starting-equity', type=float, default=1000)
+    parser.add_argument('--risk-per-trade', type=float, default=0.01, help="Fraction of equity risked per entry")
+    parser.add_argument('--max-positions', type=int, default=None, help="Most positions open at once")
+    parser.add_argument('--max-risk', type=float, default=None,
+                        help="Most equity (as a fraction) lost if every open position hit its stop")
+    parser.add_argument('--workers', type=int, default=1, help="Processes computing per-symbol indicators (0 = all cores)")
+    parser.add_argument('--log', default='logs/portfolio_trade_log.csv',
+                        help="Trade log output (.csv, or .parquet with pyarrow installed), with a symbol column")
+    parser.add_argument('--plot', default='logs/portfolio_equity_curve.png', help="Equity curve image ('' to skip)")
+    instrumentation.add_arguments(parser, report='logs/portfolio_report.json')
+    args = parser.parse_args(argv)
+
+    sources = parse_sources(args.data)
+    if args.synthetic:
+        from core.synthetic import synthetic_frame
+        for j in range(args.synthetic):
+            sources[f"SYN{j:03d}"] = synthetic_frame(args.bars, seed=j, start_price=100.0 * (j + 1))
+    if not sources:
+        parser.error("give at least one SYMBOL=path or --synthetic N")
+
+    with instrumentation.from_args(args, label='portfolio'):
+        try:
+            strategy = load_strategy(args.config)
+        except FileNotFoundError:
+            print(f"No {args.config}; using the default strategy parameters")
+            strategy = EthScalpStrategyOHLCV()
+        print(f"--- Preparing {len(sources)} symbols ({args.workers} worker(s)) ---")
+        markets = prepare_markets(sources, strategy, timeframe=args.timeframe, workers=args.workers)
+        with instrumentation.stage('align'):
+            panel = align_markets(markets)
+        del markets
+        print(f"{len(panel['time'])} aligned bars x {len(panel['symbols'])} symbols")
+
+        with instrumentation.stage('portfolio'):
+            result = run_portfolio(panel, strategy, starting_equity=args.starting_equity,
+                                   risk_per_trade=args.risk_per_trade, max_positions=args.max_positions,
+                                   max_total_risk=args.max_risk)
+
+        print("\n--- PORTFOLIO PERFORMANCE ---")
+        print(pd.Series(result['stats']).to_string())
+        print("\n--- Per symbol ---")
+        print(symbol_summary(result).to_string(index=False))
+
+        if args.log:
+            os.makedirs(os.path.dirname(args.log) or '.', exist_ok=True)
+            log = result['trade_log'].to_frame()
+            log.insert(1, 'symbol', pd.Categorical.from_codes(result['trade_symbols'], result['symbols']))
+            if args.log.endswith('.parquet'):
+                log.to_parquet(args.log, index=False)
+            else:
+                log.to_csv(args.log, index=False)
+            print(f"\nTrade log saved to {args.log}")
+        if args.plot:
+            from utils.plotting import render_equity_curve
+            render_equity_curve(result['equity_curve'], args.plot, times=result['times'].view('datetime64[ns]'),
+                                title='Portfolio Equity Curve',
+                                ylabel=f'Equity (starting from ${args.starting_equity:g})')
+            print(f"Equity curve plot saved to {args.plot}")
+    return result['stats']
+
+
+if __name__ == '__main__':
+    main()
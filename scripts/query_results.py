@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.results_store import DEFAULT_RESULTS_DB, ResultsStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query stored optimizer results without rerunning any backtests.")
+    parser.add_argument('--db', default=DEFAULT_RESULTS_DB, help="Results SQLite file")
+    parser.add_argument('--top', type=int, default=10, help="Number of rows")
+    parser.add_argument('--metric', default='TotalPnL', help="Metric to rank by")
+    parser.add_argument('--dataset', default=None, help="Only results on this dataset (the optimize.py --data value)")
+    parser.add_argument('--min-trades', type=int, default=None, help="Only results with at least this many trades")
+    parser.add_argument('--where', nargs='*', default=[], metavar='PARAM=VALUE', help="Exact parameter values, e.g. RSI=10")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    where = dict(item.split('=', 1) for item in args.where)
+    rows = store.top(args.top, metric=args.metric, dataset=args.dataset, min_trades=args.min_trades, where=where)
+    print(f"{store.count()} stored results in {args.db}")
+    if rows:
+        df = pd.DataFrame(rows).drop(columns=['data_fp', 'code_hash', 'created_at'])
+        print(df.to_string(index=False))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
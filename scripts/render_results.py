@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_store import load_ohlcv
+from core.indicator_cache import IndicatorCache
+from core.optimizer import build_grid, make_strategy
+from core.result_plots import render_results
+from core.results_store import DEFAULT_RESULTS_DB, ResultsStore
+from core.trade_engine import TradeEngine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the best stored optimizer results and save their equity curves.")
+    parser.add_argument('--data', required=True, help="OHLCV CSV path or data store dataset name to backtest on")
+    parser.add_argument('--timeframe', default=None, help="Bar size, e.g. 5m or 1h")
+    parser.add_argument('--db', default=DEFAULT_RESULTS_DB, help="Results SQLite file")
+    parser.add_argument('--top', type=int, default=20, help="Number of results to render")
+    parser.add_argument('--metric', default='TotalPnL', help="Metric to rank by")
+    parser.add_argument('--dataset', default=None, help="Only results on this dataset (default: --data)")
+    parser.add_argument('--out', default='logs/plots', help="Output directory for the PNGs")
+    parser.add_argument('--workers', type=int, default=0, help="Worker processes (0 = all cores)")
+    parser.add_argument('--method', choices=['minmax', 'lttb'], default='minmax', help="Downsampling method")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    rows = store.top(args.top, metric=args.metric, dataset=args.dataset or args.data)
+    store.close()
+    if not rows:
+        print(f"No stored results for {args.dataset or args.data} in {args.db}")
+        return
+
+    df = load_ohlcv(args.data, timeframe=args.timeframe)
+    market = TradeEngine.market_arrays(df, make_strategy(build_grid()[0], IndicatorCache()))
+    paths = render_results(market, rows, out_dir=args.out, workers=args.workers, method=args.method)
+    print(f"Saved {len(paths)} equity curves to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.performance import load_trade_log, plot_cumulative_pnl, summarize_trades
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a saved trade log.")
+    parser.add_argument('--log', default='logs/best_strategy_full_backtest_log.csv',
+                        help="Trade log (.csv, .npy, or .parquet/.arrow with pyarrow installed)")
+    parser.add_argument('--plot', action='store_true', help="Also show the cumulative PnL chart")
+    args = parser.parse_args(argv)
+
+    trade_log = load_trade_log(args.log)
+    summary = summarize_trades(trade_log)
+    for key, value in summary.items():
+        print(f"{key:15} {value}")
+    if args.plot:
+        plot_cumulative_pnl(trade_log)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_store import load_ohlcv
+from core.optimizer import load_strategy
+from core.robustness import run_robustness, summarize_robustness
+from core.trade_engine import TradeEngine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo robustness of configs/best_config.json: trade-order shuffles, "
+                    "random trade skips and a block bootstrap of period returns.")
+    parser.add_argument('--config', default='configs/best_config.json', help="Best-parameters JSON file")
+    parser.add_argument('--data', default='data/eth_usd_binanceus_120d_1m.csv', help="OHLCV CSV path or data store dataset name")
+    parser.add_argument('--timeframe', default=None, help="Bar size to backtest on, e.g. 5m or 1h")
+    parser.add_argument('--sims', type=int, default=100_000, help="Simulations of each kind")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (0 = all cores)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--skip-prob', type=float, default=0.1, help="Chance of missing each trade in the skip simulation")
+    parser.add_argument('--block', type=int, default=5, help="Bootstrap block length, in periods")
+    parser.add_argument('--period-bars', type=int, default=1440, help="Bars per bootstrap period (1440 = a day of 1m bars)")
+    parser.add_argument('--out', default='logs/robustness_summary.csv', help="Summary CSV")
+    parser.add_argument('--plot', default='logs/robustness.png', help="Histogram PNG ('' to skip)")
+    args = parser.parse_args(argv)
+
+    strategy = load_strategy(args.config)
+    df = load_ohlcv(args.data, timeframe=args.timeframe)
+    engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
+    stats = engine.run_backtest(df, strategy, mode='arrays')
+    print(f"Backtest on {args.data}: {stats['TotalTrades']} trades, TotalPnL {stats['TotalPnL']}")
+
+    start = time.perf_counter()
+    results = run_robustness(engine.trade_log, engine.equity_curve, n_sims=args.sims, seed=args.seed,
+                             workers=args.workers, skip_prob=args.skip_prob, block=args.block,
+                             bars_per_period=args.period_bars)
+    print(f"{args.sims} simulations of each kind in {time.perf_counter() - start:.1f}s\n")
+
+    summary = summarize_robustness(results)
+    with pd.option_context('display.width', 200):
+        print(summary.round(2).to_string(index=False))
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    summary.to_csv(args.out, index=False)
+    if args.plot:
+        from utils.plotting import render_robustness
+        render_robustness(results, args.plot)
+        print(f"\nHistograms saved to {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
+import numpy as np
 import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.volatility import AverageTrueRange
-from ta.trend import SMAIndicator
+from core import instrumentation
+from core.indicator_cache import data_fingerprint
 
 class EthScalpStrategyOHLCV:
-    def __init__(self, rsi_threshold=15, tp_atr=4.0, sl_atr=1.5, cooldown_minutes=0, atr_threshold=0.1, tp1_atr=2.0):
+    def __init__(self, rsi_threshold=15, tp_atr=4.0, sl_atr=1.5, cooldown_minutes=0, atr_threshold=0.1, tp1_atr=2.0, indicator_cache=None):
         self.rsi_threshold = rsi_threshold
         # tp_atr is now our second, final take-profit (TP2)
         self.tp2_atr = tp_atr
@@ -13,11 +13,36 @@ class EthScalpStrategyOHLCV:
         self.atr_threshold = atr_threshold
         # NEW: The first, closer take-profit (TP1)
         self.tp1_atr = tp1_atr
+        # Optional core.indicator_cache.IndicatorCache. None of the indicators depend on
+        # the swept parameters, so an optimizer can share one cache across all strategies.
+        self.indicator_cache = indicator_cache
 
     def prepare_indicators(self, df):
-        df['RSI'] = RSIIndicator(close=df['close'], window=3).rsi()
-        df['ATR'] = AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=14).average_true_range()
-        df['SMA200'] = SMAIndicator(close=df['close'], window=200).sma_indicator()
+        # Timed as the 'indicators' stage when core.instrumentation is enabled.
+        with instrumentation.stage('indicators'):
+            return self._compute_indicators(df)
+
+    def _compute_indicators(self, df):
+        # Imported here so commands that never compute indicators don't pay for `ta`.
+        from ta.momentum import RSIIndicator
+        from ta.volatility import AverageTrueRange
+        from ta.trend import SMAIndicator
+
+        if self.indicator_cache is None:
+            df['RSI'] = RSIIndicator(close=df['close'], window=3).rsi()
+            df['ATR'] = AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=14).average_true_range()
+            df['SMA200'] = SMAIndicator(close=df['close'], window=200).sma_indicator()
+            return df
+
+        cache = self.indicator_cache
+        fingerprint = data_fingerprint(df)
+        df['RSI'] = cache.get_or_compute(
+            fingerprint, 'RSI', 3, lambda: RSIIndicator(close=df['close'], window=3).rsi())
+        df['ATR'] = cache.get_or_compute(
+            fingerprint, 'ATR', 14,
+            lambda: AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=14).average_true_range())
+        df['SMA200'] = cache.get_or_compute(
+            fingerprint, 'SMA', 200, lambda: SMAIndicator(close=df['close'], window=200).sma_indicator())
         return df
 
     def generate_signal(self, row, prev_row):
@@ -30,6 +55,17 @@ class EthScalpStrategyOHLCV:
         
         return 'HOLD'
 
+    def entry_signals(self, market):
+        # Vectorized generate_signal over the whole series: True where a BUY would fire.
+        close, rsi, atr, sma = market['close'], market['RSI'], market['ATR'], market['SMA200']
+        prev_rsi = np.empty_like(rsi)
+        prev_rsi[0] = np.nan
+        prev_rsi[1:] = rsi[:-1]
+        is_volatile_enough = atr > self.atr_threshold
+        is_uptrend = close > sma
+        rsi_crossed_up = (prev_rsi < self.rsi_threshold) & (rsi >= self.rsi_threshold)
+        return is_uptrend & rsi_crossed_up & is_volatile_enough
+
     def get_exit_levels(self, row, entry_price):
         atr = row['ATR']
         # Define both TP1 and TP2 levels
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Same as the scripts: make `core`, `strategies`, ... importable from the repo root.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
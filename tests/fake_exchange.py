@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import numpy as np
+
+_TIMEFRAME_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+class FakeExchange:
+    """
+    Offline stand-in for a ccxt exchange. fetch_ohlcv has the ccxt signature and
+    returns deterministic synthetic candles (the same timestamp always gives the
+    same bar), so fetch code can be exercised without a network.
+    `missing` is a set of candle timestamps (ms) the exchange never returns,
+    to mimic quiet minutes with no trades.
+    """
+
+    id = 'fake'
+
+    def __init__(self, now_ms, history_days=365, max_limit=720, missing=None):
+        self.now_ms = now_ms
+        self.first_ms = now_ms - history_days * 86_400_000
+        self.max_limit = max_limit
+        self.missing = set(missing or ())
+        self.calls = 0
+
+    def milliseconds(self):
+        return self.now_ms
+
+    def parse_timeframe(self, timeframe):
+        return int(timeframe[:-1]) * _TIMEFRAME_UNITS[timeframe[-1]]
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        self.calls += 1
+        step = self.parse_timeframe(timeframe) * 1000
+        limit = min(limit or self.max_limit, self.max_limit)
+        since = self.first_ms if since is None else max(since, self.first_ms)
+        first = -(-since // step) * step
+        last = (self.now_ms // step) * step  # the current bar is still forming
+        stamps = np.arange(first, min(first + limit * step, last), step, dtype=np.int64)
+        if self.missing:
+            stamps = stamps[~np.isin(stamps, list(self.missing))]
+        return [list(row) for row in zip(stamps.tolist(), *self._bars(stamps, step))]
+
+    @staticmethod
+    def _bars(stamps, step):
+        # Cheap integer hash of the timestamp drives every field, so pages overlap consistently.
+        x = (stamps // step).astype(np.uint64)
+        x = (x ^ (x >> np.uint64(31))) * np.uint64(0x9E3779B97F4A7C15)
+        noise = (x >> np.uint64(11)).astype(np.float64) / float(1 << 53) - 0.5
+        minutes = stamps / 60_000.0
+        close = 2500 + 40 * np.sin(minutes / 720.0) + 5 * np.sin(minutes / 37.0) + 2 * noise
+        open_ = close - noise
+        high = np.maximum(open_, close) + np.abs(noise)
+        low = np.minimum(open_, close) - np.abs(noise)
+        volume = 1 + np.abs(noise) * 10
+        return open_.round(2).tolist(), high.round(2).tolist(), low.round(2).tolist(), close.round(2).tolist(), volume.tolist()
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class AsyncFakeExchange(FakeExchange):
+    """
+    Async flavour of FakeExchange for the fetch scheduler: every request takes
+    `latency` seconds, and more than `rate_limit` requests within any one-second
+    window raise RateLimitExceeded, like an exchange answering HTTP 429.
+    """
+
+    def __init__(self, now_ms, latency=0.05, rate_limit=10, **kwargs):
+        super().__init__(now_ms, **kwargs)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rejected = 0
+        self._recent = []
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        now = time.monotonic()
+        self._recent = [t for t in self._recent if now - t < 1.0]
+        if self.rate_limit and len(self._recent) >= self.rate_limit:
+            self.rejected += 1
+            raise RateLimitExceeded(f"{self.id}: more than {self.rate_limit} requests per second")
+        self._recent.append(now)
+        await asyncio.sleep(self.latency)
+        return FakeExchange.fetch_ohlcv(self, symbol, timeframe, since, limit, params)
+
+    async def close(self):
+        pass
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from core.bar_pyramid import BarPyramid, rollup_arrays
+from core.data_store import DataStore
+from core.synthetic import synthetic_ohlcv
+
+TIMEFRAMES = ('5m', '15m', '1h')
+
+
+@pytest.fixture(scope='module')
+def base():
+    """Two days of 1m bars with every 13th hour missing."""
+    bars = synthetic_ohlcv(2 * 1440, seed=9)
+    keep = (bars['time'] // 3_600_000_000_000) % 13 != 0
+    return {col: np.asarray(values)[keep] for col, values in bars.items()}
+
+
+def assert_levels_match(store, pyramid, base):
+    for tf in TIMEFRAMES:
+        expected = rollup_arrays(base, tf)
+        level = store.load_arrays(pyramid.level_name('eth', tf))
+        for col, values in expected.items():
+            assert np.array_equal(level[col], values), (tf, col)
+
+
+def sliced(bars, lo, hi):
+    return {col: values[lo:hi] for col, values in bars.items()}
+
+
+def test_appended_bars_extend_each_level(tmp_path, base):
+    store = DataStore(str(tmp_path / 'store'))
+    pyramid = BarPyramid(store, TIMEFRAMES)
+    # Cuts that fall inside 5m, 15m and 1h bars, so the last bar of each level is still forming.
+    cuts = [0, 1003, 1777, 2502, len(base['time'])]
+    store.write('eth', sliced(base, 0, cuts[1]), timeframe='1m')
+    pyramid.update('eth')
+    for lo, hi in zip(cuts[1:], cuts[2:]):
+        store.append('eth', sliced(base, lo, hi))
+        rebuilt = pyramid.update('eth')
+        # Only the bars from the previous last one on are recomputed.
+        for tf, rows in rebuilt.items():
+            assert rows <= len(rollup_arrays(sliced(base, lo, hi), tf)['time']) + 1
+        assert_levels_match(store, pyramid, sliced(base, 0, hi))
+
+    assert pyramid.update('eth') == {tf: 0 for tf in TIMEFRAMES}
+
+
+def test_rewritten_base_rebuilds_levels(tmp_path, base):
+    store = DataStore(str(tmp_path / 'store'))
+    pyramid = BarPyramid(store, TIMEFRAMES)
+    store.write('eth', sliced(base, 1000, None), timeframe='1m')
+    pyramid.update('eth')
+
+    # A backfill adds older history, so the levels can't just be extended.
+    store.write('eth', base, timeframe='1m')
+    rebuilt = pyramid.update('eth')
+    assert rebuilt == {tf: len(rollup_arrays(base, tf)['time']) for tf in TIMEFRAMES}
+    assert_levels_match(store, pyramid, base)
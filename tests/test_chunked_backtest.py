@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from core.chunked import iter_dataset_chunks, iter_frame_chunks
+from core.data_store import DataStore, read_ohlcv_csv
+from core.synthetic import synthetic_frame
+from core.trade_engine import TradeEngine
+from strategies.strategy import EthScalpStrategyOHLCV
+
+STRATEGIES = [
+    dict(rsi_threshold=15, tp_atr=4.0, sl_atr=1.5, cooldown_minutes=0, atr_threshold=0.1, tp1_atr=2.0),
+    dict(rsi_threshold=10, tp_atr=2.0, sl_atr=0.5, cooldown_minutes=30, atr_threshold=1.0, tp1_atr=1.5),
+]
+
+
+@pytest.fixture(scope='module')
+def df():
+    return synthetic_frame(6000, seed=11)
+
+
+def assert_same(engine, stats, reference, reference_stats):
+    assert reference_stats['TotalTrades'] > 0
+    assert stats == reference_stats
+    assert np.array_equal(engine.trade_log.values, reference.trade_log.values)
+    # Same hold() sequence, so the running accumulators agree to the last bit too.
+    assert (engine.stats.mean, engine.stats.m2, engine.stats.downside_sq) == \
+           (reference.stats.mean, reference.stats.m2, reference.stats.downside_sq)
+
+
+@pytest.mark.parametrize('params', STRATEGIES)
+@pytest.mark.parametrize('chunk_bars', [50, 199, 1000, 4096, 10_000])
+def test_chunked_matches_arrays(df, params, chunk_bars):
+    strategy = EthScalpStrategyOHLCV(**params)
+    reference = TradeEngine()
+    reference_stats = reference.run_backtest(df, strategy, mode='arrays')
+
+    engine = TradeEngine()
+    stats = engine.run_backtest_chunked(iter_frame_chunks(df, chunk_bars), strategy, keep_curve=True)
+    assert_same(engine, stats, reference, reference_stats)
+    assert np.array_equal(engine.equity_curve.values, reference.equity_curve.values)
+
+
+def test_dataset_chunks_stream_curve_to_disk(df, tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    store.write('syn_1m', df)
+    strategy = EthScalpStrategyOHLCV(**STRATEGIES[0])
+    reference = TradeEngine()
+    reference_stats = reference.run_backtest(df, strategy, mode='arrays')
+
+    engine = TradeEngine()
+    curve_path = tmp_path / 'curve.bin'
+    stats = engine.run_backtest_chunked(iter_dataset_chunks('syn_1m', chunk_bars=777, store=store), strategy,
+                                        curve_path=str(curve_path))
+    assert_same(engine, stats, reference, reference_stats)
+    # Drained chunk by chunk: nothing left in memory, all of it on disk.
+    assert len(engine.equity_curve.values) == 0
+    assert len(engine.equity_curve) == len(reference.equity_curve)
+    assert np.array_equal(np.fromfile(curve_path, dtype=np.float64), reference.equity_curve.values)
+
+
+def test_csv_is_imported_in_chunks(df, tmp_path):
+    path = tmp_path / 'syn_1m.csv'
+    df.to_csv(path, index=False)
+    store = DataStore(str(tmp_path / 'store'))
+    entry = store.import_csv(str(path), chunk_rows=1000)
+    assert entry['rows'] == len(df)
+    loaded = store.load_frame('syn_1m')
+    expected = read_ohlcv_csv(str(path))
+    assert np.array_equal(loaded['time'].to_numpy(dtype='datetime64[ns]'),
+                          expected['time'].to_numpy(dtype='datetime64[ns]'))
+    for col in ('open', 'high', 'low', 'close', 'volume'):
+        assert np.array_equal(loaded[col].to_numpy(), expected[col].to_numpy()), col
@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.bar_pyramid import BarPyramid
+from core.data_store import DataStore, load_ohlcv, read_ohlcv_csv
+from core.synthetic import synthetic_frame
+
+NAME = 'eth_usd_kraken_3d_1m'
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / f"{NAME}.csv"
+    synthetic_frame(3 * 1440, seed=2).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DataStore(str(tmp_path / 'store'))
+
+
+def assert_frames_equal(df, expected):
+    expected = expected.reset_index(drop=True)
+    assert list(df.columns) == list(expected.columns)
+    assert np.array_equal(df['time'].to_numpy(dtype='datetime64[ns]'), expected['time'].to_numpy(dtype='datetime64[ns]'))
+    for col in ('open', 'high', 'low', 'close', 'volume'):
+        assert np.array_equal(df[col].to_numpy(), expected[col].to_numpy(dtype=np.float64))
+
+
+def test_csv_round_trip(store, csv_path):
+    expected = read_ohlcv_csv(csv_path)
+    store.import_csv(csv_path)
+
+    assert_frames_equal(store.load_frame(NAME), expected)
+    assert_frames_equal(load_ohlcv(csv_path, store=store), expected)
+    meta = store.info(NAME)
+    assert (meta['symbol'], meta['exchange'], meta['timeframe'], meta['rows']) == ('ETH/USD', 'kraken', '1m', len(expected))
+    assert meta['start'] == str(expected['time'].iloc[0]) and meta['end'] == str(expected['time'].iloc[-1])
+
+
+def test_price_only_csv_becomes_flat_bars(store, tmp_path):
+    path = tmp_path / 'eth_usd_coingecko_90d.csv'
+    pd.DataFrame({'time': pd.date_range('2024-01-01', periods=5, freq='D'), 'price': [1.0, 2, 3, 4, 5]}).to_csv(path, index=False)
+    store.import_csv(str(path))
+
+    df = store.load_frame('eth_usd_coingecko_90d')
+    for col in ('open', 'high', 'low', 'close'):
+        assert df[col].tolist() == [1.0, 2, 3, 4, 5]
+    assert (df['volume'] == 0).all()
+    assert store.info('eth_usd_coingecko_90d')['timeframe'] == '1d'
+
+
+def test_write_then_append(store, csv_path):
+    df = read_ohlcv_csv(csv_path)
+    store.write('eth', df.iloc[:1000])
+    store.append('eth', df.iloc[1000:2500])
+    store.append('eth', df.iloc[2500:])
+
+    assert store.info('eth')['rows'] == len(df)
+    assert_frames_equal(store.load_frame('eth'), df)
+    # The catalog is on disk: a new store on the same root sees the appended rows.
+    assert_frames_equal(DataStore(store.root).load_frame('eth'), df)
+
+
+def test_needs_import(store, csv_path):
+    assert store.needs_import(NAME, csv_path)
+    store.import_csv(csv_path)
+    assert not store.needs_import(NAME, csv_path)
+
+    mtime = os.path.getmtime(csv_path) + 10
+    os.utime(csv_path, (mtime, mtime))
+    assert store.needs_import(NAME, csv_path)
+
+    # A dataset fetched straight into the store beats a CSV of the same name.
+    store.update_meta(NAME, source='ccxt:kraken')
+    assert not store.needs_import(NAME, csv_path)
+
+
+def test_time_bounds_slice(store, csv_path):
+    df = read_ohlcv_csv(csv_path)
+    store.import_csv(csv_path)
+    start, end = df['time'].iloc[100], df['time'].iloc[2000] + pd.Timedelta(seconds=30)
+
+    lo, hi = store.time_bounds(NAME, start, end)
+    assert (lo, hi) == (100, 2001)
+    assert store.time_bounds(NAME) == (0, len(df))
+    assert_frames_equal(store.load_frame(NAME, start, end), df[(df['time'] >= start) & (df['time'] < end)])
+
+
+def test_catalog_merges_writes_from_several_stores(store, csv_path):
+    df = read_ohlcv_csv(csv_path)
+    other = DataStore(store.root)
+    store.write('btc_usd_kraken_3d_1m', df)
+    other.write('eth_usd_binanceus_3d_1m', df)
+    store.update_meta('btc_usd_kraken_3d_1m', note='kept')
+
+    catalog = DataStore(store.root).catalog()
+    assert set(catalog) == {'btc_usd_kraken_3d_1m', 'eth_usd_binanceus_3d_1m'}
+    assert catalog['btc_usd_kraken_3d_1m']['note'] == 'kept'
+
+
+def test_list_datasets_filters_and_skips_rollups(store, csv_path):
+    df = read_ohlcv_csv(csv_path)
+    store.write(NAME, df)
+    store.write('eth_usd_binanceus_3d_1m', df)
+    BarPyramid(store).dataset(NAME, '5m')
+
+    assert store.list_datasets(exchange='kraken') == [NAME]
+    assert store.list_datasets(timeframe='1m') == ['eth_usd_binanceus_3d_1m', NAME]
+    assert store.list_datasets(exchange='kraken', derived=True) == [NAME, f"{NAME}@5m"]
@@ -0,0 +1,102 @@
+import numpy as np
+
+from core.data_store import DataStore
+from core.fetch_engine import OHLCVFetcher
+from tests.fake_exchange import FakeExchange
+
+MINUTE_MS = 60_000
+NOW_MS = 1_700_000_000_000 // MINUTE_MS * MINUTE_MS  # on a bar boundary
+DAYS = 2
+
+
+def fetcher(store, exchange):
+    return OHLCVFetcher(exchange, store=store, log=lambda msg: None)
+
+
+def stored(store, name):
+    return {col: np.array(values) for col, values in store.load_arrays(name).items()}
+
+
+def window(days=DAYS, now_ms=NOW_MS):
+    """Every bar time (ms) a full fetch of `days` ending at now_ms stores."""
+    return np.arange(now_ms - days * 86_400_000, now_ms, MINUTE_MS)
+
+
+def test_first_fetch_pages_through_the_window(tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    exchange = FakeExchange(NOW_MS, max_limit=720)
+
+    assert fetcher(store, exchange).fetch('eth', 'ETH/USD', '1m', days=DAYS) == len(window())
+    assert np.array_equal(stored(store, 'eth')['time'] // 1_000_000, window())
+    assert exchange.calls == len(window()) // 720
+
+
+def test_resume_only_requests_new_bars(tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    earlier = FakeExchange(NOW_MS - 3 * 3_600_000, max_limit=720)
+    fetcher(store, earlier).fetch('eth', 'ETH/USD', '1m', days=DAYS)
+
+    exchange = FakeExchange(NOW_MS, max_limit=720)
+    f = fetcher(store, exchange)
+    start_ms = NOW_MS - DAYS * 86_400_000
+    assert f.missing_ranges('eth', start_ms, NOW_MS, '1m') == [(NOW_MS - 3 * 3_600_000, NOW_MS)]
+    assert f.fetch('eth', 'ETH/USD', '1m', days=DAYS) == 180
+    assert exchange.calls == 1
+
+    fresh = DataStore(str(tmp_path / 'fresh'))
+    fetcher(fresh, FakeExchange(NOW_MS, max_limit=720)).fetch('eth', 'ETH/USD', '1m', days=DAYS)
+    resumed, full = stored(store, 'eth'), stored(fresh, 'eth')
+    # The resumed dataset keeps its older bars too, so compare over the full fetch's window.
+    keep = resumed['time'] >= full['time'][0]
+    for col in full:
+        assert np.array_equal(resumed[col][keep], full[col])
+
+
+def test_holes_are_detected_and_filled(tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    fetcher(store, FakeExchange(NOW_MS)).fetch('eth', 'ETH/USD', '1m', days=DAYS)
+    full = stored(store, 'eth')
+    hole = slice(1000, 1100)
+    store.write('eth', {col: np.delete(values, hole) for col, values in full.items()})
+
+    exchange = FakeExchange(NOW_MS)
+    f = fetcher(store, exchange)
+    times_ms = full['time'] // 1_000_000
+    start_ms = NOW_MS - DAYS * 86_400_000
+    assert f.missing_ranges('eth', start_ms, NOW_MS, '1m') == [(int(times_ms[1000]), int(times_ms[1100]))]
+    assert f.fetch('eth', 'ETH/USD', '1m', days=DAYS) == 100
+    for col, values in stored(store, 'eth').items():
+        assert np.array_equal(values, full[col])
+
+
+def test_history_before_the_exchange_starts_is_not_requested_again(tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    exchange = FakeExchange(NOW_MS, history_days=1)
+    f = fetcher(store, exchange)
+    f.fetch('eth', 'ETH/USD', '1m', days=DAYS)
+    assert store.info('eth')['rows'] == len(window(1))
+
+    # History starts a day ago: the missing first day is requested once and recorded as empty.
+    calls = exchange.calls
+    assert f.fetch('eth', 'ETH/USD', '1m', days=DAYS) == 0
+    assert store.info('eth')['no_data_before'] == int(window(1)[0])
+    assert exchange.calls > calls
+
+    calls = exchange.calls
+    assert f.fetch('eth', 'ETH/USD', '1m', days=DAYS) == 0
+    assert exchange.calls == calls
+
+
+def test_quiet_minutes_are_recorded_as_empty_gaps(tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    quiet = window()[1500:1530]
+    exchange = FakeExchange(NOW_MS, missing=set(quiet.tolist()))
+    f = fetcher(store, exchange)
+    f.fetch('eth', 'ETH/USD', '1m', days=DAYS)
+    assert store.info('eth')['rows'] == len(window()) - len(quiet)
+
+    start_ms = NOW_MS - DAYS * 86_400_000
+    assert f.missing_ranges('eth', start_ms, NOW_MS, '1m') == [(int(quiet[0]), int(quiet[-1]) + MINUTE_MS)]
+    assert f.fetch('eth', 'ETH/USD', '1m', days=DAYS) == 0
+    assert store.info('eth')['empty_gaps'] == [[int(quiet[0]), int(quiet[-1]) + MINUTE_MS]]
+    assert f.missing_ranges('eth', start_ms, NOW_MS, '1m') == []
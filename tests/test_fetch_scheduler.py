@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from core.data_store import DataStore
+from core.fetch_engine import OHLCVFetcher
+from core.fetch_scheduler import FetchScheduler, TokenBucket
+from tests.fake_exchange import AsyncFakeExchange, FakeExchange
+
+NOW_MS = 1_700_000_000_000 // 60_000 * 60_000
+JOB = {'exchange': 'fake', 'symbol': 'ETH/USD', 'timeframe': '1m', 'days': 1, 'limit': 100, 'dataset': 'eth'}
+PAGES = 1440 // 100 + 1
+
+
+class FailingExchange(AsyncFakeExchange):
+    """Fails its `fail_at`-th request; counts every request it starts."""
+
+    def __init__(self, now_ms, fail_at, **kwargs):
+        super().__init__(now_ms, rate_limit=0, **kwargs)
+        self.fail_at = fail_at
+        self.started = 0
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        self.started += 1
+        if self.started == self.fail_at:
+            raise RuntimeError("exchange down")
+        return await super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+def run(scheduler, jobs):
+    return asyncio.run(scheduler.run(jobs))
+
+
+def quiet(msg):
+    pass
+
+
+def test_token_bucket_paces_requests():
+    async def acquire(bucket, n):
+        start = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # A full bucket serves its burst at once, then one request every 1/rate seconds.
+    assert asyncio.run(acquire(TokenBucket(rate=50, capacity=5), 5)) < 0.05
+    assert asyncio.run(acquire(TokenBucket(rate=50, capacity=1), 11)) >= 10 / 50 * 0.95
+
+
+def test_scheduler_matches_the_sequential_fetcher(tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    exchange = AsyncFakeExchange(NOW_MS, latency=0.001, rate_limit=0)
+    limits = {'fake': {'rate_per_sec': 40, 'burst': 1, 'concurrency': 4}}
+    start = time.monotonic()
+    assert run(FetchScheduler({'fake': exchange}, limits, store=store, log=quiet), [JOB]) == {'eth': 1440}
+    assert time.monotonic() - start >= (PAGES - 1) / 40 * 0.95
+
+    reference = DataStore(str(tmp_path / 'reference'))
+    OHLCVFetcher(FakeExchange(NOW_MS), store=reference, log=quiet).fetch('eth', 'ETH/USD', '1m', days=1)
+    for col, values in reference.load_arrays('eth').items():
+        assert np.array_equal(store.load_arrays('eth')[col], values)
+
+
+def test_rate_limited_pages_are_retried(tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    # The bucket's opening burst is more than the exchange allows, so some pages need a retry;
+    # after that it paces requests under the exchange's limit.
+    exchange = AsyncFakeExchange(NOW_MS, latency=0.001, rate_limit=5)
+    limits = {'fake': {'rate_per_sec': 4, 'burst': 10, 'concurrency': 8}}
+    scheduler = FetchScheduler({'fake': exchange}, limits, store=store, backoff=0.05, log=quiet)
+
+    assert run(scheduler, [JOB]) == {'eth': 1440}
+    assert exchange.rejected > 0
+    assert scheduler.retried == exchange.rejected
+    assert scheduler.requests == PAGES + scheduler.retried
+
+
+def test_failed_page_cancels_the_rest_of_the_job(tmp_path):
+    store = DataStore(str(tmp_path / 'store'))
+    exchange = FailingExchange(NOW_MS, fail_at=3, latency=0.02)
+    limits = {'fake': {'rate_per_sec': 1000, 'burst': 2, 'concurrency': 2}}
+    scheduler = FetchScheduler({'fake': exchange}, limits, store=store, retries=0, log=quiet)
+
+    async def main():
+        with pytest.raises(RuntimeError, match="exchange down"):
+            await scheduler.run([JOB])
+        started = exchange.started
+        await asyncio.sleep(0.2)
+        leftover = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        return started, leftover
+
+    started, leftover = asyncio.run(main())
+    assert started < PAGES
+    assert exchange.started == started
+    assert leftover == []
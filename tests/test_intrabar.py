@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import tick_aggregator
+from core.bar_pyramid import rollup_frame
+from core.data_store import DataStore
+from core.intrabar import IntrabarResolver
+from core.synthetic import synthetic_frame
+from core.trade_engine import TradeEngine
+from strategies.strategy import EthScalpStrategyOHLCV
+
+FIVE_MINUTES_NS = 5 * 60 * 1_000_000_000
+
+
+class RecordingResolver(IntrabarResolver):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+
+    def path(self, start, end=None):
+        self.requests.append((start, end))
+        return super().path(start, end)
+
+
+@pytest.fixture(scope='module')
+def fine():
+    return synthetic_frame(60000, seed=5)
+
+
+def test_path_stays_inside_the_coarse_bar_across_gaps(fine):
+    coarse = rollup_frame(fine, '5m')
+    # Every third bar missing, so every other surviving bar is followed by a 5-minute hole.
+    gapped = coarse[coarse.index % 3 != 1].reset_index(drop=True)
+    resolver = RecordingResolver.from_frame(fine)
+    TradeEngine().run_backtest(gapped, EthScalpStrategyOHLCV(), mode='arrays', intrabar=resolver)
+
+    assert resolver.requests
+    for start, end in resolver.requests:
+        assert end is not None and end - start == FIVE_MINUTES_NS
+    assert resolver.rows_read == 5 * resolver.bars_resolved
+
+
+
+@pytest.fixture
+def trades_csv(tmp_path):
+    rng = np.random.default_rng(2)
+    start = pd.Timestamp('2024-01-01').value
+    times = np.sort(start + rng.integers(0, 3_600_000_000_000, 20_000))
+    prices = (2500 + np.cumsum(rng.normal(0, 0.2, len(times)))).round(2)
+    path = tmp_path / 'eth_trades.csv'
+    pd.DataFrame({'time': times.view('datetime64[ns]'), 'price': prices, 'quantity': 1.0}).to_csv(path, index=False)
+    return str(path), times, prices
+
+
+def test_trades_resolve_through_second_bars_in_the_store(tmp_path, trades_csv, monkeypatch):
+    path, times, prices = trades_csv
+    store = DataStore(str(tmp_path / 'store'))
+    resolver = IntrabarResolver.open(path, store)
+    assert 'eth_trades_1s' not in store  # nothing is read until a bar needs resolving
+
+    start = pd.Timestamp('2024-01-01 00:10').value
+    end = start + FIVE_MINUTES_NS
+    inside = (times >= start) & (times < end)
+    seconds = pd.Series(prices[inside]).groupby(times[inside] // 1_000_000_000)
+    assert resolver.path(start, end) == list(zip(seconds.max().tolist(), seconds.min().tolist()))
+    assert store.info('eth_trades_1s')['timeframe'] == '1s'
+
+    # The aggregated dataset is reused until the CSV changes.
+    aggregated = []
+    original = tick_aggregator.aggregate_trades
+
+    def aggregate_trades(path, *args, **kwargs):
+        aggregated.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(tick_aggregator, 'aggregate_trades', aggregate_trades)
+    IntrabarResolver.from_trades(path, store).path(start, end)
+    assert aggregated == []
+    mtime = os.path.getmtime(path) + 10
+    os.utime(path, (mtime, mtime))
+    IntrabarResolver.from_trades(path, store).path(start, end)
+    assert aggregated == [path]
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from core.portfolio_engine import align_markets, run_portfolio
+from core.synthetic import synthetic_frame
+from core.trade_engine import TradeEngine
+from strategies.strategy import EthScalpStrategyOHLCV
+
+STRATEGY = dict(rsi_threshold=15, tp_atr=4.0, sl_atr=1.5, cooldown_minutes=10, atr_threshold=0.1, tp1_atr=2.0)
+# Columns that don't depend on position size, so a symbol trades the same alone or next to others.
+TRADE_COLUMNS = ('time', 'type', 'entry', 'exit')
+
+
+@pytest.fixture(scope='module')
+def gapped():
+    """Two symbols on overlapping clocks: B starts later and misses runs of bars A has."""
+    a = synthetic_frame(5000, seed=3)
+    b = synthetic_frame(5000, seed=4, start_price=2000.0).iloc[300:]
+    b = b[(b.index // 40) % 7 != 3].reset_index(drop=True)
+    return {'A': a, 'B': b}
+
+
+def markets(frames):
+    strategy = EthScalpStrategyOHLCV(**STRATEGY)
+    return {symbol: TradeEngine.market_arrays(df, strategy) for symbol, df in frames.items()}
+
+
+def alone(df):
+    engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
+    stats = engine.run_backtest(df, EthScalpStrategyOHLCV(**STRATEGY), mode='arrays')
+    return engine, stats
+
+
+def symbol_trades(result, j):
+    rows = result['trade_log'].values[result['trade_symbols'] == j]
+    return {col: rows[col] for col in TRADE_COLUMNS}
+
+
+def test_single_symbol_matches_trade_engine(gapped):
+    engine, stats = alone(gapped['A'])
+    result = run_portfolio(align_markets(markets({'A': gapped['A']})), EthScalpStrategyOHLCV(**STRATEGY))
+
+    assert stats['TotalTrades'] > 0
+    assert {key: result['stats'][key] for key in stats} == stats
+    assert np.array_equal(result['trade_log'].values, engine.trade_log.values)
+    assert np.allclose(result['equity_curve'], engine.equity_curve.values, rtol=0, atol=1e-9)
+
+
+def test_gaps_are_nan_in_the_panel(gapped):
+    panel = align_markets(markets(gapped))
+    missing = panel['bar'][:, 1] == -1
+
+    assert len(panel['time']) == len(gapped['A'])
+    assert missing.sum() == len(gapped['A']) - len(gapped['B'])
+    assert np.isnan(panel['close'][missing, 1]).all()
+    assert not np.isnan(panel['close'][:, 0]).any()
+
+
+def test_uncapped_symbols_trade_as_if_alone(gapped):
+    result = run_portfolio(align_markets(markets(gapped)), EthScalpStrategyOHLCV(**STRATEGY))
+
+    assert result['stats']['SkippedEntries'] == 0
+    for j, symbol in enumerate(('A', 'B')):
+        engine, stats = alone(gapped[symbol])
+        assert stats['TotalTrades'] > 0
+        trades = symbol_trades(result, j)
+        for col in TRADE_COLUMNS:
+            assert np.array_equal(trades[col], engine.trade_log[col])
+
+
+def test_max_positions_caps_open_positions(gapped):
+    panel = align_markets(markets(gapped))
+    uncapped = run_portfolio(panel, EthScalpStrategyOHLCV(**STRATEGY))
+    capped = run_portfolio(panel, EthScalpStrategyOHLCV(**STRATEGY), max_positions=1)
+
+    assert uncapped['stats']['MaxOpenPositions'] == 2
+    assert capped['stats']['MaxOpenPositions'] == 1
+    assert capped['open_positions'].max() == 1
+    assert capped['stats']['SkippedEntries'] > 0
+    assert len(np.unique(capped['trade_log']['trade_id'])) < len(np.unique(uncapped['trade_log']['trade_id']))
+
+
+def test_max_total_risk_skips_entries(gapped):
+    panel = align_markets(markets(gapped))
+    uncapped = run_portfolio(panel, EthScalpStrategyOHLCV(**STRATEGY))
+    loose = run_portfolio(panel, EthScalpStrategyOHLCV(**STRATEGY), max_total_risk=1.0)
+    # Each entry risks 1% of equity, so a 1.5% budget has no room for a second full-risk position.
+    tight = run_portfolio(panel, EthScalpStrategyOHLCV(**STRATEGY), max_total_risk=0.015)
+
+    assert loose['stats'] == uncapped['stats']
+    assert tight['stats']['SkippedEntries'] > 0
+    assert tight['stats']['TotalTrades'] < uncapped['stats']['TotalTrades']
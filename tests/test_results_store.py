@@ -0,0 +1,26 @@
+import math
+
+from core.results_store import ResultsStore, params_key
+
+PARAM_KEYS = ('RSI', 'TP_ATR')
+
+
+def result(rsi, profit_factor, pnl):
+    return {'RSI': rsi, 'TP_ATR': 2.0, 'TotalPnL': pnl, 'ProfitFactor': profit_factor, 'TotalTrades': 5}
+
+
+def test_non_finite_metrics_round_trip(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results.sqlite'))
+    results = [result(5, math.inf, 10.0), result(10, 1.5, 20.0), result(15, math.nan, 0.0), result(20, 0.5, -5.0)]
+    store.put_many('fp', 'code', 'arrays', results, PARAM_KEYS)
+
+    found = store.get_many('fp', 'code', 'arrays', [{'RSI': 5, 'TP_ATR': 2.0}, {'RSI': 15, 'TP_ATR': 2.0}])
+    assert found[params_key({'RSI': 5, 'TP_ATR': 2.0})]['ProfitFactor'] == math.inf
+    assert math.isnan(found[params_key({'RSI': 15, 'TP_ATR': 2.0})]['ProfitFactor'])
+
+    # inf ranks above every finite value, NaN below all of them.
+    ranked = store.top(n=4, metric='ProfitFactor')
+    assert [row['RSI'] for row in ranked] == [5, 10, 20, 15]
+    assert ranked[0]['ProfitFactor'] == math.inf
+    assert [row['RSI'] for row in store.top(n=2, metric='TotalPnL')] == [10, 5]
+    store.close()
@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pytest
+
+from core import robustness
+from core.optimizer import best_config, build_grid, load_strategy
+from core.robustness import simulate, trade_pnls
+from core.synthetic import synthetic_frame
+from core.trade_engine import TradeEngine
+from core.trade_log import TradeLog
+from strategies.strategy import EthScalpStrategyOHLCV
+
+
+@pytest.fixture(scope='module')
+def pnls():
+    return np.random.default_rng(1).normal(0.5, 10, 200)
+
+
+@pytest.mark.parametrize('name, options', [('shuffle', {}), ('skip', {'skip_prob': 0.2}), ('bootstrap', {'block': 5})])
+def test_results_do_not_depend_on_workers(monkeypatch, pnls, name, options):
+    monkeypatch.setattr(robustness, 'CHUNK_ELEMENTS', 200 * 37)  # 37 simulations per chunk: uneven chunks
+    one = simulate(name, pnls, 500, seed=4, workers=1, **options)
+    two = simulate(name, pnls, 500, seed=4, workers=2, **options)
+
+    assert set(one) == {'final_pnl', 'max_drawdown', 'sharpe'}
+    for key in one:
+        assert len(one[key]) == 500
+        assert np.array_equal(one[key], two[key])
+    assert not np.array_equal(one['max_drawdown'], simulate(name, pnls, 500, seed=5, **options)['max_drawdown'])
+
+
+def test_shuffles_keep_the_final_pnl(pnls):
+    sims = simulate('shuffle', pnls, 100, seed=0)
+    assert np.allclose(sims['final_pnl'], pnls.sum())
+    assert (sims['max_drawdown'] >= 0).all()
+
+
+def test_trade_pnls_add_up_partial_exits():
+    log = TradeLog()
+    # Trade 0 takes TP1 and then stops out at breakeven; trade 1 loses; trade 2 takes TP1 and TP2.
+    log.append(1, 'win_tp1', 100.0, 102.0, 5.0, 0.1, 1.0, 0)
+    log.append(2, 'breakeven_sl', 100.0, 100.0, -0.2, 0.1, 1.0, 0)
+    log.append(3, 'loss', 101.0, 99.0, -3.0, 0.1, 1.0, 1)
+    log.append(4, 'win_tp1', 98.0, 99.0, 1.5, 0.1, 1.0, 2)
+    log.append(5, 'win_tp2', 98.0, 101.0, 4.0, 0.1, 1.0, 2)
+
+    assert trade_pnls(log).tolist() == [4.8, -3.0, 5.5]
+    assert trade_pnls(TradeLog()).tolist() == []
+
+
+def test_trade_pnls_of_a_backtest():
+    engine = TradeEngine()
+    stats = engine.run_backtest(synthetic_frame(6000, seed=7), EthScalpStrategyOHLCV(tp1_atr=2.0), mode='arrays')
+    assert (engine.trade_log['type'] == 0).any()  # has TP1 partials
+
+    pnls = trade_pnls(engine.trade_log)
+    assert len(pnls) == stats['TotalTrades']
+    assert pnls.sum() == pytest.approx(engine.trade_log['gain'].sum(), rel=1e-12)
+    assert round(float((pnls > 0).mean() * 100), 2) == stats['WinRate']
+
+
+def test_load_strategy_ignores_extra_keys(tmp_path):
+    params = build_grid()[0]
+    path = tmp_path / 'best_config.json'
+    path.write_text(json.dumps({**best_config(params), 'TotalPnL': 12.5, 'Sharpe': 0.1}))
+
+    strategy = load_strategy(str(path))
+    assert (strategy.rsi_threshold, strategy.tp2_atr, strategy.trailing_sl_atr, strategy.tp1_atr) == \
+        (params['RSI'], params['TP_ATR'], params['SL_ATR'], params['TP1_ATR'])
+    with pytest.raises(FileNotFoundError):
+        load_strategy(str(tmp_path / 'missing.json'))
@@ -0,0 +1,47 @@
+import pytest
+
+from core.optimizer import PARAM_GRID, build_grid, make_strategy, run_grid
+from core.search import Evaluator, run_search
+from core.synthetic import synthetic_frame
+from core.trade_engine import TradeEngine
+
+
+@pytest.fixture(scope='module')
+def market():
+    df = synthetic_frame(12000, seed=21)
+    return TradeEngine.market_arrays(df, make_strategy(build_grid()[0]))
+
+
+def params_of(result):
+    return {key: result[key] for key in PARAM_GRID}
+
+
+def test_grid_search_best_is_run_grids_best(market):
+    results, evaluator = run_search(market, 'grid')
+    reference = run_grid(market, build_grid())
+
+    assert results == reference
+    assert evaluator.calls == len(reference) and evaluator.cost == len(reference)
+    assert max(results, key=evaluator.score) == max(reference, key=Evaluator(market).score)
+
+
+@pytest.mark.parametrize('search', ['halving', 'hyperband', 'tpe'])
+def test_budget_is_respected(market, search):
+    budget = 6
+    results, evaluator = run_search(market, search, budget=budget, seed=1)
+
+    assert results
+    assert evaluator.cost <= budget + 1e-9
+    # Far more sets were tried than whole-data backtests were paid for.
+    assert len(evaluator.trials) > budget
+    assert all(bars <= evaluator.n_bars for bars, _ in evaluator.trials)
+
+
+@pytest.mark.parametrize('search', ['random', 'halving', 'tpe'])
+def test_seeded_search_is_deterministic(market, search):
+    def trials(seed):
+        _, evaluator = run_search(market, search, budget=4, seed=seed)
+        return [(bars, params_of(result)) for bars, result in evaluator.trials]
+
+    assert trials(3) == trials(3)
+    assert trials(3) != trials(4)
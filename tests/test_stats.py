@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from core.stats import EquityBuffer, PerformanceStats
+
+
+def test_equity_buffer_grows_and_drains():
+    buffer = EquityBuffer(capacity=2)
+    expected = []
+    for i in range(5):
+        buffer.append(float(i))
+        expected.append(float(i))
+    buffer.fill(7.0, 10)
+    buffer.extend(np.arange(3.0))
+    expected += [7.0] * 10 + [0.0, 1.0, 2.0]
+
+    assert len(buffer) == len(expected)
+    assert buffer.tolist() == expected
+    assert np.array_equal(np.asarray(buffer), expected)
+    assert buffer[-1] == 2.0
+    with pytest.raises(ValueError):
+        buffer.values[0] = 1.0  # read-only view
+
+    drained = buffer.drain()
+    assert drained.tolist() == expected
+    buffer.append(9.0)
+    # Positions stay global after a drain; only the new points are still held.
+    assert len(buffer) == len(expected) + 1
+    assert buffer.tolist() == [9.0]
+    assert buffer.drain().tolist() == [9.0]
+
+
+def curve_stats(curve):
+    """PerformanceStats fed one run of equal points at a time, as the engines do."""
+    stats = PerformanceStats(curve[0])
+    values = np.asarray(curve[1:])
+    changes = np.flatnonzero(values[1:] != values[:-1]) + 1
+    for start, end in zip(np.r_[0, changes], np.r_[changes, len(values)]):
+        stats.hold(float(values[start]), int(end - start))
+    return stats
+
+
+@pytest.fixture(scope='module')
+def curve():
+    rng = np.random.default_rng(6)
+    changes = np.where(rng.random(5000) < 0.05, rng.normal(0, 5, 5000), 0.0)
+    return 1000 + np.r_[0.0, np.cumsum(changes)]
+
+
+def test_runs_of_bars_match_numpy(curve):
+    stats = curve_stats(curve)
+    diffs = np.diff(curve)
+
+    assert np.array_equal(stats.curve.values, curve)
+    assert stats.n_returns == len(diffs)
+    assert stats.mean == pytest.approx(diffs.mean(), rel=1e-9, abs=1e-12)
+    assert stats.m2 / stats.n_returns == pytest.approx(diffs.var(), rel=1e-9)
+    assert stats.downside_sq == pytest.approx((diffs[diffs < 0] ** 2).sum(), rel=1e-12)
+    assert stats.max_drawdown == pytest.approx((np.maximum.accumulate(curve) - curve).max(), rel=1e-12)
+
+
+@pytest.mark.parametrize('split', [1, 2500, 4999])
+def test_extend_merges_like_one_run(curve, split):
+    whole = curve_stats(curve)
+    first, second = curve_stats(curve[:split + 1]), curve_stats(curve[split:])
+    first.extend(second)
+
+    assert np.array_equal(first.curve.values, whole.curve.values)
+    assert first.n_returns == whole.n_returns
+    for attr in ('mean', 'm2', 'downside_sq', 'max_drawdown', 'max_drawdown_pct', 'peak', 'last'):
+        assert getattr(first, attr) == pytest.approx(getattr(whole, attr), rel=1e-9, abs=1e-12), attr
+
+
+def test_extend_adds_trades_including_an_open_one():
+    first = PerformanceStats(1000)
+    first.open_trade(0)
+    first.hold(1000, 5)
+    first.fill(10.0)
+    first.close_trade(5)
+    first.hold(1010, 1)
+
+    second = PerformanceStats(1010)
+    second.open_trade(0)
+    second.hold(1010, 3)
+    second.fill(-4.0)  # a TP1-style partial already logged, position still open at the end
+    second.hold(1006, 2)
+
+    first.extend(second)
+    summary = first.summary()
+    assert summary['TotalTrades'] == 2
+    assert summary['WinRate'] == 50.0
+    assert summary['ProfitFactor'] == 2.5
+    assert summary['TotalPnL'] == 6.0
+    assert first.next_trade_id == 2
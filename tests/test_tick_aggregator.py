@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.tick_aggregator import TickAggregator, iter_trade_chunks
+
+TIMEFRAMES = ('1m', '5m', '1h')
+
+
+@pytest.fixture(scope='module')
+def trades():
+    """Three hours of trades at random times, with quiet minutes and bursts of trades in the same bar."""
+    rng = np.random.default_rng(4)
+    start = pd.Timestamp('2024-01-01').value
+    times = np.sort(start + rng.integers(0, 3 * 3_600_000_000_000, 20_000))
+    times[5000:5400] = times[5000]  # many trades with the same timestamp
+    times = np.sort(times[(times - start) // 60_000_000_000 % 17 != 3])
+    prices = 2500 + np.cumsum(rng.normal(0, 0.5, len(times)))
+    quantities = rng.exponential(0.2, len(times))
+    return times, prices, quantities
+
+
+def aggregate(chunks):
+    aggregator = TickAggregator(TIMEFRAMES)
+    parts = {tf: [] for tf in TIMEFRAMES}
+    for chunk in chunks:
+        for tf, bars in aggregator.feed(*chunk).items():
+            parts[tf].append(bars)
+    for tf, bars in aggregator.flush().items():
+        parts[tf].append(bars)
+    return {tf: {col: np.concatenate([bars[col] for bars in parts[tf]]) for col in parts[tf][0]} for tf in TIMEFRAMES}
+
+
+def split(trades, chunk_size):
+    return [tuple(values[lo:lo + chunk_size] for values in trades) for lo in range(0, len(trades[0]), chunk_size)]
+
+
+def reference(trades, timeframe):
+    times, prices, quantities = trades
+    df = pd.DataFrame({'price': prices, 'quantity': quantities}, index=pd.DatetimeIndex(times))
+    bars = df.resample(pd.Timedelta(timeframe.replace('m', 'min'))).agg(
+        {'price': ['first', 'max', 'min', 'last'], 'quantity': 'sum'}).dropna()
+    return {'time': bars.index.to_numpy(dtype='datetime64[ns]').view(np.int64),
+            'open': bars[('price', 'first')].to_numpy(), 'high': bars[('price', 'max')].to_numpy(),
+            'low': bars[('price', 'min')].to_numpy(), 'close': bars[('price', 'last')].to_numpy(),
+            'volume': bars[('quantity', 'sum')].to_numpy()}
+
+
+def test_one_pass_matches_resample(trades):
+    one_pass = aggregate([trades])
+    for tf in TIMEFRAMES:
+        expected = reference(trades, tf)
+        for col in ('time', 'open', 'high', 'low', 'close'):
+            assert np.array_equal(one_pass[tf][col], expected[col])
+        assert np.allclose(one_pass[tf]['volume'], expected['volume'], rtol=1e-12)
+
+
+# 7 splits nearly every bar, 100 puts whole chunks inside the burst of equal timestamps, 3000 splits a few.
+@pytest.mark.parametrize('chunk_size', [7, 100, 3000])
+def test_bars_split_by_a_chunk_boundary_are_carried_over(trades, chunk_size):
+    one_pass = aggregate([trades])
+    chunked = aggregate(split(trades, chunk_size))
+    for tf in TIMEFRAMES:
+        for col in ('time', 'open', 'high', 'low', 'close'):
+            assert np.array_equal(chunked[tf][col], one_pass[tf][col])
+        # Volumes are summed in a different order across a boundary.
+        assert np.allclose(chunked[tf]['volume'], one_pass[tf]['volume'], rtol=1e-12)
+
+
+def test_csv_chunks(trades, tmp_path):
+    times, prices, quantities = trades
+    path = tmp_path / 'trades.csv'
+    pd.DataFrame({'time': times.view('datetime64[ns]'), 'price': prices, 'quantity': quantities}).to_csv(path, index=False)
+
+    chunked = aggregate(iter_trade_chunks(str(path), chunk_size=999))
+    one_pass = aggregate(iter_trade_chunks(str(path), chunk_size=len(times)))
+    assert np.array_equal(chunked['1m']['time'], one_pass['1m']['time'])
+    assert np.array_equal(chunked['1m']['close'], one_pass['1m']['close'])
+
+
+def test_out_of_order_trades_are_rejected(trades):
+    aggregator = TickAggregator(TIMEFRAMES)
+    first, second = split(trades, 1000)[:2]
+    aggregator.feed(*second)
+    with pytest.raises(ValueError):
+        aggregator.feed(*first)
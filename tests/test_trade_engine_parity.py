@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from core.batch_engine import run_batch
+from core.optimizer import make_strategy
+from core.synthetic import synthetic_frame
+from core.trade_engine import TradeEngine
+from strategies.strategy import EthScalpStrategyOHLCV
+
+STRATEGIES = [
+    dict(rsi_threshold=15, tp_atr=4.0, sl_atr=1.5, cooldown_minutes=0, atr_threshold=0.1, tp1_atr=2.0),
+    dict(rsi_threshold=10, tp_atr=2.0, sl_atr=0.5, cooldown_minutes=30, atr_threshold=1.0, tp1_atr=1.5),
+    dict(rsi_threshold=20, tp_atr=6.0, sl_atr=2.0, cooldown_minutes=10, atr_threshold=0.2, tp1_atr=2.0),
+]
+
+
+@pytest.fixture(scope='module')
+def df():
+    return synthetic_frame(4000, seed=7)
+
+
+def run(df, params, mode):
+    engine = TradeEngine(starting_equity=1000, fees_pct=0.001)
+    stats = engine.run_backtest(df, EthScalpStrategyOHLCV(**params), mode=mode)
+    return engine, stats
+
+
+@pytest.mark.parametrize('params', STRATEGIES)
+@pytest.mark.parametrize('mode', ['arrays', 'events'])
+def test_matches_rows(df, params, mode):
+    rows_engine, rows_stats = run(df, params, 'rows')
+    engine, stats = run(df, params, mode)
+
+    assert rows_stats['TotalTrades'] > 0
+    assert stats == rows_stats
+    assert np.array_equal(engine.trade_log.values, rows_engine.trade_log.values)
+    assert np.array_equal(engine.equity_curve.values, rows_engine.equity_curve.values)
+    assert engine.equity == rows_engine.equity
+
+
+# The same strategies as core.optimizer.PARAM_GRID combos, all simulated together by the batch engine.
+COMBOS = [dict(RSI=p['rsi_threshold'], TP_ATR=p['tp_atr'], SL_ATR=p['sl_atr'], Cooldown=p['cooldown_minutes'],
+               ATR_Thresh=p['atr_threshold'], TP1_ATR=p['tp1_atr']) for p in STRATEGIES]
+
+
+@pytest.fixture(scope='module')
+def batch_rows(df):
+    market = TradeEngine.market_arrays(df, make_strategy(COMBOS[0]))
+    return run_batch(market, COMBOS)
+
+
+@pytest.mark.parametrize('index', range(len(COMBOS)))
+def test_batch_matches_arrays(df, batch_rows, index):
+    params = COMBOS[index]
+    _, stats = run(df, STRATEGIES[index], 'arrays')
+
+    row = batch_rows[index]
+    assert stats['TotalTrades'] > 0
+    assert {key: row[key] for key in params} == params
+    assert {key: value for key, value in row.items() if key not in params} == stats
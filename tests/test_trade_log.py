@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.synthetic import synthetic_frame
+from core.trade_engine import TradeEngine
+from core.trade_log import TRADE_TYPES, TradeLog
+from strategies.strategy import EthScalpStrategyOHLCV
+
+
+@pytest.fixture(scope='module')
+def log():
+    engine = TradeEngine()
+    engine.run_backtest(synthetic_frame(6000, seed=7), EthScalpStrategyOHLCV(tp1_atr=2.0), mode='arrays')
+    assert set(engine.trade_log.to_frame()['type']) >= {'win_tp1', 'loss'}
+    return engine.trade_log
+
+
+@pytest.mark.parametrize('ext', ['.npy', '.csv', '.parquet', '.arrow'])
+def test_save_load_round_trip(log, tmp_path, ext):
+    if ext in ('.parquet', '.arrow'):
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f"trades{ext}")
+    log.save(path)
+    loaded = TradeLog.load(path)
+
+    assert np.array_equal(loaded.values, log.values)
+    pd.testing.assert_frame_equal(loaded.to_frame(), log.to_frame())
+
+
+def test_unknown_extension_is_rejected(log, tmp_path):
+    with pytest.raises(ValueError):
+        log.save(str(tmp_path / 'trades.txt'))
+
+
+def test_old_csv_without_trade_ids(log, tmp_path):
+    path = tmp_path / 'old.csv'
+    frame = log.to_frame()
+    frame['type'] = frame['type'].astype(str)
+    frame.drop(columns='trade_id').to_csv(path, index=False)
+
+    # Every final exit closes a trade, so a TP1 partial shares its id with the exit after it.
+    loaded = TradeLog.load(str(path))
+    assert np.array_equal(loaded.values, log.values)
+
+
+def test_trade_ids_from_exit_types():
+    frame = pd.DataFrame({
+        'time': pd.date_range('2024-01-01', periods=5, freq='min'),
+        'type': ['win_tp1', 'win_tp2', 'loss', 'win_tp1', 'breakeven_sl'],
+        'entry': 1.0, 'exit': 1.0, 'gain': 0.0, 'fee': 0.0, 'position_size': 1.0,
+    })
+    assert TradeLog.from_frame(frame)['trade_id'].tolist() == [0, 0, 1, 2, 2]
+
+
+def test_extend_shifts_trade_ids(log):
+    combined = TradeLog(capacity=1)
+    combined.extend(log)
+    combined.extend(log, id_offset=100)
+
+    assert len(combined) == 2 * len(log)
+    assert np.array_equal(combined['trade_id'][len(log):], log['trade_id'] + 100)
+    assert combined.nbytes == 2 * log.nbytes
+    assert list(combined.to_frame()['type'].cat.categories) == list(TRADE_TYPES)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from core.optimizer import PARAM_GRID, build_grid, make_strategy
+from core.stats import PerformanceStats
+from core.synthetic import synthetic_frame
+from core.trade_engine import TradeEngine
+from core.walk_forward import WARMUP_BARS, walk_forward, walk_forward_windows, window_market
+
+
+@pytest.mark.parametrize('n_bars, n_windows, anchored', [(10_000, 5, False), (10_000, 5, True), (7_777, 3, False)])
+def test_windows_tile_without_overlap(n_bars, n_windows, anchored):
+    windows = walk_forward_windows(n_bars, n_windows, anchored=anchored)
+
+    assert len(windows) == n_windows
+    assert windows[-1][3] == n_bars
+    for train_start, train_end, test_start, test_end in windows:
+        assert WARMUP_BARS <= train_start < train_end == test_start < test_end
+        if anchored:
+            assert train_start == WARMUP_BARS
+    for previous, current in zip(windows, windows[1:]):
+        assert previous[3] == current[2]  # test windows are back to back, never overlapping
+
+
+def test_too_short_series_is_rejected():
+    with pytest.raises(ValueError):
+        walk_forward_windows(WARMUP_BARS + 5, n_windows=5)
+
+
+@pytest.fixture(scope='module')
+def market():
+    return TradeEngine.market_arrays(synthetic_frame(12000, seed=8), make_strategy(build_grid()[0]))
+
+
+def test_stitched_stats_extend_the_window_runs(market):
+    result = walk_forward(market, n_windows=3, search='random', budget=3, seed=2)
+
+    expected = PerformanceStats(1000)
+    curve = [np.array([1000.0])]
+    trades = 0
+    equity = 1000
+    for row in result['windows']:
+        engine = TradeEngine(starting_equity=equity)
+        params = {key: row[key] for key in PARAM_GRID}
+        stats = engine.run_backtest_arrays(window_market(market, row['test_start'], row['test_end']),
+                                           make_strategy(params))
+        assert stats == {key[4:]: value for key, value in row.items() if key.startswith('Test')}
+        expected.extend(engine.stats)
+        curve.append(engine.equity_curve.values[1:])
+        trades += len(engine.trade_log)
+        equity = engine.equity
+
+    assert result['stats'] == expected.summary(equity)
+    assert result['stats']['TotalTrades'] > 0
+    stitched = result['engine']
+    assert np.array_equal(stitched.equity_curve.values, np.concatenate(curve))
+    # The merged accumulators agree with stats computed over the stitched curve directly.
+    diffs = np.diff(stitched.equity_curve.values)
+    assert result['stats']['Sharpe'] == pytest.approx(diffs.mean() / (diffs.std() + 1e-9), abs=0.006)
+    drawdown = np.maximum.accumulate(stitched.equity_curve.values) - stitched.equity_curve.values
+    assert result['stats']['MaxDrawdown'] == round(drawdown.max(), 2)
+    assert len(stitched.equity_curve) == len(result['times'])
+    assert len(stitched.trade_log) == trades
+    # Trade ids stay unique across windows.
+    assert np.all(np.diff(stitched.trade_log['trade_id']) >= 0)
@@ -1,22 +1,37 @@
+import os
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
+from core.trade_log import TradeLog
+
+# Trade logs can be .csv, .npy or (with pyarrow) .parquet/.arrow/.feather; see core.trade_log.TradeLog.
 def load_trade_log(file_path='logs/trade_log.csv'):
-    try:
-        return pd.read_csv(file_path)
-    except FileNotFoundError:
+    if not os.path.exists(file_path):
         print(f"[!] Trade log not found: {file_path}")
-        return pd.DataFrame()
+        return TradeLog()
+    return TradeLog.load(file_path)
 
-def plot_cumulative_pnl(trade_log_df):
-    if trade_log_df.empty:
+def _columns(trade_log):
+    # (exit times as datetime64, gains) from a TradeLog or an old-style DataFrame.
+    if isinstance(trade_log, TradeLog):
+        return trade_log['time'].view('datetime64[ns]'), trade_log['gain']
+    return pd.to_datetime(trade_log['time']).to_numpy(), trade_log['gain'].to_numpy(dtype=np.float64)
+
+def plot_cumulative_pnl(trade_log):
+    if len(trade_log) == 0:
         print("[!] No trade data to plot.")
         return
 
-    trade_log_df['cumulative_gain'] = trade_log_df['gain'].cumsum()
-    trade_log_df['time'] = pd.to_datetime(trade_log_df['time'])
+    # Only plotting needs matplotlib; summarizing stays light.
+    import matplotlib.pyplot as plt
+    from utils.plotting import downsample
+
+    times, gains = _columns(trade_log)
+    cumulative = np.cumsum(gains)
+    picks = downsample(cumulative, 1000)  # 10 in at the default 100 dpi
     plt.figure(figsize=(10, 5))
-    plt.plot(trade_log_df['time'], trade_log_df['cumulative_gain'])
+    plt.plot(times[picks], cumulative[picks])
     plt.title('Cumulative PnL Over Time')
     plt.xlabel('Time')
     plt.ylabel('Cumulative Gain')
@@ -24,16 +39,17 @@ def plot_cumulative_pnl(trade_log_df):
     plt.tight_layout()
     plt.show()
 
-def summarize_trades(trade_log_df):
-    if trade_log_df.empty:
+def summarize_trades(trade_log):
+    if len(trade_log) == 0:
         print("[!] No trade data to summarize.")
         return {}
 
-    total_trades = len(trade_log_df)
-    wins = len(trade_log_df[trade_log_df['gain'] > 0])
-    losses = len(trade_log_df[trade_log_df['gain'] <= 0])
+    _, gains = _columns(trade_log)
+    total_trades = len(gains)
+    wins = int(np.count_nonzero(gains > 0))
+    losses = total_trades - wins
     win_rate = round((wins / total_trades) * 100, 2) if total_trades else 0
-    total_pnl = round(trade_log_df['gain'].sum(), 2)
+    total_pnl = round(float(gains.sum()), 2)
 
     summary = {
         'Total Trades': total_trades,
@@ -0,0 +1,143 @@
+import os
+
+import numpy as np
+
+
+def max_drawdown_span(y):
+    """(peak, trough) indices of the largest peak-to-trough drop in `y`."""
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) == 0:
+        return 0, 0
+    trough = int(np.argmax(np.maximum.accumulate(y) - y))
+    peak = int(np.argmax(y[:trough + 1]))
+    return peak, trough
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Indices of the first and last point plus the lowest and highest point of
+    each of `n_buckets` equal runs of `y`, in order. Every spike and dip
+    survives; at two points per pixel column the line looks like the full one.
+    """
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    full = n // size * size
+    blocks = np.asarray(y[:full], dtype=np.float64).reshape(-1, size)
+    offsets = np.arange(0, full, size)
+    picks = [offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1), [0, n - 1]]
+    if full < n:
+        tail = np.asarray(y[full:], dtype=np.float64)
+        picks.append([full + int(tail.argmin()), full + int(tail.argmax())])
+    return np.unique(np.concatenate(picks))
+
+
+def lttb_indices(y, n_out):
+    """
+    Largest-triangle-three-buckets: keeps the first and last point and, from
+    each of n_out - 2 buckets in between, the point making the largest triangle
+    with the previous pick and the next bucket's mean. One small NumPy step per
+    bucket, so the cost grows with n_out and only linearly with len(y).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    means = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    mean_x = (edges[:-1] + edges[1:] - 1) / 2
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 1 < n_out - 2:
+            cx, cy = mean_x[b + 1], means[b + 1]
+        else:
+            cx, cy = n - 1, y[-1]
+        xs = np.arange(lo, hi)
+        area = np.abs((a - cx) * (y[lo:hi] - y[a]) - (a - xs) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        picks[b + 1] = a
+    return picks
+
+
+def downsample(y, width_px, method='minmax'):
+    """
+    Indices of at most about 2 * width_px points of `y` to draw ('minmax' or
+    'lttb'), always including the peak and trough of the maximum drawdown so
+    the worst drop is drawn at its true depth.
+    """
+    if method == 'minmax':
+        picks = minmax_indices(y, width_px)
+    elif method == 'lttb':
+        picks = lttb_indices(y, 2 * width_px)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return np.union1d(picks, max_drawdown_span(y))
+
+
+def render_equity_curve(curve, save_path, times=None, title='Strategy Equity Curve', ylabel='Equity',
+                        figsize=(12, 6), dpi=100, method='minmax'):
+    """
+    Saves `curve` (one equity point per bar, optionally with datetime64 `times`)
+    as a PNG, downsampled to the figure's pixel width first, with the maximum
+    drawdown shaded. Uses its own Agg canvas rather than pyplot, so it is safe
+    to call from worker processes and threads.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    curve = np.asarray(curve, dtype=np.float64)
+    picks = downsample(curve, int(figsize[0] * dpi), method)
+    x = np.asarray(times)[picks] if times is not None else picks
+    peak, trough = max_drawdown_span(curve)
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(x, curve[picks], linewidth=1)
+    if trough > peak:
+        xs = np.asarray(times)[[peak, trough]] if times is not None else (peak, trough)
+        ax.axvspan(xs[0], xs[1], color='red', alpha=0.15,
+                   label=f"Max drawdown {curve[peak] - curve[trough]:.2f}")
+        ax.legend(loc='upper left')
+    ax.set_title(title)
+    ax.set_xlabel('Time' if times is not None else 'Time (in minutes)')
+    ax.set_ylabel(ylabel)
+    ax.grid(True)
+    if os.path.dirname(save_path):
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    fig.savefig(save_path)
+    return save_path
+
+
+def render_robustness(results, save_path, bins=60):
+    """
+    Histograms of core.robustness.run_robustness results, one row per
+    simulation and one column per metric, with the backtest's actual value marked.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    metrics = ('final_pnl', 'max_drawdown', 'sharpe')
+    fig = Figure(figsize=(15, 3.5 * len(results)), dpi=100)
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(len(results), len(metrics), squeeze=False)
+    for row, (name, (actual, sims)) in zip(axes, results.items()):
+        for ax, metric in zip(row, metrics):
+            values = sims[metric]
+            # Metrics a simulation can't change (shuffled final PnL) only differ by rounding; draw one bar.
+            spread = np.ptp(values) > 1e-9 * max(1.0, np.abs(values).max())
+            ax.hist(values, bins=bins if spread else 1, color='steelblue')
+            if metric in actual:
+                ax.axvline(actual[metric], color='red', label='actual')
+                ax.legend(loc='upper right')
+            ax.set_title(f"{name}: {metric}")
+            ax.grid(True)
+    fig.tight_layout()
+    if os.path.dirname(save_path):
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    fig.savefig(save_path)
+    return save_path